@@ -0,0 +1,65 @@
+"""
+Benchmark: load the full catalog from the crawler CSVs vs the catalog store.
+
+CSV loading re-parses every repr string with ast.literal_eval; the store
+loader reads typed rows. Run catalog_store.py (or a crawl) first so
+catalog.sqlite3 exists.
+
+usage: python bench_catalog.py [--repeat 10]
+"""
+
+import argparse
+import os
+import time
+
+from catalog_store import CATALOG_FILE, CatalogStore
+from prereq_graph import PrerequisiteGraph
+from requirement_groups import COURSES_FILE, MAJOR_FILE, load_course_credits, load_majors
+
+
+def timed(fn, repeat):
+    fn()  # warm up the page cache
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--majors", default=MAJOR_FILE)
+    parser.add_argument("--courses", default=COURSES_FILE)
+    parser.add_argument("--catalog", default=CATALOG_FILE)
+    args = parser.parse_args()
+
+    store = CatalogStore(args.catalog)
+    print(f"{args.catalog}: {store.counts()}")
+
+    cases = [("majors", lambda: load_majors(args.majors), store.load_majors)]
+    if os.path.exists(args.courses):
+        cases.append(("course credits", lambda: load_course_credits(args.courses), store.course_credits))
+        cases.append((
+            "prereq graph",
+            lambda: PrerequisiteGraph.from_csv(args.courses),
+            lambda: PrerequisiteGraph.from_groups(store.prerequisite_groups()),
+        ))
+    else:
+        print(f"{args.courses} not found, timing majors only")
+
+    print(f"{'load':>16} {'csv ms':>9} {'store ms':>9} {'speedup':>8}")
+    for name, from_csv, from_store in cases:
+        csv_ms, _ = timed(from_csv, args.repeat)
+        store_ms, _ = timed(from_store, args.repeat)
+        print(f"{name:>16} {csv_ms:>9.2f} {store_ms:>9.2f} {csv_ms / store_ms:>7.1f}x")
+
+    # indexed lookups the advisor makes per request
+    code = next(iter(store.load_majors()), None)
+    if code is not None:
+        one_ms, _ = timed(lambda: store.load_majors([code]), args.repeat)
+        print(f"{'one major':>16} {'':>9} {one_ms:>9.2f}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
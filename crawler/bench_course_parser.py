@@ -0,0 +1,202 @@
+"""
+Benchmark: course-block field extraction, per-field helpers vs the single-pass parser.
+
+Pages are parsed once up front; only extraction from the parsed tree is
+timed. "per-field" is the extraction loop the crawler used before
+parse_course_block: three select_one lookups per block and a separate regex
+scan of the .courseblockextra text per field (kept below as it was).
+
+Saved department pages come from the fetcher's http cache (a previous crawl)
+or from a directory of .html files; --synthetic builds bulletin-shaped pages
+when neither is available.
+
+usage: python bench_course_parser.py [--pages DIR] [--cache-dir .http_cache] [--synthetic 40] [--repeat 5]
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import time
+
+from bs4 import BeautifulSoup
+
+from fetcher import CACHE_DIR
+from psu_undergrad_course_crawler import BASE_URL, extract_courses_from_soup
+
+
+# extraction as it was before the single-pass parser
+
+def legacy_extract_courses(soup, department_url):
+    courses = []
+    for block in soup.select(".courseblock"):
+        title_block = block.select_one(".courseblocktitle")
+        if not title_block:
+            continue
+
+        course_number, course_name = title_block.text.strip().split(":", 1)
+        description = (
+            block.select_one(".courseblockdesc").text.strip()
+            if block.select_one(".courseblockdesc")
+            else "No description"
+        )
+        course_data_block = block.select_one(".courseblockextra")
+        course_data = course_data_block.text.strip() if course_data_block else "None"
+
+        courses.append({
+            "course_number": course_number.strip(),
+            "course_name": course_name.strip(),
+            "credits": legacy_extract_credits(description),
+            "description": description,
+            "prerequisite_data": legacy_extract_prerequisite_data(course_data),
+            "prerequisite_course_numbers": legacy_extract_prerequisite_course_numbers(course_data),
+            "equivalent_course_numbers": legacy_extract_equivalent_course_numbers(course_data),
+            "learning_objectives": re.findall(r"\([A-Z]+\)", course_data),
+            "department_url": department_url,
+        })
+    return courses
+
+
+def legacy_extract_prerequisite_data(txt):
+    pre_reqs = re.split("Enforced Prerequisite at Enrollment: ", txt)
+    return pre_reqs[1:] if len(pre_reqs) > 1 else []
+
+
+def legacy_extract_equivalent_course_numbers(txt):
+    equivalent_matches = []
+    for match in legacy_extract_prerequisite_data(txt):
+        equivalent_matches.extend(re.split(r"\sor\s", match))
+    return equivalent_matches
+
+
+def legacy_extract_prerequisite_course_numbers(txt):
+    return [re.sub("\xa0", " ", match) for match in re.findall(r"[A-Z]+\s[0-9]+", txt)]
+
+
+def legacy_extract_credits(txt):
+    txt = txt.lower().strip()
+    range_credit_pattern = r"(\d+)-(\d+)\s+credits?"
+    max_credit_pattern = r"maximum of (\d+)\s+credits?"
+    single_credit_pattern = r"(\d+)\s+credits?"
+
+    if "/" in txt:
+        min_credits, max_credits = None, None
+        for part in txt.split("/"):
+            match = re.search(range_credit_pattern, part)
+            if match:
+                min_credits, max_credits = int(match.group(1)), int(match.group(2))
+            match = re.search(max_credit_pattern, part)
+            if match:
+                max_credits = int(match.group(1))
+        if min_credits is not None and max_credits is not None:
+            return (min_credits, max_credits)
+        elif max_credits is not None:
+            return (0, max_credits)
+
+    match = re.search(range_credit_pattern, txt)
+    if match:
+        return int(match.group(1)), int(match.group(2))
+    match = re.search(max_credit_pattern, txt)
+    if match:
+        return (0, int(match.group(1)))
+    match = re.search(single_credit_pattern, txt)
+    if match:
+        return int(match.group(1))
+    return None
+
+
+# saved pages
+
+def cached_department_pages(cache_dir):
+    """(url, body) of every cached course-description department page"""
+    pages = []
+    for index_file in glob.glob(os.path.join(cache_dir, "index", "*.json")):
+        with open(index_file, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        url = entry.get("url", "")
+        if not url.startswith(BASE_URL) or url.rstrip("/") == BASE_URL.rstrip("/"):
+            continue
+        with open(os.path.join(cache_dir, "objects", entry["content_hash"]), "rb") as f:
+            pages.append((url, f.read()))
+    return pages
+
+
+def directory_pages(directory):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.html"))):
+        with open(path, "rb") as f:
+            pages.append((path, f.read()))
+    return pages
+
+
+def synthetic_pages(n_pages, courses_per_page=60, n_nav_links=250):
+    pages = []
+    for p in range(n_pages):
+        prefix = f"DEPT{p}".replace("0", "A").replace("1", "B").upper()[:6]
+        blocks = []
+        for c in range(courses_per_page):
+            number = 100 + c
+            extra = (
+                f"Enforced Prerequisite at Enrollment: {prefix}&#160;{number - 1} or MATH&#160;{20 + c % 5} "
+                f"or STAT&#160;200<br/>Cross-listed with: ENGR&#160;{number}<br/>"
+                f"General Education: Quantification (GQ)<br/>GenEd Learning Objective: Crit &amp; Analytical Think (CRIT)"
+                if c % 3 else "General Education: Humanities (GH)"
+            )
+            credits = "1-12 Credits/Maximum of 12" if c % 10 == 0 else "3 Credits"
+            blocks.append(
+                f'<div class="courseblock"><div class="courseblocktitle"><strong>{prefix}&#160;{number}: '
+                f'Course Title {c}</strong></div><div class="courseblockdesc"><p>{credits}</p>'
+                f"<p>{'Course description text with several sentences about the topic. ' * 6}</p></div>"
+                f'<div class="courseblockextra noindent">{extra}</div></div>'
+            )
+        # bulletin pages carry the full site navigation (every department) around the course list
+        nav = "".join(f'<li><a href="/university-course-descriptions/undergraduate/d{i}/">Department {i} (D{i})</a></li>' for i in range(n_nav_links))
+        html = (
+            f'<html><head><title>{prefix}</title></head><body><nav id="cl-menu"><ul class="nav levelone">{nav}</ul></nav>'
+            f'<div id="textcontainer">{"".join(blocks)}</div><footer>{nav}</footer></body></html>'
+        )
+        pages.append((f"{BASE_URL}dept{p}/", html.encode("utf-8")))
+    return pages
+
+
+def bench(extract, soups, repeat):
+    extract_all = lambda: [course for url, soup in soups for course in extract(soup, url)]
+    courses = extract_all()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        extract_all()
+    return (time.perf_counter() - start) / repeat, courses
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", help="directory of saved department .html pages")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--synthetic", type=int, default=0, help="number of generated pages when nothing is saved")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.pages:
+        pages, source = directory_pages(args.pages), args.pages
+    else:
+        pages, source = cached_department_pages(args.cache_dir) if os.path.isdir(args.cache_dir) else [], args.cache_dir
+    if not pages and args.synthetic:
+        pages, source = synthetic_pages(args.synthetic), "synthetic"
+    if not pages:
+        parser.error(f"no saved department pages in {source} -> crawl first, pass --pages or --synthetic N")
+
+    soups = [(url, BeautifulSoup(content, "html.parser")) for url, content in pages]
+
+    before, legacy_courses = bench(legacy_extract_courses, soups, args.repeat)
+    after, courses = bench(extract_courses_from_soup, soups, args.repeat)
+    assert courses == legacy_courses, "single-pass parser changed the extracted records"
+
+    print(f"{len(pages)} pages ({source}), {len(courses)} courses, identical records")
+    for name, seconds in (("per-field", before), ("single-pass", after)):
+        print(f"  {name:12s} {seconds * 1000:8.1f} ms  {len(courses) / seconds:9.0f} courses/s")
+    print(f"  speedup {before / after:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""
+End-to-end crawler benchmark over the offline fixture corpus.
+
+Runs the course crawl (scrape_psu_courses), the major crawl
+(crawl_major_requirements -> major_requirements_from_document per page, as
+generate_major_requirements does) and data_cleaner against the replayed
+corpus, in a scratch directory so neither bulletins.psu.edu nor the real
+output files are touched. Record a corpus first with fixture_corpus.py.
+
+Every stage runs in a fresh subprocess, so its peak RSS is its own and no
+warm state leaks between stages or runs. Per stage: wall seconds, pages (or
+rows), pages/sec, process CPU seconds and peak RSS; per extractor (html
+parse, course blocks, each major extractor): calls and thread CPU seconds.
+
+Results are medians over --repeat runs, written as JSON tagged with the
+corpus fingerprint, parser backend, python version and git revision;
+--compare an earlier JSON to print the change in every metric.
+
+usage: python bench_crawl.py [--corpus fixtures/bulletins] [--repeat 3] [--workers 8]
+                             [--out bench_crawl.json] [--compare old.json]
+"""
+
+import argparse
+import functools
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from fixture_corpus import CORPUS_DIR, FixtureCorpus, use_corpus
+
+STAGES = ("courses", "majors", "clean")
+CRAWLER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class CpuProfile:
+    """calls + thread CPU seconds of wrapped functions, summed across crawler threads"""
+
+    def __init__(self):
+        self.calls = {}
+        self.cpu_seconds = {}
+        self.lock = threading.Lock()
+
+    def wrap(self, name, fn):
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            start = time.thread_time()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                seconds = time.thread_time() - start
+                with self.lock:
+                    self.calls[name] = self.calls.get(name, 0) + 1
+                    self.cpu_seconds[name] = self.cpu_seconds.get(name, 0.0) + seconds
+
+        return timed
+
+    def to_dict(self):
+        return {name: {"calls": self.calls[name], "cpu_seconds": self.cpu_seconds[name]} for name in self.calls}
+
+
+def instrument(profile):
+    """wrap the parse step and every extractor; the crawlers look these up at call time"""
+    import page_document
+    import psu_major_requirements_crawler as majors
+    import psu_undergrad_course_crawler as courses
+
+    page_document.make_soup = profile.wrap("parse", page_document.make_soup)
+    courses.extract_courses_from_soup = profile.wrap("course_blocks", courses.extract_courses_from_soup)
+    for name, extractor in majors.MAJOR_EXTRACTORS.items():
+        majors.MAJOR_EXTRACTORS[name] = profile.wrap(name, extractor)
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    return resource.getrusage(who).ru_maxrss / 1024  # kilobytes on linux
+
+
+def run_stage(stage, workers):
+    """run one stage in this (fresh) process -> metrics dict"""
+    import page_document
+    from crawl_scheduler import CrawlScheduler
+
+    # replay is local -> no politeness limit, only the worker count bounds concurrency
+    scheduler = CrawlScheduler(max_workers=workers, requests_per_second=1e9, burst=workers)
+    profile = CpuProfile()
+    instrument(profile)
+
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    if stage == "courses":
+        from psu_undergrad_course_crawler import scrape_psu_courses
+
+        scrape_psu_courses(scheduler=scheduler)
+        units = page_document.PageDocument.request_count
+    elif stage == "majors":
+        from psu_major_requirements_crawler import crawl_major_requirements
+
+        crawl_major_requirements(scheduler=scheduler)
+        units = page_document.PageDocument.request_count
+    else:
+        from data_cleaner import clean_csv
+
+        units = clean_csv()
+    wall = time.perf_counter() - start_wall
+
+    return {
+        "wall_seconds": wall,
+        "cpu_seconds": time.process_time() - start_cpu,
+        "units": units,  # pages fetched, rows for clean
+        "units_per_second": units / wall if wall else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "failures": scheduler.stats.failures,
+        "extractors": profile.to_dict(),
+    }
+
+
+def stage_main(args):
+    """child process entry: replay the corpus, run one stage, print its metrics as JSON"""
+    use_corpus(FixtureCorpus(args.corpus))
+    os.chdir(args.workdir)
+
+    real_stdout = sys.stdout
+    with open(os.devnull, mode="w") as devnull:
+        sys.stdout = devnull  # the crawlers print per page; a terminal would dominate the timings
+        try:
+            metrics = run_stage(args.stage, args.workers)
+        finally:
+            sys.stdout = real_stdout
+    print(json.dumps(metrics))
+
+
+def run_pipeline(corpus_dir, workers):
+    """one full courses -> majors -> clean run in a scratch directory -> {stage: metrics}"""
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for stage in STAGES:
+            command = [
+                sys.executable, os.path.abspath(__file__), "--stage", stage,
+                "--corpus", os.path.abspath(corpus_dir), "--workdir", workdir, "--workers", str(workers),
+            ]
+            done = subprocess.run(command, capture_output=True, text=True)
+            if done.returncode != 0:
+                error = (done.stderr.strip().splitlines() or ["exit status %d" % done.returncode])[-1]
+                results[stage] = {"error": error}
+                print(f"  {stage}: FAILED ({error})")
+                continue
+            results[stage] = json.loads(done.stdout.strip().splitlines()[-1])
+    return results
+
+
+def summarize(runs):
+    """median of every metric over runs (stages that failed in any run are reported as failed)"""
+    summary = {}
+    for stage in STAGES:
+        stage_runs = [run[stage] for run in runs]
+        errors = [r["error"] for r in stage_runs if "error" in r]
+        if errors:
+            summary[stage] = {"error": errors[0]}
+            continue
+
+        metrics = {key: statistics.median(r[key] for r in stage_runs) for key in stage_runs[0] if key != "extractors"}
+        metrics["extractors"] = {
+            name: {
+                "calls": stage_runs[0]["extractors"][name]["calls"],
+                "cpu_seconds": statistics.median(r["extractors"][name]["cpu_seconds"] for r in stage_runs),
+            }
+            for name in stage_runs[0]["extractors"]
+        }
+        summary[stage] = metrics
+    return summary
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=CRAWLER_DIR
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def report(summary):
+    print(f"\n{'stage':<8} {'wall s':>8} {'cpu s':>8} {'units':>7} {'units/s':>9} {'peak MB':>8}")
+    for stage, m in summary.items():
+        if "error" in m:
+            print(f"{stage:<8} failed: {m['error']}")
+            continue
+        print(
+            f"{stage:<8} {m['wall_seconds']:>8.2f} {m['cpu_seconds']:>8.2f} {m['units']:>7.0f} "
+            f"{m['units_per_second']:>9.1f} {m['peak_rss_mb']:>8.1f}"
+        )
+        for name, e in sorted(m["extractors"].items(), key=lambda kv: -kv[1]["cpu_seconds"]):
+            print(f"\t{name:<24} {e['calls']:>6} calls {e['cpu_seconds']:>8.3f}s cpu")
+
+
+def compare(summary, meta, previous):
+    print(f"\nvs {previous['meta'].get('git_revision')} ({previous['meta'].get('timestamp')})")
+    if previous["meta"].get("corpus_fingerprint") != meta["corpus_fingerprint"]:
+        print("  WARNING: different fixture corpus -> numbers are not comparable")
+    for stage, m in summary.items():
+        old = previous["stages"].get(stage, {})
+        if "error" in m or "error" in old or not old:
+            continue
+        changes = []
+        for key in ("wall_seconds", "cpu_seconds", "units_per_second", "peak_rss_mb"):
+            if old.get(key):
+                changes.append(f"{key} {old[key]:.2f} -> {m[key]:.2f} ({(m[key] / old[key] - 1) * 100:+.1f}%)")
+        print(f"  {stage:<8} " + " | ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", default=CORPUS_DIR)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--out", default="bench_crawl.json")
+    parser.add_argument("--compare", help="earlier --out file to compare against")
+    # internal: run a single stage in this process
+    parser.add_argument("--stage", choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.stage:
+        stage_main(args)
+        return
+
+    corpus = FixtureCorpus(args.corpus)
+    if not len(corpus):
+        parser.error(f"empty fixture corpus at {args.corpus} -> python fixture_corpus.py record (or import-cache)")
+
+    import page_document
+
+    meta = {
+        "corpus": os.path.abspath(args.corpus),
+        "corpus_fingerprint": corpus.fingerprint(),
+        "corpus_pages": len(corpus),
+        "html_parser": page_document.HTML_PARSER,
+        "workers": args.workers,
+        "repeat": args.repeat,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "git_revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    print(f"corpus {meta['corpus_fingerprint']} ({len(corpus)} pages), parser {meta['html_parser']}, {args.workers} workers")
+
+    runs = []
+    for i in range(args.repeat):
+        print(f"run {i + 1}/{args.repeat}")
+        runs.append(run_pipeline(args.corpus, args.workers))
+
+    summary = summarize(runs)
+    report(summary)
+
+    with open(args.out, mode="w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "stages": summary, "runs": runs}, f, indent=2)
+    print(f"\nresults written to {args.out}")
+
+    if args.compare:
+        with open(args.compare, mode="r", encoding="utf-8") as f:
+            compare(summary, meta, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Benchmark: HTML parse time per parser backend, with and without a SoupStrainer.
+
+For every installed backend (html.parser, lxml, html5lib) the saved pages
+are parsed in full and, for department pages, parsed with COURSE_BLOCKS so
+only the .courseblock subtrees are built. Records extracted from every
+variant are compared with the html.parser full parse; a backend that
+changes any record is reported as such and should not be used for crawling.
+
+Pages come from the fetcher's http cache (department and major pages of a
+previous crawl), a directory of saved department .html files, or
+--synthetic bulletin-shaped department pages.
+
+usage: python bench_html_parser.py [--pages DIR] [--cache-dir .http_cache] [--synthetic 40] [--repeat 3]
+                                   [--out bench_html_parser.md]
+
+bench_html_parser.md next to this file is the last committed run.
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import sys
+import time
+
+import bs4
+from bs4 import FeatureNotFound
+
+from bench_course_parser import directory_pages, synthetic_pages
+from fetcher import CACHE_DIR
+from page_document import HTML_PARSER, make_soup
+from psu_major_requirements_crawler import MAJOR_EXTRACTORS
+from psu_undergrad_course_crawler import BASE_URL, COURSE_BLOCKS, extract_courses_from_soup
+
+BACKENDS = ("html.parser", "lxml", "html5lib")
+MAJOR_PAGE_MARKER = "/undergraduate/colleges/"
+
+
+def cached_pages(cache_dir):
+    """cached pages split into (department pages, major pages) of (url, body)"""
+    departments, majors = [], []
+    for index_file in glob.glob(os.path.join(cache_dir, "index", "*.json")):
+        with open(index_file, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        url = entry.get("url", "")
+        if url.startswith(BASE_URL) and url.rstrip("/") != BASE_URL.rstrip("/"):
+            pages = departments
+        elif MAJOR_PAGE_MARKER in url and "#" not in url:
+            pages = majors
+        else:
+            continue
+        with open(os.path.join(cache_dir, "objects", entry["content_hash"]), "rb") as f:
+            pages.append((url, f.read()))
+    return departments, majors
+
+
+def department_records(soup, url):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return extract_courses_from_soup(soup, url)
+
+
+def major_records(soup, url):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return {name: extractor(soup, url) for name, extractor in MAJOR_EXTRACTORS.items()}
+
+
+def time_parse(pages, parser, parse_only, repeat):
+    """seconds per pass over all pages, and the soups of the last pass"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        soups = [(url, make_soup(content, parser=parser, parse_only=parse_only)) for url, content in pages]
+    return (time.perf_counter() - start) / repeat, soups
+
+
+def compare(name, pages, records, variants, repeat):
+    """time every (backend, strainer) variant over pages -> rows for the report"""
+    rows = []
+    baseline = None
+    for parser, parse_only in variants:
+        try:
+            seconds, soups = time_parse(pages, parser, parse_only, repeat)
+        except FeatureNotFound:
+            rows.append((name, parser, parse_only is not None, None, "not installed"))
+            continue
+
+        extracted = [records(soup, url) for url, soup in soups]
+        if baseline is None:
+            baseline = extracted
+        status = "identical" if extracted == baseline else "RECORDS DIFFER"
+        rows.append((name, parser, parse_only is not None, seconds, status))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", help="directory of saved department .html pages")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--synthetic", type=int, default=0, help="number of generated department pages when nothing is saved")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", help="also write the table as markdown, e.g. bench_html_parser.md")
+    args = parser.parse_args()
+
+    departments, majors = [], []
+    if args.pages:
+        departments = directory_pages(args.pages)
+    elif os.path.isdir(args.cache_dir):
+        departments, majors = cached_pages(args.cache_dir)
+    if not departments and args.synthetic:
+        departments = synthetic_pages(args.synthetic)
+    if not departments and not majors:
+        parser.error("no saved pages -> crawl first, pass --pages or --synthetic N")
+
+    rows = []
+    if departments:
+        # the html.parser full parse comes first: it is the reference every variant must match
+        variants = [(backend, strain) for backend in BACKENDS for strain in (None, COURSE_BLOCKS)]
+        rows += compare("department", departments, department_records, variants, args.repeat)
+    if majors:
+        rows += compare("major", majors, major_records, [(backend, None) for backend in BACKENDS], args.repeat)
+
+    size_mb = sum(len(content) for _, content in departments + majors) / 1e6
+    source = "synthetic" if args.synthetic and not args.pages and not majors else "saved"
+    print(f"{len(departments)} department pages, {len(majors)} major pages ({size_mb:.1f} MB), mean of {args.repeat} passes")
+    print(f"{'pages':<12} {'parser':<12} {'strainer':<9} {'parse ms':>10} {'speedup':>8}  records")
+
+    reference = {}
+    table = []
+    for name, backend, strained, seconds, status in rows:
+        if seconds is None:
+            print(f"{name:<12} {backend:<12} {str(strained):<9} {'-':>10} {'-':>8}  {status}")
+            table.append((name, backend, strained, "-", "-", status))
+            continue
+        reference.setdefault(name, seconds)
+        print(
+            f"{name:<12} {backend:<12} {str(strained):<9} {seconds * 1000:>10.1f} "
+            f"{reference[name] / seconds:>7.2f}x  {status}"
+        )
+        table.append((name, backend, strained, f"{seconds * 1000:.1f}", f"{reference[name] / seconds:.2f}x", status))
+
+    if args.out:
+        summary = (
+            f"{len(departments)} {source} department pages, {len(majors)} major pages "
+            f"({size_mb:.1f} MB), mean of {args.repeat} passes"
+        )
+        write_report(args.out, summary, table)
+        print(f"report written to {args.out}")
+
+
+def write_report(path, summary, table):
+    """markdown copy of the comparison, with the parser crawls currently default to"""
+    lines = [
+        "# HTML parser backends",
+        "",
+        f"Generated by `python bench_html_parser.py {' '.join(sys.argv[1:])}`.",
+        "",
+        f"{summary}; python {platform.python_version()}, beautifulsoup4 {bs4.__version__}.",
+        "",
+        "| pages | parser | strainer | parse ms | speedup | records |",
+        "|---|---|---|---:|---:|---|",
+    ]
+    lines += [f"| {' | '.join(str(cell) for cell in row)} |" for row in table]
+    lines += [
+        "",
+        f"Crawls parse with `{HTML_PARSER}` (`CRAWLER_HTML_PARSER`, default `html.parser`). html.parser ships",
+        "with python, so a fresh checkout crawls without extra packages. When lxml is installed and",
+        "its rows above say `identical`, `CRAWLER_HTML_PARSER=lxml` gives the same records faster.",
+        "",
+    ]
+    with open(path, mode="w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+if __name__ == "__main__":
+    main()
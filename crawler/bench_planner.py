@@ -0,0 +1,60 @@
+"""
+Benchmark: plan every major in major_requirements.csv.
+
+Each major is planned from scratch and re-planned with the first half of its
+required courses already completed (the interactive "what if" case). The
+target is well under 100 ms per plan.
+
+usage: python bench_planner.py [--cap 18] [--repeat 20]
+"""
+
+import argparse
+import statistics
+import time
+
+from semester_planner import DEFAULT_CREDIT_CAP, SemesterPlanner
+
+TARGET_MS = 100
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cap", type=int, default=DEFAULT_CREDIT_CAP)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    planner = SemesterPlanner.load()
+    print(f"Loaded {len(planner.majors)} majors + graph of {len(planner.graph)} courses "
+          f"in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    print(f"{'major':>8} {'courses':>8} {'semesters':>10} {'fresh ms':>9} {'replan ms':>10}")
+    timings = []
+    for code, major in planner.majors.items():
+        completed = [bundle[0] for r in major.required[: len(major.required) // 2] for bundle in r.alternatives[:1]]
+
+        samples = {}
+        for name, taken in (("fresh", ()), ("replan", completed)):
+            planner.plan(code, taken, args.cap)  # warm up
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                plan = planner.plan(code, taken, args.cap)
+            samples[name] = (time.perf_counter() - start) / args.repeat * 1000
+            timings.append(samples[name])
+
+        print(f"{code:>8} {len(plan.credits):>8} {len(plan.semesters):>10} {samples['fresh']:>9.2f} {samples['replan']:>10.2f}")
+
+    print(
+        f"\nplans: {len(timings)} | mean {statistics.mean(timings):.2f}ms | p50 {percentile(timings, 50):.2f}ms "
+        f"| p95 {percentile(timings, 95):.2f}ms | max {max(timings):.2f}ms "
+        f"| over {TARGET_MS}ms: {sum(t > TARGET_MS for t in timings)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+"""
+Typed SQLite store for crawl results.
+
+The crawlers used to hand everything downstream as CSV with python reprs
+(credit_breakdown dicts, course lists) and raw HTML (min_credit_info), so
+every consumer re-ran ast.literal_eval row by row. The store keeps the same
+data normalized:
+
+    majors               major_id, major_code, major_title, min_credits, comments (json)
+    credit_categories    major_id, category, min_credits, max_credits
+    selection_groups     group_id, major_id, label, min_credits, min_courses
+    requirements         requirement_id, major_id, group_id (NULL unless selectable),
+                         kind, label, needs_c_or_better
+    requirement_courses  requirement_id, alternative, course_number, credits
+    courses              course_id, course_number, course_prefix, course_name, credits_min,
+                         credits_max, description, learning_objectives, department_url
+    course_prerequisites course_id, group_index, prerequisite        (AND of OR-groups)
+    course_equivalents   course_id, equivalent
+
+Ids are derived from natural keys (stable_id), so a major or course keeps
+its id across re-crawls and rebuilds and other stores can reference it.
+"""
+
+import hashlib
+import json
+import sqlite3
+
+from csv_values import literal_list, parse_course_credits
+from prereq_graph import normalize_course_number, parse_prerequisite_groups
+from requirement_groups import MajorRequirements, Requirement, SelectionGroup
+
+CATALOG_FILE = "catalog.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS majors (
+    major_id INTEGER PRIMARY KEY,
+    major_code TEXT NOT NULL UNIQUE,
+    major_title TEXT NOT NULL,
+    min_credits INTEGER NOT NULL,
+    comments TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS credit_categories (
+    major_id INTEGER NOT NULL REFERENCES majors (major_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    min_credits INTEGER NOT NULL,
+    max_credits INTEGER NOT NULL,
+    PRIMARY KEY (major_id, category)
+);
+CREATE TABLE IF NOT EXISTS selection_groups (
+    group_id INTEGER PRIMARY KEY,
+    major_id INTEGER NOT NULL REFERENCES majors (major_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    label TEXT NOT NULL,
+    min_credits INTEGER NOT NULL,
+    min_courses INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS requirements (
+    requirement_id INTEGER PRIMARY KEY,
+    major_id INTEGER NOT NULL REFERENCES majors (major_id) ON DELETE CASCADE,
+    group_id INTEGER REFERENCES selection_groups (group_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    label TEXT NOT NULL,
+    needs_c_or_better INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS requirement_courses (
+    requirement_id INTEGER NOT NULL REFERENCES requirements (requirement_id) ON DELETE CASCADE,
+    alternative INTEGER NOT NULL,
+    course_number TEXT NOT NULL,
+    credits INTEGER,
+    PRIMARY KEY (requirement_id, alternative, course_number)
+);
+CREATE TABLE IF NOT EXISTS courses (
+    course_id INTEGER PRIMARY KEY,
+    course_number TEXT NOT NULL UNIQUE,
+    course_prefix TEXT NOT NULL,
+    course_name TEXT NOT NULL,
+    credits_min INTEGER,
+    credits_max INTEGER,
+    description TEXT NOT NULL,
+    learning_objectives TEXT NOT NULL,
+    department_url TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS course_prerequisites (
+    course_id INTEGER NOT NULL REFERENCES courses (course_id) ON DELETE CASCADE,
+    group_index INTEGER NOT NULL,
+    prerequisite TEXT NOT NULL,
+    PRIMARY KEY (course_id, group_index, prerequisite)
+);
+CREATE TABLE IF NOT EXISTS course_equivalents (
+    course_id INTEGER NOT NULL REFERENCES courses (course_id) ON DELETE CASCADE,
+    equivalent TEXT NOT NULL,
+    PRIMARY KEY (course_id, equivalent)
+);
+CREATE INDEX IF NOT EXISTS requirements_major ON requirements (major_id, position);
+CREATE INDEX IF NOT EXISTS selection_groups_major ON selection_groups (major_id, position);
+CREATE INDEX IF NOT EXISTS requirement_courses_course ON requirement_courses (course_number);
+CREATE INDEX IF NOT EXISTS courses_prefix ON courses (course_prefix);
+CREATE INDEX IF NOT EXISTS course_prerequisites_prerequisite ON course_prerequisites (prerequisite);
+"""
+
+
+def stable_id(*parts):
+    """natural key -> positive 63 bit id, identical on every run"""
+    digest = hashlib.sha1("\x1f".join(str(p) for p in parts).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") >> 1
+
+
+def course_prerequisite_groups(record):
+    """same groups PrerequisiteGraph.from_csv builds for a course record"""
+    groups = parse_prerequisite_groups(literal_list(record.get("prerequisite_data", "")))
+    if not groups:
+        groups = [[normalize_course_number(c)] for c in literal_list(record.get("prerequisite_course_numbers", ""))]
+    return groups
+
+
+class CatalogStore:
+    def __init__(self, path=CATALOG_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # writing
+
+    def write_majors(self, records):
+        """major crawler records (python objects or their CSV strings) -> replaces those majors' rows"""
+        with self.conn:
+            for record in records:
+                major = MajorRequirements.from_record(record)
+                self.write_major(major, literal_list(record.get("comments")))
+
+    def write_major(self, major, comments=()):
+        major_id = stable_id("major", major.code)
+        # children cascade, so a re-crawled major never keeps requirements it dropped
+        self.conn.execute("DELETE FROM majors WHERE major_id = ?", (major_id,))
+        self.conn.execute(
+            "INSERT INTO majors VALUES (?, ?, ?, ?, ?)",
+            (major_id, major.code, major.title, major.total_credits, json.dumps(list(comments))),
+        )
+        self.conn.executemany(
+            "INSERT INTO credit_categories VALUES (?, ?, ?, ?, ?)",
+            [(major_id, i, category, low, high) for i, (category, (low, high)) in enumerate(major.credit_breakdown.items())],
+        )
+
+        position = 0
+        for requirement in major.required:
+            self.insert_requirement(major, major_id, None, position, requirement)
+            position += 1
+
+        for g, group in enumerate(major.selections):
+            group_id = stable_id("group", major.code, g, group.label)
+            self.conn.execute(
+                "INSERT INTO selection_groups VALUES (?, ?, ?, ?, ?, ?)",
+                (group_id, major_id, g, group.label, group.min_credits, group.min_courses),
+            )
+            for candidate in group.candidates:
+                self.insert_requirement(major, major_id, group_id, position, candidate)
+                position += 1
+
+    def insert_requirement(self, major, major_id, group_id, position, requirement):
+        requirement_id = stable_id("requirement", major.code, group_id or "", requirement.kind, requirement.label)
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO requirements VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (requirement_id, major_id, group_id, position, requirement.kind, requirement.label, int(requirement.needs_c_or_better)),
+        )
+        if cursor.rowcount == 0:  # same course listed twice in one group
+            return
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO requirement_courses VALUES (?, ?, ?, ?)",
+            [
+                (requirement_id, a, course, major.credits.get(course))
+                for a, bundle in enumerate(requirement.alternatives)
+                for course in bundle
+            ],
+        )
+
+    def write_courses(self, records):
+        """course crawler records -> upserted courses with their prerequisite groups"""
+        with self.conn:
+            for record in records:
+                course_number = normalize_course_number(record["course_number"])
+                course_id = stable_id("course", course_number)
+                credits_min, credits_max = parse_course_credits(record.get("credits"))
+
+                self.conn.execute("DELETE FROM courses WHERE course_id = ?", (course_id,))
+                self.conn.execute(
+                    "INSERT INTO courses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        course_id,
+                        course_number,
+                        course_number.split(" ")[0],
+                        record.get("course_name", ""),
+                        credits_min,
+                        credits_max,
+                        record.get("description", ""),
+                        ",".join(code.strip("()") for code in literal_list(record.get("learning_objectives", ""))),
+                        record.get("department_url", ""),
+                    ),
+                )
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO course_prerequisites VALUES (?, ?, ?)",
+                    [(course_id, g, c) for g, group in enumerate(course_prerequisite_groups(record)) for c in group],
+                )
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO course_equivalents VALUES (?, ?)",
+                    [(course_id, normalize_course_number(c)) for c in literal_list(record.get("equivalent_course_numbers", ""))],
+                )
+
+    def delete_majors(self, major_codes):
+        with self.conn:
+            self.conn.executemany("DELETE FROM majors WHERE major_id = ?", [(stable_id("major", c),) for c in major_codes])
+
+    def delete_courses(self, course_numbers):
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM courses WHERE course_id = ?",
+                [(stable_id("course", normalize_course_number(c)),) for c in course_numbers],
+            )
+
+    # reading
+
+    def load_majors(self, major_codes=None):
+        """major_code -> MajorRequirements, straight from the typed tables (all majors or just major_codes)"""
+        where, params = "", ()
+        if major_codes is not None:
+            major_ids = [stable_id("major", code) for code in major_codes]
+            where = f"WHERE major_id IN ({','.join('?' * len(major_ids))})"
+            params = tuple(major_ids)
+
+        majors = {}
+        by_id = {}
+        for major_id, code, title, min_credits in self.conn.execute(
+            f"SELECT major_id, major_code, major_title, min_credits FROM majors {where} ORDER BY major_code", params
+        ):
+            majors[code] = by_id[major_id] = MajorRequirements(code, title, {}, min_credits, [], [], {})
+
+        for major_id, category, low, high in self.conn.execute(
+            f"SELECT major_id, category, min_credits, max_credits FROM credit_categories {where} ORDER BY major_id, position",
+            params,
+        ):
+            if major_id in by_id:
+                by_id[major_id].credit_breakdown[category] = (low, high)
+
+        groups = {}
+        for group_id, major_id, label, min_credits, min_courses in self.conn.execute(
+            f"SELECT group_id, major_id, label, min_credits, min_courses FROM selection_groups {where} ORDER BY major_id, position",
+            params,
+        ):
+            if major_id in by_id:
+                groups[group_id] = SelectionGroup(label, [], min_credits, min_courses)
+                by_id[major_id].selections.append(groups[group_id])
+
+        requirements = {}  # requirement_id -> (Requirement, owning MajorRequirements)
+        for requirement_id, major_id, group_id, kind, label, c_or_better in self.conn.execute(
+            f"SELECT requirement_id, major_id, group_id, kind, label, needs_c_or_better FROM requirements {where} "
+            "ORDER BY major_id, position",
+            params,
+        ):
+            if major_id not in by_id:
+                continue
+            requirement = Requirement(label, [], kind, bool(c_or_better))
+            requirements[requirement_id] = requirement, by_id[major_id]
+            if group_id is None:
+                by_id[major_id].required.append(requirement)
+            else:
+                groups[group_id].candidates.append(requirement)
+
+        for requirement_id, alternative, course_number, credits in self.conn.execute(
+            "SELECT requirement_id, alternative, course_number, credits FROM requirement_courses "
+            f"WHERE requirement_id IN (SELECT requirement_id FROM requirements {where}) "
+            "ORDER BY requirement_id, alternative, rowid",
+            params,
+        ):
+            if requirement_id not in requirements:
+                continue
+            requirement, major = requirements[requirement_id]
+            if alternative == len(requirement.alternatives):
+                requirement.alternatives.append(())
+            requirement.alternatives[alternative] += (course_number,)
+            if credits is not None:
+                major.credits.setdefault(course_number, credits)
+        return majors
+
+    def prerequisite_groups(self):
+        """course number -> [[alternatives], ...] for PrerequisiteGraph.from_groups"""
+        course_groups = {}
+        for (course_number,) in self.conn.execute("SELECT course_number FROM courses ORDER BY course_number"):
+            course_groups[course_number] = []
+
+        for course_number, group_index, prerequisite in self.conn.execute(
+            "SELECT c.course_number, p.group_index, p.prerequisite FROM course_prerequisites p "
+            "JOIN courses c USING (course_id) ORDER BY c.course_number, p.group_index, p.rowid"
+        ):
+            groups = course_groups[course_number]
+            if group_index == len(groups):
+                groups.append([])
+            groups[group_index].append(prerequisite)
+        return course_groups
+
+    def course_credits(self):
+        """course number -> minimum credits"""
+        return dict(self.conn.execute("SELECT course_number, credits_min FROM courses WHERE credits_min IS NOT NULL"))
+
+    def courses(self, prefix=None):
+        """course rows as dicts, optionally one department by its indexed prefix"""
+        query, params = "SELECT * FROM courses", ()
+        if prefix is not None:
+            query, params = query + " WHERE course_prefix = ?", (prefix,)
+        cursor = self.conn.execute(query + " ORDER BY course_number", params)
+        columns = [c[0] for c in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+
+    def major_comments(self):
+        """major_code -> bulletin comments"""
+        return {code: json.loads(comments) for code, comments in self.conn.execute("SELECT major_code, comments FROM majors")}
+
+    def counts(self):
+        return {
+            table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("majors", "requirements", "selection_groups", "courses", "course_prerequisites")
+        }
+
+
+if __name__ == "__main__":
+    import sys
+
+    import pandas as pd
+
+    from requirement_groups import COURSES_FILE, MAJOR_FILE
+
+    # one-off import of existing CSV output: python catalog_store.py [majors.csv] [courses.csv]
+    major_file = sys.argv[1] if len(sys.argv) > 1 else MAJOR_FILE
+    courses_file = sys.argv[2] if len(sys.argv) > 2 else COURSES_FILE
+
+    with CatalogStore() as store:
+        store.write_majors(pd.read_csv(major_file, dtype=str, keep_default_na=False).to_dict("records"))
+        try:
+            store.write_courses(pd.read_csv(courses_file, dtype=str, keep_default_na=False).to_dict("records"))
+        except FileNotFoundError:
+            print(f"[Catalog] {courses_file} not found, majors only")
+        print(f"[Catalog] {CATALOG_FILE}: {store.counts()}")
@@ -0,0 +1,139 @@
+"""
+Incremental re-crawl support.
+
+The manifest remembers, for every crawled url, the hash of the page content
+and the ids of the records extracted from it:
+
+    {url: {"content_hash": "...", "record_ids": ["CMPSC 121", ...]}}
+
+On the next run a page whose hash is unchanged keeps its previous records
+without being parsed again, so only changed pages pay for extraction. Every
+run also writes a changes file listing the record ids that were added or
+updated and the ones that disappeared, so downstream stores (the vector
+store) only patch what changed.
+"""
+
+import json
+import os
+
+from crawl_scheduler import CrawlScheduler
+from fetcher import write_atomic
+from page_document import PageDocument
+
+UNCHANGED = "unchanged"
+
+
+class CrawlManifest:
+    def __init__(self, path):
+        self.path = path
+        self.pages = {}
+
+        if os.path.exists(path):
+            with open(path, mode="r", encoding="utf-8") as f:
+                self.pages = json.load(f)
+
+    def is_unchanged(self, url, content_hash):
+        page = self.pages.get(url)
+        return page is not None and page["content_hash"] == content_hash
+
+    def record_ids(self, url):
+        return self.pages.get(url, {}).get("record_ids", [])
+
+    def update(self, url, content_hash, record_ids):
+        self.pages[url] = {"content_hash": content_hash, "record_ids": list(record_ids)}
+
+    def save(self):
+        write_atomic(self.path, json.dumps(self.pages, indent=1).encode("utf-8"))
+
+
+class CrawlChanges:
+    """record ids touched by one crawl -> consumed by downstream incremental updates"""
+
+    def __init__(self):
+        self.upserted = []
+        self.removed = []
+        self.changed_urls = []
+        self.unchanged_urls = []
+
+    def save(self, path):
+        changes = {"upserted": self.upserted, "removed": self.removed}
+        write_atomic(path, json.dumps(changes, indent=1).encode("utf-8"))
+
+    def report(self):
+        print(
+            f"[Incremental] {len(self.changed_urls)} pages changed, "
+            f"{len(self.unchanged_urls)} unchanged | "
+            f"{len(self.upserted)} records upserted, {len(self.removed)} removed"
+        )
+
+
+def load_changes(path):
+    """(upserted ids, removed ids) from a changes file written by crawl_incrementally"""
+    with open(path, mode="r", encoding="utf-8") as f:
+        changes = json.load(f)
+    return changes["upserted"], changes["removed"]
+
+
+def crawl_incrementally(urls, extract, record_id, manifest, previous_records, scheduler=None, parse_only=None):
+    """crawl urls re-extracting only the pages whose content changed since the manifest was written
+
+    extract(document) -> list of records for a PageDocument
+    record_id(record) -> stable id of a record (course number, major code)
+    previous_records maps record id -> record from the last output (empty for a full crawl)
+    parse_only is an optional SoupStrainer limiting which subtrees of each page get parsed
+
+    returns (records in url order, CrawlChanges); the manifest is updated but not saved
+    """
+    scheduler = scheduler or CrawlScheduler()
+
+    def task(url):
+        document = PageDocument.fetch(url, parse_only=parse_only)
+        known_ids = manifest.record_ids(url)
+
+        if manifest.is_unchanged(url, document.content_hash) and all(
+            i in previous_records for i in known_ids
+        ):
+            return document.content_hash, UNCHANGED  # soup is never built
+
+        return document.content_hash, extract(document)
+
+    results = scheduler.map(task, urls)
+
+    records = []
+    changes = CrawlChanges()
+
+    for url, result in zip(urls, results):
+        old_ids = manifest.record_ids(url)
+
+        if result is None:
+            # page failed every retry -> keep what we had for it
+            records.extend(previous_records[i] for i in old_ids if i in previous_records)
+            continue
+
+        content_hash, extracted = result
+
+        if extracted == UNCHANGED:
+            records.extend(previous_records[i] for i in old_ids)
+            changes.unchanged_urls.append(url)
+            continue
+
+        new_ids = [record_id(r) for r in extracted]
+        records.extend(extracted)
+        manifest.update(url, content_hash, new_ids)
+
+        changes.changed_urls.append(url)
+        changes.upserted.extend(new_ids)
+        kept_ids = set(new_ids)
+        changes.removed.extend(i for i in old_ids if i not in kept_ids)
+
+    # pages that disappeared from the bulletin take their records with them
+    crawled = set(urls)
+    for url in [u for u in manifest.pages if u not in crawled]:
+        changes.removed.extend(manifest.record_ids(url))
+        del manifest.pages[url]
+
+    # a record that moved between pages is upserted, not removed
+    upserted = set(changes.upserted)
+    changes.removed = [i for i in dict.fromkeys(changes.removed) if i not in upserted]
+
+    return records, changes
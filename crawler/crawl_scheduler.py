@@ -0,0 +1,195 @@
+"""
+Shared crawl scheduler used by the course and major crawlers.
+
+Pages are crawled on a bounded thread pool. Every task first takes a token
+from its host's token bucket so the bulletin server never sees more than
+`requests_per_second` from us, failed tasks are retried with exponential
+backoff and results are returned in the same order as the input urls.
+
+Two latencies are reported: fetch (the http request alone, recorded by
+PageDocument.fetch through record_fetch) and page (the whole task, i.e.
+fetch + parse + extract).
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+
+# stats of the scheduler whose task is running on this thread + fetches that task made
+_current = threading.local()
+
+
+class TokenBucket:
+    """Blocking token bucket -> `rate` tokens per second with room for `capacity` bursts"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+
+class CrawlStats:
+    """Counters and latencies for one scheduler run"""
+
+    def __init__(self):
+        self.latencies = []  # per page task: fetch + parse + extract
+        self.fetch_latencies = []  # per http request
+        self.failures = 0
+        self.retries = 0
+        self.started = None
+        self.finished = None
+        self.lock = threading.Lock()
+
+    def record(self, seconds):
+        with self.lock:
+            self.latencies.append(seconds)
+
+    def record_fetch(self, seconds):
+        with self.lock:
+            self.fetch_latencies.append(seconds)
+
+    @property
+    def pages(self):
+        return len(self.latencies)
+
+    @property
+    def elapsed_seconds(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def pages_per_second(self):
+        elapsed = self.elapsed_seconds
+        return self.pages / elapsed if elapsed else 0.0
+
+    def percentile(self, pct, latencies=None):
+        """pct percentile of page latencies (or of the given list, e.g. fetch_latencies)"""
+        latencies = self.latencies if latencies is None else latencies
+        if not latencies:
+            return 0.0
+        ordered = sorted(latencies)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def report(self):
+        print(
+            f"[Crawl] {self.pages} pages in {self.elapsed_seconds:.2f}s "
+            f"| {self.pages_per_second:.2f} pages/sec "
+            f"| fetch p50 {self.percentile(50, self.fetch_latencies) * 1000:.0f}ms "
+            f"p95 {self.percentile(95, self.fetch_latencies) * 1000:.0f}ms "
+            f"| page p95 {self.percentile(95) * 1000:.0f}ms "
+            f"| {self.retries} retries {self.failures} failures"
+        )
+
+
+def record_fetch(seconds):
+    """count one http fetch toward the scheduler running the current task
+
+    returns how many fetches the current task has made so far, retried
+    attempts included (1 outside a scheduler task)
+    """
+    stats = getattr(_current, "stats", None)
+    if stats is None:
+        return 1
+    stats.record_fetch(seconds)
+    _current.requests += 1
+    return _current.requests
+
+
+def is_retryable(error):
+    """connection problems, timeouts, 429 and 5xx are worth retrying, other http errors are not"""
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(error, requests.RequestException)
+
+
+class CrawlScheduler:
+    def __init__(
+        self,
+        max_workers=8,
+        requests_per_second=4.0,
+        burst=4,
+        max_retries=3,
+        backoff_seconds=0.5,
+    ):
+        self.max_workers = max_workers
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+
+        self.buckets = {}
+        self.buckets_lock = threading.Lock()
+        self.stats = CrawlStats()
+
+    def bucket_for(self, url):
+        host = urlsplit(url).netloc
+        with self.buckets_lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.requests_per_second, self.burst)
+            return self.buckets[host]
+
+    def run_task(self, task, url):
+        """rate limited call of task(url) with retry + exponential backoff"""
+        bucket = self.bucket_for(url)
+        _current.stats = self.stats
+        _current.requests = 0
+
+        for attempt in range(self.max_retries + 1):
+            bucket.acquire()
+            start = time.perf_counter()
+
+            try:
+                result = task(url)
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    print(f"[Crawl Failed] {url} | {e}")
+                    with self.stats.lock:
+                        self.stats.failures += 1
+                    return None
+
+                with self.stats.lock:
+                    self.stats.retries += 1
+
+                # full jitter so retries from many workers don't line up
+                time.sleep(random.uniform(0, self.backoff_seconds * 2**attempt))
+                continue
+
+            self.stats.record(time.perf_counter() - start)
+            return result
+
+    def map(self, task, urls):
+        """run task over every url concurrently -> results in input order (None for failures)"""
+        urls = list(urls)
+        self.stats.started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = list(pool.map(lambda url: self.run_task(task, url), urls))
+
+        self.stats.finished = time.perf_counter()
+        return results
@@ -1,12 +1,12 @@
-import requests
-from bs4 import BeautifulSoup
 import re
 from urllib.parse import urljoin
 
+from fetcher import fetch
+from page_document import make_soup
+
 def fetch_and_parse(url):
-    response = requests.get(url)
-    response.raise_for_status()                         # raise an error for bad responses
-    soup = BeautifulSoup(response.text, 'html.parser')
+    response = fetch(url)                               # pooled session + conditional GET, raises for bad responses
+    soup = make_soup(response.text)
     return soup
 
 def extract_content(soup) -> str:
@@ -26,8 +26,7 @@ def clean_text(text) -> str:
     return text.strip()
 
 if __name__ == "__main__":
-    urls = 
-    [
+    urls = [
         "https://bulletins.psu.edu/undergraduate/colleges/abington/#majorsminorsandcertificatestext",
         "https://bulletins.psu.edu/undergraduate/general-information/academic-information/undergraduate-degrees-requirements/"
     ]
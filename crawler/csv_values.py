@@ -0,0 +1,52 @@
+"""
+Parsers for the list / dict / credits columns the crawlers write to CSV.
+
+pandas writes python values as their repr ("['CMPSC\\xa0121']",
+"{'General Education': '45'}", "(1, 12)"); these turn such a cell (or the
+value itself, straight from a crawler) back into a list / dict / credit
+range, empty or None when unparseable. Shared by the cleaner, the
+prerequisite graph, the requirement parser, the catalog store and the
+vector store facets.
+"""
+
+import ast
+
+
+def literal_list(value):
+    """stringified list column (or the list itself, straight from a crawler) -> list"""
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    if not isinstance(value, str) or not value.strip():
+        return []
+    try:
+        parsed = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return []
+    return list(parsed) if isinstance(parsed, (list, tuple)) else []
+
+
+def literal_dict(value):
+    """stringified dict column (or the dict itself) -> dict"""
+    if isinstance(value, dict):
+        return value
+    if not isinstance(value, str) or not value.strip():
+        return {}
+    try:
+        parsed = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+def parse_course_credits(value):
+    """extract_credits output (int, (min, max) or their CSV repr) -> (min, max), (None, None) when unknown"""
+    if isinstance(value, str):
+        try:
+            value = ast.literal_eval(value) if value.strip() else None
+        except (ValueError, SyntaxError):
+            value = None
+    if isinstance(value, (tuple, list)) and len(value) == 2:
+        return int(value[0]), int(value[1])
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value), int(value)
+    return None, None
@@ -2,50 +2,110 @@
 #   - converting to lowercase
 #   - stop word removal
 #   - punctuation removal
+#
+# rows are streamed in chunks (optionally cleaned on a process pool) so the
+# whole catalog is never held in memory; runs offline -> the NLTK english
+# stopword list is vendored in stopwords_english.txt (text_tokens, shared with
+# the lexical index) and tokenizing needs no punkt model; pandas, the process
+# pool and the stopword list are loaded on first use so importing clean_txt
+# stays cheap
+#
+# cleaned descriptions are the kept words joined by single spaces (the
+# original clean_txt glued them together with "".join, which left nothing for
+# the embedder or the lexical index to split on); unlike NLTK's word_tokenize,
+# unicode quotes / dashes become their own tokens and nothing else is split
+#
+# usage: python data_cleaner.py [--input psu_courses.csv] [--output processed_psu_courses.csv]
+#                               [--chunk-size 2000] [--workers 1]
 
-import pandas as pd
-import numpy as np
-import csv
-import nltk
-import ast
-import string
-from nltk.corpus import stopwords as sw
-from nltk.tokenize import word_tokenize as wt
+import argparse
+import time
+from collections import deque
 
-nltk.download("stopwords")
-nltk.download("punkt_tab")
+from csv_values import literal_list
+from text_tokens import normalize, stop_words
+
+INPUT_FILE = "psu_courses.csv"
+OUTPUT_FILE = "processed_psu_courses.csv"
+DEFAULT_CHUNK_SIZE = 2000
+
+# texts of a chunk are joined on this so every regex runs once per chunk (stripped from the texts first)
+ROW_SEPARATOR = "\x00"
+
+
+def clean_texts(texts):
+    """clean a batch of descriptions -> same output as clean_txt on each"""
+    if not texts:
+        return []
+    stops = stop_words()
+    # lowercase, drop punctuation, tokenization -> text_tokens.normalize, once over the whole batch
+    blob = normalize(ROW_SEPARATOR.join(text.replace(ROW_SEPARATOR, " ") for text in texts))
+    return [
+        " ".join([w for w in row.split() if w not in stops])  # stopword removal
+        for row in blob.split(ROW_SEPARATOR)
+    ]
 
 
 def clean_txt(txt: str) -> str:
-    stop_words = set(sw.words("english"))
-    punc_table = str.maketrans("", "", string.punctuation)
-
-    txt = txt.lower()  # lowercase
-    txt = txt.translate(punc_table)  # drop punctuation
-    words = wt(txt)  # tokenization
-    words = [w for w in words if w not in stop_words]  # stopword removal
-    return "".join(words)
-
-
-with open("psu_courses.csv", mode="r") as inf, open(
-    "processed_psu_courses.csv", mode="w"
-) as outf:
-    reader = csv.DictReader(inf)
-    field_names = reader.fieldnames
-    print(field_names)
-
-    writer = csv.DictWriter(outf, fieldnames=field_names)
-    writer.writeheader()
-
-    # processing description
-    for record in reader:
-        if "description" in record:
-            record["description"] = clean_txt(record["description"])
-
-        # convert string of form "['a','b','c']" -> ['a', 'b', 'c']
-        if "learning_objectives" in record:
-            record["learning_objectives"] = ast.literal_eval(
-                record["learning_objectives"]
-            )
-
-        writer.writerow(record)
+    return clean_texts([txt])[0]
+
+
+def clean_chunk(chunk):
+    """clean one DataFrame chunk of course rows (runs in a worker process when workers > 1)"""
+    if "description" in chunk:
+        chunk["description"] = clean_texts(chunk["description"].tolist())
+
+    # convert string of form "['a','b','c']" -> ['a', 'b', 'c'] (written back as its repr)
+    if "learning_objectives" in chunk:
+        chunk["learning_objectives"] = [str(literal_list(v)) for v in chunk["learning_objectives"]]
+    return chunk
+
+
+def cleaned_chunks(chunks, workers):
+    """clean chunks in order; with workers > 1 at most 2 chunks per worker are in flight"""
+    if workers <= 1:
+        for chunk in chunks:
+            yield clean_chunk(chunk)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(clean_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def clean_csv(input_file=INPUT_FILE, output_file=OUTPUT_FILE, chunk_size=DEFAULT_CHUNK_SIZE, workers=1):
+    """stream input_file -> cleaned output_file; returns the number of rows written"""
+    import pandas as pd
+
+    start = time.perf_counter()
+    rows = 0
+
+    chunks = pd.read_csv(input_file, dtype=str, keep_default_na=False, chunksize=chunk_size)
+    with open(output_file, mode="w", encoding="utf-8", newline="") as outf:
+        for i, chunk in enumerate(cleaned_chunks(chunks, workers)):
+            if i == 0:
+                print(list(chunk.columns))
+            chunk.to_csv(outf, header=i == 0, index=False)
+            rows += len(chunk)
+
+    seconds = time.perf_counter() - start
+    print(f"[Cleaner] {rows} rows in {seconds:.2f}s | {rows / seconds if seconds else 0:.0f} rows/sec | {workers} workers")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    clean_csv(args.input, args.output, args.chunk_size, args.workers)
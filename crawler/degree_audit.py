@@ -0,0 +1,323 @@
+"""
+Degree audit over the compiled major requirements.
+
+Every major is compiled once into flat arrays over one shared course
+vocabulary:
+
+    bundle_matrix[b, c]     1 if course c is part of bundle b (float32, dense)
+    bundle_size[b]          courses in bundle b
+    slot_offsets            bundles of slot s are rows slot_offsets[s]:slot_offsets[s + 1]
+    slot_*                  one slot per prescribed / additional requirement and per
+                            candidate of a "select n" group (major, credits, C-or-better,
+                            selection group or -1)
+    selection_*             major, credit and course count targets per select-n group
+
+A transcript is two bool vectors over the vocabulary (passed, passed with a C
+or better), so auditing is one matrix product for bundle hits, a reduceat for
+"any alternative", and two more products to sum slots into majors and
+selection groups. Batch mode stacks thousands of transcripts into one matrix
+and audits them against every major in the same handful of operations.
+
+usage: python degree_audit.py <major_code> --transcript "CMPSC 121:A" "MATH 140:C" ...
+"""
+
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from catalog_store import CATALOG_FILE, CatalogStore
+from prereq_graph import normalize_course_number
+from requirement_groups import COURSES_FILE, DEFAULT_CREDITS, MAJOR_FILE, credits_of, load_course_credits, load_majors
+
+PASSING_GRADES = frozenset({"A", "A-", "B+", "B", "B-", "C+", "C", "D", "TR"})
+C_OR_BETTER_GRADES = frozenset({"A", "A-", "B+", "B", "B-", "C+", "C", "TR"})
+MAJOR_CATEGORY = "Requirements for the Major"
+
+
+@lru_cache(maxsize=None)
+def grade_flags(grade):
+    """grade -> (passed, C or better); a missing grade counts as both (transfer / in progress)"""
+    if grade is None or grade == "":
+        return True, True
+    grade = str(grade).strip().upper()
+    return grade in PASSING_GRADES, grade in C_OR_BETTER_GRADES
+
+
+# transcripts repeat the same few thousand course numbers -> normalize each spelling once
+normalize_course = lru_cache(maxsize=65536)(normalize_course_number)
+
+
+def normalize_transcript(transcript):
+    """["CMPSC 121", ...] or {"CMPSC 121": "A", ...} -> {course number: grade}"""
+    if isinstance(transcript, dict):
+        return {normalize_course(c): g for c, g in transcript.items()}
+    return {normalize_course(c): None for c in transcript}
+
+
+class MajorAudit:
+    def __init__(self, major_code, required, selections, category_remaining, progress):
+        self.major_code = major_code
+        self.required = required  # [(label, kind, satisfied), ...]
+        self.selections = selections  # [(label, earned, target, unit, satisfied), ...]
+        self.category_remaining = category_remaining
+        self.progress = progress
+
+    @property
+    def missing(self):
+        return [label for label, _, satisfied in self.required if not satisfied]
+
+    def to_dict(self):
+        return {
+            "major_code": self.major_code,
+            "progress": self.progress,
+            "required": [{"requirement": label, "kind": kind, "satisfied": satisfied} for label, kind, satisfied in self.required],
+            "selections": [
+                {"requirement": label, "earned": earned, "target": target, "unit": unit, "satisfied": satisfied}
+                for label, earned, target, unit, satisfied in self.selections
+            ],
+            "credits_remaining": self.category_remaining,
+        }
+
+    def report(self):
+        print(f"[Audit] {self.major_code}: {self.progress:.0%} of requirements satisfied")
+        for label in self.missing:
+            print(f"  [Missing] {label}")
+        for label, earned, target, unit, satisfied in self.selections:
+            if not satisfied:
+                print(f"  [Selection] {label} -> {earned}/{target} {unit}")
+        for category, remaining in self.category_remaining.items():
+            print(f"  [Credits] {category}: {remaining} remaining")
+
+
+class BatchAudit:
+    """per (transcript, major) results of DegreeAudit.audit_batch"""
+
+    def __init__(self, major_codes, progress, major_credits_remaining):
+        self.major_codes = major_codes
+        self.progress = progress  # (n_transcripts, n_majors) fraction of slots satisfied
+        self.major_credits_remaining = major_credits_remaining
+
+    def closest(self, transcript, k=5):
+        """[(major code, progress, major credits remaining), ...] best first"""
+        progress = self.progress[transcript]
+        remaining = self.major_credits_remaining[transcript]
+        order = np.lexsort((remaining, -progress))[:k]
+        return [(self.major_codes[m], float(progress[m]), float(remaining[m])) for m in order]
+
+
+class DegreeAudit:
+    def __init__(self, majors, course_credits=None):
+        self.majors = majors
+        self.course_credits = course_credits or {}
+        self.compile()
+
+    @classmethod
+    def load(cls, major_file=MAJOR_FILE, courses_file=COURSES_FILE, catalog_file=CATALOG_FILE):
+        """from the catalog store when it exists, else the crawler CSVs"""
+        if os.path.exists(catalog_file):
+            with CatalogStore(catalog_file) as store:
+                return cls(store.load_majors(), store.course_credits() or load_course_credits(courses_file))
+        return cls(load_majors(major_file), load_course_credits(courses_file))
+
+    def compile(self):
+        self.major_codes = list(self.majors)
+        self.major_index = {code: m for m, code in enumerate(self.major_codes)}
+
+        courses = sorted({c for major in self.majors.values() for c in major.courses()})
+        self.courses = courses
+        self.course_index = {c: i for i, c in enumerate(courses)}
+
+        # credits a transcript entry is worth: catalog first, then any major page listing it
+        self.transcript_credits = {}
+        for major in self.majors.values():
+            for course, credits in major.credits.items():
+                self.transcript_credits.setdefault(course, credits)
+        self.transcript_credits.update(self.course_credits)
+
+        bundles = []  # (slot, course ids)
+        slot_major, slot_credits, slot_c_or_better, slot_selection, slot_requirement = [], [], [], [], []
+        selection_major, selection_min_credits, selection_min_courses = [], [], []
+        self.slot_labels, self.slot_kinds, self.selection_labels = [], [], []
+
+        def add_slot(m, major, requirement, selection):
+            slot = len(slot_major)
+            for bundle in requirement.alternatives:
+                bundles.append([self.course_index[c] for c in bundle])
+            slot_requirement.append(len(requirement.alternatives))
+            slot_major.append(m)
+            slot_credits.append(min(sum(credits_of(major, c, self.course_credits) for c in b) for b in requirement.alternatives))
+            slot_c_or_better.append(requirement.needs_c_or_better)
+            slot_selection.append(selection)
+            self.slot_labels.append(requirement.label)
+            self.slot_kinds.append(requirement.kind)
+            return slot
+
+        for m, code in enumerate(self.major_codes):
+            major = self.majors[code]
+            for requirement in major.required:
+                add_slot(m, major, requirement, -1)
+            for group in major.selections:
+                selection = len(selection_major)
+                selection_major.append(m)
+                selection_min_credits.append(group.min_credits)
+                selection_min_courses.append(group.min_courses)
+                self.selection_labels.append(group.label)
+                for candidate in group.candidates:
+                    add_slot(m, major, candidate, selection)
+
+        n_slots, n_majors, n_selections = len(slot_major), len(self.major_codes), len(selection_major)
+
+        self.bundle_matrix = np.zeros((len(bundles), len(courses)), dtype=np.float32)
+        for b, course_ids in enumerate(bundles):
+            self.bundle_matrix[b, course_ids] = 1
+        self.bundle_size = self.bundle_matrix.sum(axis=1)
+        self.slot_offsets = np.zeros(n_slots + 1, dtype=np.int64)
+        self.slot_offsets[1:] = np.cumsum(slot_requirement)
+        self.slot_alternatives = np.array(slot_requirement, dtype=np.int32)
+        self.max_alternatives = int(self.slot_alternatives.max(initial=0))
+        self.c_or_better_bundles = np.flatnonzero(np.repeat(np.array(slot_c_or_better, dtype=bool), slot_requirement))
+
+        self.slot_major = np.array(slot_major, dtype=np.int32)
+        self.slot_credits = np.array(slot_credits, dtype=np.float32)
+        self.slot_selection = np.array(slot_selection, dtype=np.int32)
+        self.selection_major = np.array(selection_major, dtype=np.int32)
+        self.selection_min_credits = np.array(selection_min_credits, dtype=np.float32)
+        self.selection_min_courses = np.array(selection_min_courses, dtype=np.float32)
+
+        # slot -> major (required slots) and slot -> selection group incidence matrices
+        required = self.slot_selection < 0
+        self.required_to_major = np.zeros((n_slots, n_majors), dtype=np.float32)
+        self.required_to_major[np.flatnonzero(required), self.slot_major[required]] = 1
+        self.slot_to_selection = np.zeros((n_slots, n_selections), dtype=np.float32)
+        self.slot_to_selection[np.flatnonzero(~required), self.slot_selection[~required]] = 1
+        self.selection_to_major = np.zeros((n_selections, n_majors), dtype=np.float32)
+        self.selection_to_major[np.arange(n_selections), self.selection_major] = 1
+
+        # credits a selection group can apply to the major category (0 -> uncapped)
+        self.selection_credit_target = np.where(self.selection_min_credits > 0, self.selection_min_credits, 0)
+        self.slots_per_major = self.required_to_major.sum(axis=0) + self.selection_to_major.sum(axis=0)
+        self.major_category_credits = np.array(
+            [self.majors[code].credit_breakdown.get(MAJOR_CATEGORY, (0, 0))[0] for code in self.major_codes], dtype=np.float32
+        )
+
+    def transcript_matrices(self, transcripts):
+        """transcripts -> (passed, C or better) float32 matrices over the vocabulary + total credits each"""
+        passed = np.zeros((len(transcripts), len(self.courses)), dtype=np.float32)
+        c_or_better = np.zeros_like(passed)
+        total_credits = np.zeros(len(transcripts), dtype=np.float32)
+        rows, columns, strict = [], [], []
+
+        for t, transcript in enumerate(transcripts):
+            for course, grade in normalize_transcript(transcript).items():
+                ok, c_ok = grade_flags(grade)
+                if not ok:
+                    continue
+                total_credits[t] += self.transcript_credits.get(course, DEFAULT_CREDITS)
+                i = self.course_index.get(course)
+                if i is not None:
+                    rows.append(t)
+                    columns.append(i)
+                    strict.append(c_ok)
+
+        passed[rows, columns] = 1
+        c_or_better[rows, columns] = strict
+        return passed, c_or_better, total_credits
+
+    def evaluate(self, passed, c_or_better):
+        """-> slot_ok (n, slots) bool and selection earned credits / courses (n, selections)"""
+        bundle_ok = passed @ self.bundle_matrix.T >= self.bundle_size
+
+        # C-or-better bundles are re-checked against the stricter transcript
+        strict = self.c_or_better_bundles
+        if len(strict):
+            bundle_ok[:, strict] = c_or_better @ self.bundle_matrix[strict].T >= self.bundle_size[strict]
+
+        # any alternative: first bundle of every slot, OR'd with the k-th bundle of slots that have one
+        first = self.slot_offsets[:-1]
+        slot_ok = bundle_ok[:, first]
+        for k in range(1, self.max_alternatives):
+            slots = self.slot_alternatives > k
+            slot_ok[:, slots] |= bundle_ok[:, first[slots] + k]
+
+        slot_ok_f = slot_ok.astype(np.float32)
+        earned_credits = (slot_ok_f * self.slot_credits) @ self.slot_to_selection
+        earned_courses = slot_ok_f @ self.slot_to_selection
+        return slot_ok, earned_credits, earned_courses
+
+    def selection_ok(self, earned_credits, earned_courses):
+        by_credits = (self.selection_min_credits > 0) & (earned_credits >= self.selection_min_credits)
+        by_courses = (self.selection_min_courses > 0) & (earned_courses >= self.selection_min_courses)
+        untargeted = (self.selection_min_credits == 0) & (self.selection_min_courses == 0)
+        return by_credits | by_courses | untargeted
+
+    def major_scores(self, slot_ok, earned_credits, earned_courses):
+        """-> (progress, credits applied to the major category) per (transcript, major)"""
+        selection_ok = self.selection_ok(earned_credits, earned_courses).astype(np.float32)
+        satisfied = slot_ok.astype(np.float32) @ self.required_to_major + selection_ok @ self.selection_to_major
+        progress = satisfied / np.maximum(self.slots_per_major, 1)
+
+        capped = np.where(self.selection_credit_target > 0, np.minimum(earned_credits, self.selection_credit_target), earned_credits)
+        applied = (slot_ok.astype(np.float32) * self.slot_credits) @ self.required_to_major + capped @ self.selection_to_major
+        return progress, applied
+
+    def audit(self, major_code, transcript):
+        """full report of one transcript against one major"""
+        passed, c_or_better, total_credits = self.transcript_matrices([transcript])
+        slot_ok, earned_credits, earned_courses = self.evaluate(passed, c_or_better)
+        progress, applied = self.major_scores(slot_ok, earned_credits, earned_courses)
+        selection_ok = self.selection_ok(earned_credits, earned_courses)[0]
+
+        m = self.major_index[major_code]
+        slots = np.flatnonzero((self.slot_major == m) & (self.slot_selection < 0))
+        required = [(self.slot_labels[s], self.slot_kinds[s], bool(slot_ok[0, s])) for s in slots]
+
+        selections = []
+        for g in np.flatnonzero(self.selection_major == m):
+            if self.selection_min_credits[g] > 0:
+                earned, target, unit = earned_credits[0, g], self.selection_min_credits[g], "credits"
+            else:
+                earned, target, unit = earned_courses[0, g], self.selection_min_courses[g], "courses"
+            selections.append((self.selection_labels[g], int(earned), int(target), unit, bool(selection_ok[g])))
+
+        category_remaining = self.category_remaining(self.majors[major_code], float(applied[0, m]), float(total_credits[0]))
+        return MajorAudit(major_code, required, selections, category_remaining, float(progress[0, m]))
+
+    @staticmethod
+    def category_remaining(major, applied, total_credits):
+        """major category gets the applied credits, everything else fills the other categories in order"""
+        remaining = {}
+        leftover = max(total_credits - applied, 0)
+        for category, (low, _) in major.credit_breakdown.items():
+            if category == MAJOR_CATEGORY:
+                remaining[category] = max(low - applied, 0)
+            else:
+                used = min(low, leftover)
+                leftover -= used
+                remaining[category] = low - used
+        return remaining
+
+    def audit_batch(self, transcripts):
+        """audit every transcript against every major in one pass"""
+        passed, c_or_better, _ = self.transcript_matrices(transcripts)
+        slot_ok, earned_credits, earned_courses = self.evaluate(passed, c_or_better)
+        progress, applied = self.major_scores(slot_ok, earned_credits, earned_courses)
+        remaining = np.maximum(self.major_category_credits - applied, 0)
+        return BatchAudit(self.major_codes, progress, remaining)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("major_code")
+    parser.add_argument("--transcript", nargs="*", default=[], help='"COURSE NUM[:GRADE]" entries')
+    args = parser.parse_args()
+
+    transcript = dict((entry.split(":", 1) + [None])[:2] for entry in args.transcript)
+    auditor = DegreeAudit.load()
+    auditor.audit(args.major_code, transcript).report()
+
+    print("\nClosest majors:")
+    for code, progress, remaining in auditor.audit_batch([transcript]).closest(0):
+        print(f"  {code:>8} {progress:.0%} satisfied, {remaining:.0f} major credits remaining")
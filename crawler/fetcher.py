@@ -0,0 +1,146 @@
+"""
+Shared http fetch layer for the crawlers.
+
+- one pooled requests.Session (keep-alive + gzip/deflate negotiation)
+- on-disk response cache that remembers each url's ETag / Last-Modified
+- reruns send conditional requests and reuse the cached body on 304
+
+cache layout (content addressed so identical pages are stored once):
+    <cache_dir>/index/<sha256(url)>.json   -> url, etag, last_modified, content_hash
+    <cache_dir>/objects/<content_hash>     -> raw response body
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".http_cache")
+USER_AGENT = "pennStateAdvisor-crawler/0.1"
+
+
+class FetchResult:
+    """Response body plus what the cache knew about it"""
+
+    def __init__(self, url, content, status_code, content_hash):
+        self.url = url
+        self.content = content
+        self.status_code = status_code  # 304 -> server revalidated the cached body
+        self.content_hash = content_hash
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+
+class Fetcher:
+    def __init__(self, cache_dir=CACHE_DIR, pool_size=16, timeout=30):
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(
+            {"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate"}
+        )
+
+        if cache_dir:
+            os.makedirs(os.path.join(cache_dir, "index"), exist_ok=True)
+            os.makedirs(os.path.join(cache_dir, "objects"), exist_ok=True)
+
+    def index_path(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, "index", f"{key}.json")
+
+    def object_path(self, content_hash):
+        return os.path.join(self.cache_dir, "objects", content_hash)
+
+    def load_entry(self, url):
+        """cached index entry for url or None if missing / body lost"""
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self.index_path(url), mode="r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if not os.path.exists(self.object_path(entry["content_hash"])):
+            return None
+        return entry
+
+    def store(self, url, response, content_hash):
+        object_path = self.object_path(content_hash)
+        if not os.path.exists(object_path):
+            write_atomic(object_path, response.content)
+
+        entry = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content_hash": content_hash,
+        }
+        write_atomic(self.index_path(url), json.dumps(entry).encode("utf-8"))
+
+    def fetch(self, url):
+        """GET url, conditionally if we have a cached copy -> FetchResult"""
+        entry = self.load_entry(url)
+
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+
+        if response.status_code == 304 and entry:
+            with open(self.object_path(entry["content_hash"]), mode="rb") as f:
+                content = f.read()
+            return FetchResult(url, content, 304, entry["content_hash"])
+
+        response.raise_for_status()
+        content_hash = hashlib.sha256(response.content).hexdigest()
+
+        if self.cache_dir:
+            self.store(url, response, content_hash)
+
+        return FetchResult(url, response.content, response.status_code, content_hash)
+
+
+def write_atomic(path, data):
+    """write then rename so concurrent crawls never see half written files"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, mode="wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+_default_fetcher = None
+_default_fetcher_lock = threading.Lock()
+
+
+def get_fetcher():
+    """process wide Fetcher shared by every crawler (one connection pool)"""
+    global _default_fetcher
+    with _default_fetcher_lock:
+        if _default_fetcher is None:
+            _default_fetcher = Fetcher()
+        return _default_fetcher
+
+
+def fetch(url):
+    return get_fetcher().fetch(url)
+
+
+def set_fetcher(fetcher):
+    """replace the process wide Fetcher (e.g. one mounted on a fixture replay transport)"""
+    global _default_fetcher
+    with _default_fetcher_lock:
+        _default_fetcher = fetcher
@@ -0,0 +1,239 @@
+"""
+Offline fixture corpus of bulletin pages.
+
+record        run the crawlers live; every page they fetch is saved to the corpus
+import-cache  build the corpus from the fetcher's http cache of an earlier crawl
+serve         serve the corpus over http (point a crawler's base_url at it)
+
+In process, use_corpus() swaps the shared Fetcher for one whose transport
+answers from the corpus (ReplayAdapter) or records into it
+(RecordingAdapter), so crawls run unchanged with no network access.
+
+layout (bodies content addressed so identical pages are stored once):
+    <corpus>/index.json         url -> {"object": sha256, "content_type": ...}
+    <corpus>/objects/<sha256>   raw response body
+
+usage: python fixture_corpus.py record|import-cache|serve [--corpus fixtures/bulletins] [--port 8001]
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urldefrag, urljoin
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from fetcher import CACHE_DIR, Fetcher, set_fetcher, write_atomic
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "bulletins")
+ORIGIN = "https://bulletins.psu.edu"
+DEFAULT_CONTENT_TYPE = "text/html; charset=UTF-8"
+
+
+def corpus_key(url):
+    """fragments never reach the server -> abington/#majors... and abington/ are one page"""
+    return urldefrag(url).url
+
+
+class FixtureCorpus:
+    def __init__(self, path=CORPUS_DIR):
+        self.path = path
+        self.entries = {}
+        self.lock = threading.Lock()
+
+        index_file = os.path.join(path, "index.json")
+        if os.path.exists(index_file):
+            with open(index_file, mode="r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, url):
+        return corpus_key(url) in self.entries
+
+    def object_path(self, content_hash):
+        return os.path.join(self.path, "objects", content_hash)
+
+    def add(self, url, content, content_type=None):
+        content_hash = hashlib.sha256(content).hexdigest()
+        os.makedirs(os.path.join(self.path, "objects"), exist_ok=True)
+
+        object_path = self.object_path(content_hash)
+        if not os.path.exists(object_path):
+            write_atomic(object_path, content)
+
+        with self.lock:
+            self.entries[corpus_key(url)] = {
+                "object": content_hash,
+                "content_type": content_type or DEFAULT_CONTENT_TYPE,
+            }
+
+    def get(self, url):
+        """(body, content type) of url or None if it was never recorded"""
+        entry = self.entries.get(corpus_key(url))
+        if entry is None:
+            return None
+        with open(self.object_path(entry["object"]), mode="rb") as f:
+            return f.read(), entry["content_type"]
+
+    def save(self):
+        os.makedirs(self.path, exist_ok=True)
+        with self.lock:
+            data = json.dumps(self.entries, indent=1, sort_keys=True)
+        write_atomic(os.path.join(self.path, "index.json"), data.encode("utf-8"))
+
+    def fingerprint(self):
+        """hash of every (url, body hash) -> benchmark results are only comparable on the same corpus"""
+        digest = hashlib.sha256()
+        for url, entry in sorted(self.entries.items()):
+            digest.update(f"{url} {entry['object']}\n".encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    @classmethod
+    def from_http_cache(cls, cache_dir=CACHE_DIR, path=CORPUS_DIR):
+        """corpus of every page the fetcher cached during earlier crawls"""
+        corpus = cls(path)
+        for index_file in glob.glob(os.path.join(cache_dir, "index", "*.json")):
+            with open(index_file, mode="r", encoding="utf-8") as f:
+                entry = json.load(f)
+            object_path = os.path.join(cache_dir, "objects", entry["content_hash"])
+            if os.path.exists(object_path):
+                with open(object_path, mode="rb") as f:
+                    corpus.add(entry["url"], f.read())
+        return corpus
+
+
+class ReplayAdapter(BaseAdapter):
+    """requests transport answering every GET from the corpus (404 for unrecorded urls)"""
+
+    def __init__(self, corpus):
+        super().__init__()
+        self.corpus = corpus
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.url = request.url
+        response.request = request
+
+        found = self.corpus.get(request.url)
+        if found is None:
+            response.status_code, response.reason = 404, "Not Found"
+            response._content = b"not in fixture corpus"
+            response.headers = CaseInsensitiveDict({"Content-Type": "text/plain"})
+        else:
+            content, content_type = found
+            response.status_code, response.reason = 200, "OK"
+            response._content = content
+            response.headers = CaseInsensitiveDict({"Content-Type": content_type})
+        return response
+
+    def close(self):
+        pass
+
+
+class RecordingAdapter(HTTPAdapter):
+    """normal http transport that also saves every 200 GET body into the corpus"""
+
+    def __init__(self, corpus, **kwargs):
+        super().__init__(**kwargs)
+        self.corpus = corpus
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        if request.method == "GET" and response.status_code == 200:
+            self.corpus.add(request.url, response.content, response.headers.get("Content-Type"))
+        return response
+
+
+def use_corpus(corpus, record=False, pool_size=16):
+    """point every crawler's fetches at the corpus (replay) or through it (record) -> the Fetcher
+
+    the http cache is disabled either way: replayed pages must come from the
+    corpus and recorded pages must be full 200 bodies, not 304s
+    """
+    fetcher = Fetcher(cache_dir=None, pool_size=pool_size)
+    if record:
+        adapter = RecordingAdapter(corpus, pool_connections=pool_size, pool_maxsize=pool_size)
+    else:
+        adapter = ReplayAdapter(corpus)
+    fetcher.session.mount("http://", adapter)
+    fetcher.session.mount("https://", adapter)
+    set_fetcher(fetcher)
+    return fetcher
+
+
+def record(corpus, courses=True, majors=True):
+    """crawl live with every fetch recorded; crawl outputs go to a scratch directory"""
+    from psu_major_requirements_crawler import crawl_major_requirements
+    from psu_undergrad_course_crawler import scrape_psu_courses
+
+    use_corpus(corpus, record=True)
+    with tempfile.TemporaryDirectory() as scratch:
+        outputs = lambda name: {
+            "output_file": os.path.join(scratch, f"{name}.csv"),
+            "manifest_file": os.path.join(scratch, f"{name}.manifest.json"),
+            "changes_file": os.path.join(scratch, f"{name}.changes.json"),
+            "catalog_file": os.path.join(scratch, "catalog.sqlite3"),
+        }
+        if courses:
+            scrape_psu_courses(**outputs("psu_courses"))
+        if majors:
+            crawl_major_requirements(**outputs("major_requirements"))
+    corpus.save()
+
+
+def make_handler(corpus, origin):
+    class ReplayHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            found = corpus.get(urljoin(origin, self.path))
+            if found is None:
+                self.send_error(404, "not in fixture corpus")
+                return
+            content, content_type = found
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ReplayHandler
+
+
+def serve(corpus, host="127.0.0.1", port=8001, origin=ORIGIN):
+    """serve recorded pages by path, e.g. base_url=http://127.0.0.1:8001/university-course-descriptions/undergraduate/"""
+    server = ThreadingHTTPServer((host, port), make_handler(corpus, origin))
+    print(f"serving {len(corpus)} pages of {origin} on http://{host}:{port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=["record", "import-cache", "serve"])
+    parser.add_argument("--corpus", default=CORPUS_DIR)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--skip-courses", action="store_true")
+    parser.add_argument("--skip-majors", action="store_true")
+    parser.add_argument("--port", type=int, default=8001)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        corpus = FixtureCorpus(args.corpus)
+        record(corpus, courses=not args.skip_courses, majors=not args.skip_majors)
+        print(f"recorded {len(corpus)} pages into {args.corpus} (fingerprint {corpus.fingerprint()})")
+    elif args.command == "import-cache":
+        corpus = FixtureCorpus.from_http_cache(args.cache_dir, args.corpus)
+        corpus.save()
+        print(f"imported {len(corpus)} pages into {args.corpus} (fingerprint {corpus.fingerprint()})")
+    else:
+        serve(FixtureCorpus(args.corpus), port=args.port)
@@ -0,0 +1,150 @@
+"""
+Page-document layer shared by the crawlers.
+
+A page is fetched once and parsed once, then the same parsed tree is handed
+to every extractor that needs it instead of each extractor re-downloading
+and re-parsing the url on its own.
+
+Pages are parsed with the backend named by CRAWLER_HTML_PARSER:
+    html.parser  pure python, always available (default)
+    lxml         C parser, several times faster; needs lxml installed
+    html5lib     browser-grade error recovery, slowest
+A page can also be parsed with parse_only=<SoupStrainer> so only the subtrees
+its extractors read are built (see COURSE_BLOCKS in the course crawler).
+bench_html_parser.py checks every combination yields identical records; its
+last run is in bench_html_parser.md.
+"""
+
+import os
+import threading
+import time
+
+from bs4 import BeautifulSoup
+
+from crawl_scheduler import record_fetch
+from fetcher import fetch
+
+HTML_PARSER = os.environ.get("CRAWLER_HTML_PARSER", "html.parser")
+
+
+def make_soup(content, parser=None, parse_only=None):
+    """parse a page with the configured backend (parser overrides CRAWLER_HTML_PARSER)"""
+    return BeautifulSoup(content, parser or HTML_PARSER, parse_only=parse_only)
+
+
+class PageDocument:
+    """A fetched bulletin page, parsed the first time its soup is needed"""
+
+    # number of http requests made through fetch() during this process
+    request_count = 0
+    request_count_lock = threading.Lock()
+
+    def __init__(self, url, content, fetch_seconds=0.0, content_hash=None, parse_only=None, requests=1):
+        self.url = url
+        self.content = content
+        self.fetch_seconds = fetch_seconds
+        self.requests = requests  # http requests it took to get this page, failed attempts included
+        self.content_hash = content_hash
+        self.parse_only = parse_only  # SoupStrainer -> only the matching subtrees are parsed
+        self.parse_seconds = 0.0
+        self._soup = None
+
+    @property
+    def soup(self):
+        if self._soup is None:
+            start = time.perf_counter()
+            self._soup = make_soup(self.content, parse_only=self.parse_only)
+            self.parse_seconds = time.perf_counter() - start
+        return self._soup
+
+    @classmethod
+    def fetch(cls, url, parse_only=None):
+        """download url (conditionally, through the shared cache) into a PageDocument"""
+        start = time.perf_counter()
+        try:
+            result = fetch(url)
+        finally:
+            # failed attempts are requests too (the scheduler retries them)
+            fetch_seconds = time.perf_counter() - start
+            requests = record_fetch(fetch_seconds)
+            with cls.request_count_lock:
+                cls.request_count += 1
+
+        return cls(
+            url,
+            result.content,
+            fetch_seconds=fetch_seconds,
+            content_hash=result.content_hash,
+            parse_only=parse_only,
+            requests=requests,
+        )
+
+
+class PageTiming:
+    """Time spent fetching, parsing and extracting a single page"""
+
+    def __init__(self, document):
+        self.url = document.url
+        self.fetch_seconds = document.fetch_seconds
+        self.parse_seconds = document.parse_seconds
+        self.requests = document.requests
+        self.extractor_seconds = {}
+
+    def record(self, extractor_name, seconds):
+        self.extractor_seconds[extractor_name] = seconds
+
+    @property
+    def total_seconds(self):
+        return (
+            self.fetch_seconds
+            + self.parse_seconds
+            + sum(self.extractor_seconds.values())
+        )
+
+
+def run_extractors(document, extractors, timing=None):
+    """run every extractor in the registry over one parsed document
+
+    extractors maps an output field name to a function taking (soup, url)
+    """
+    results = {}
+
+    for name, extractor in extractors.items():
+        start = time.perf_counter()
+        results[name] = extractor(document.soup, document.url)
+
+        if timing is not None:
+            timing.record(name, time.perf_counter() - start)
+
+    return results
+
+
+def print_timing_report(timings):
+    """per page timing table followed by run totals"""
+    if not timings:
+        print("[Timing] no pages crawled")
+        return
+
+    print(f"\n{'page':<70} {'reqs':>4} {'fetch':>8} {'parse':>8} {'extract':>8}")
+    for t in timings:
+        extract_seconds = sum(t.extractor_seconds.values())
+        print(
+            f"{t.url[-70:]:<70} {t.requests:>4} {t.fetch_seconds:>8.3f} "
+            f"{t.parse_seconds:>8.3f} {extract_seconds:>8.3f}"
+        )
+
+    total_requests = sum(t.requests for t in timings)
+    total_seconds = sum(t.total_seconds for t in timings)
+    print(
+        f"\n[Timing] {len(timings)} pages | {total_requests} requests "
+        f"({total_requests / len(timings):.2f} per page) | {total_seconds:.2f}s total"
+    )
+
+    # slowest extractors across the run
+    extractor_totals = {}
+    for t in timings:
+        for name, seconds in t.extractor_seconds.items():
+            extractor_totals[name] = extractor_totals.get(name, 0.0) + seconds
+
+    for name, seconds in sorted(extractor_totals.items(), key=lambda kv: -kv[1]):
+        print(f"\t{name:<24} {seconds:.3f}s")
@@ -0,0 +1,252 @@
+"""
+Compiled prerequisite graph built from the course crawler output.
+
+Courses are interned to integer ids. A course's prerequisites are a list of
+groups that must ALL be satisfied, and each group is a list of alternatives
+of which ANY one is enough ("MATH 140 or MATH 140H; CMPSC 121"). Groups come
+from the prerequisite text split the same way extract_equivalent_course_numbers
+splits it on "or".
+
+Everything is stored as CSR arrays:
+
+    group_offsets[c] : group_offsets[c + 1]   -> the groups of course c
+    alt_offsets[g] : alt_offsets[g + 1]       -> alternatives (course ids) of group g
+    prereq_offsets / prereq_ids               -> every course any group of c mentions
+    dependent_offsets / dependent_ids         -> reverse edges ("what does c unlock")
+
+and saved uncompressed with numpy so it loads in milliseconds.
+"""
+
+import re
+
+import numpy as np
+
+from csv_values import literal_list
+
+GRAPH_FILE = "prereq_graph.npz"
+
+COURSE_NUMBER_PATTERN = re.compile(r"[A-Z]+[\s\xa0][0-9]+[A-Z]?")
+AND_SPLIT_PATTERN = re.compile(r";|\band\b", re.IGNORECASE)
+OR_SPLIT_PATTERN = re.compile(r"\sor\s", re.IGNORECASE)
+
+
+def normalize_course_number(course_number):
+    """"CMPSC\\xa0121" -> "CMPSC 121" """
+    return re.sub(r"[\s\xa0]+", " ", course_number).strip()
+
+
+def parse_prerequisite_groups(prerequisite_data):
+    """prerequisite text -> [[alternatives], ...] (AND of ORs)
+
+    "MATH 140 or MATH 140H; CMPSC 121" -> [["MATH 140", "MATH 140H"], ["CMPSC 121"]]
+    """
+    groups = []
+    for text in prerequisite_data:
+        for clause in AND_SPLIT_PATTERN.split(text):
+            courses = [normalize_course_number(c) for c in COURSE_NUMBER_PATTERN.findall(clause)]
+            if not courses:
+                continue
+
+            if OR_SPLIT_PATTERN.search(clause):
+                groups.append(list(dict.fromkeys(courses)))
+            else:
+                groups.extend([c] for c in dict.fromkeys(courses))
+    return groups
+
+
+def counts_to_offsets(counts):
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(counts)
+    return offsets
+
+
+def to_csr(lists, dtype=np.int32):
+    offsets = counts_to_offsets([len(items) for items in lists])
+    flat = np.fromiter((i for items in lists for i in items), dtype=dtype, count=int(offsets[-1]))
+    return offsets, flat
+
+
+def edges_to_csr(sources, targets, n):
+    """edge lists -> (offsets, targets sorted by source)"""
+    order = np.lexsort((targets, sources))
+    return counts_to_offsets(np.bincount(sources, minlength=n)), targets[order].astype(np.int32)
+
+
+class PrerequisiteGraph:
+    ARRAYS = ("group_offsets", "alt_offsets", "alt_ids", "prereq_offsets", "prereq_ids", "dependent_offsets", "dependent_ids")
+
+    def __init__(self, names, group_offsets, alt_offsets, alt_ids, prereq_offsets, prereq_ids, dependent_offsets, dependent_ids):
+        self.names = names
+        self.ids = {name: i for i, name in enumerate(names)}
+        self.group_offsets = group_offsets
+        self.alt_offsets = alt_offsets
+        self.alt_ids = alt_ids
+        self.prereq_offsets = prereq_offsets
+        self.prereq_ids = prereq_ids
+        self.dependent_offsets = dependent_offsets
+        self.dependent_ids = dependent_ids
+
+    @classmethod
+    def compile(cls, names, group_offsets, alt_offsets, alt_ids):
+        """derive the flat forward + reverse edge arrays from the group arrays"""
+        n = len(names)
+        n_groups = len(alt_offsets) - 1
+
+        # course owning every alternative entry
+        group_course = np.repeat(np.arange(n), np.diff(group_offsets))
+        alt_course = np.repeat(group_course, np.diff(alt_offsets)[:n_groups])
+
+        # unique (course, prerequisite) pairs
+        pairs = np.unique(alt_course.astype(np.int64) * n + alt_ids)
+        sources, targets = pairs // n, pairs % n
+
+        prereq_offsets, prereq_ids = edges_to_csr(sources, targets, n)
+        dependent_offsets, dependent_ids = edges_to_csr(targets, sources, n)
+        return cls(names, group_offsets, alt_offsets, alt_ids, prereq_offsets, prereq_ids, dependent_offsets, dependent_ids)
+
+    def __len__(self):
+        return len(self.names)
+
+    # building + persistence
+
+    @classmethod
+    def from_groups(cls, course_groups):
+        """course_groups maps course number -> [[alternatives], ...]"""
+        names = list(course_groups)
+        ids = {name: i for i, name in enumerate(names)}
+
+        # prerequisites that aren't in the catalog (retired courses) still get a node
+        for groups in course_groups.values():
+            for group in groups:
+                for course in group:
+                    if course not in ids:
+                        ids[course] = len(names)
+                        names.append(course)
+
+        groups_per_course = [course_groups.get(name, []) for name in names]
+        group_offsets = counts_to_offsets([len(groups) for groups in groups_per_course])
+        alt_offsets, alt_ids = to_csr([[ids[c] for c in group] for groups in groups_per_course for group in groups])
+        return cls.compile(names, group_offsets, alt_offsets, alt_ids)
+
+    @classmethod
+    def from_csv(cls, file_name="psu_courses.csv"):
+        import pandas as pd  # only the CSV path needs it; planner / audit / API load from the catalog store
+
+        df = pd.read_csv(file_name, dtype=str, keep_default_na=False)
+        course_groups = {}
+
+        for record in df.to_dict("records"):
+            course = normalize_course_number(record["course_number"])
+            groups = parse_prerequisite_groups(literal_list(record.get("prerequisite_data", "")))
+
+            # no parsable text -> every listed course number is its own requirement
+            if not groups:
+                groups = [[normalize_course_number(c)] for c in literal_list(record.get("prerequisite_course_numbers", ""))]
+
+            course_groups[course] = groups
+        return cls.from_groups(course_groups)
+
+    def save(self, path=GRAPH_FILE):
+        np.savez(
+            path,
+            names=np.frombuffer("\n".join(self.names).encode("utf-8"), dtype=np.uint8),
+            **{name: getattr(self, name) for name in self.ARRAYS},
+        )
+
+    @classmethod
+    def load(cls, path=GRAPH_FILE):
+        with np.load(path) as arrays:
+            text = arrays["names"].tobytes().decode("utf-8")
+            names = text.split("\n") if text else []  # "".split("\n") would be one phantom "" course
+            return cls(names, *(arrays[name] for name in cls.ARRAYS))
+
+    # queries
+
+    def course_id(self, course_number):
+        return self.ids[normalize_course_number(course_number)]
+
+    def groups(self, course_id):
+        """prerequisite groups of a course as lists of course ids"""
+        return [
+            self.alt_ids[self.alt_offsets[g]:self.alt_offsets[g + 1]].tolist()
+            for g in range(self.group_offsets[course_id], self.group_offsets[course_id + 1])
+        ]
+
+    def direct_prerequisites(self, course_id):
+        return self.prereq_ids[self.prereq_offsets[course_id]:self.prereq_offsets[course_id + 1]]
+
+    def direct_dependents(self, course_id):
+        return self.dependent_ids[self.dependent_offsets[course_id]:self.dependent_offsets[course_id + 1]]
+
+    def traverse(self, course_id, offsets, targets):
+        seen = np.zeros(len(self.names), dtype=bool)
+        stack = [course_id]
+        found = []
+        while stack:
+            node = stack.pop()
+            for nxt in targets[offsets[node]:offsets[node + 1]].tolist():
+                if not seen[nxt]:
+                    seen[nxt] = True
+                    found.append(int(nxt))
+                    stack.append(nxt)
+        return found
+
+    def prerequisite_closure(self, course_id):
+        """every course reachable through any alternative of any group (transitive)"""
+        return self.traverse(course_id, self.prereq_offsets, self.prereq_ids)
+
+    def unlocks(self, course_id, transitive=False):
+        """courses that list this course as a prerequisite (directly or further down the chain)"""
+        if transitive:
+            return self.traverse(course_id, self.dependent_offsets, self.dependent_ids)
+        return self.direct_dependents(course_id).tolist()
+
+    def is_satisfied(self, course_id, completed):
+        """completed is a bool array over course ids -> every group has a completed alternative"""
+        for g in range(self.group_offsets[course_id], self.group_offsets[course_id + 1]):
+            if not completed[self.alt_ids[self.alt_offsets[g]:self.alt_offsets[g + 1]]].any():
+                return False
+        return True
+
+    def find_cycles(self):
+        """prerequisite cycles as lists of course ids (iterative three colour DFS)"""
+        WHITE, GREY, BLACK = 0, 1, 2
+        color = np.zeros(len(self.names), dtype=np.int8)
+        cycles = []
+
+        for root in range(len(self.names)):
+            if color[root] != WHITE:
+                continue
+
+            path = [root]
+            iters = [iter(self.direct_prerequisites(root).tolist())]
+            color[root] = GREY
+
+            while path:
+                nxt = next(iters[-1], None)
+                if nxt is None:
+                    color[path.pop()] = BLACK
+                    iters.pop()
+                elif color[nxt] == GREY:
+                    cycles.append(path[path.index(nxt):])
+                elif color[nxt] == WHITE:
+                    color[nxt] = GREY
+                    path.append(nxt)
+                    iters.append(iter(self.direct_prerequisites(nxt).tolist()))
+        return cycles
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    graph = PrerequisiteGraph.from_csv()
+    graph.save()
+    print(f"Built graph of {len(graph)} courses in {time.perf_counter() - start:.2f}s -> {GRAPH_FILE}")
+
+    start = time.perf_counter()
+    PrerequisiteGraph.load()
+    print(f"Loaded in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    for cycle in graph.find_cycles():
+        print(f"[Cycle] {' -> '.join(graph.names[c] for c in cycle)}")
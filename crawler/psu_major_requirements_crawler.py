@@ -24,17 +24,21 @@
 - do CSV file saving all the data first
 """
 
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
 from urllib.parse import urljoin
+import os
 import re
-import pandas as pd
-import time
+
+from catalog_store import CATALOG_FILE, CatalogStore
+from crawl_manifest import CrawlManifest, crawl_incrementally
+from crawl_scheduler import CrawlScheduler
+from page_document import PageDocument, PageTiming, run_extractors, print_timing_report
 
 BASE_URL = f"https://bulletins.psu.edu/undergraduate/colleges/abington/#majorsminorsandcertificatestext"
 OUTPUT_FILE_PATH = "../csv_files"
 OUTPUT_FILE_NAME = "psu_major_requirements.csv"
+MAJOR_OUTPUT_FILE = "major_requirements.csv"
+MANIFEST_FILE = "major_requirements.manifest.json"
+CHANGES_FILE = "major_requirements.changes.json"
 
 
 def clean_text_for_major(major_data_dict):
@@ -61,21 +65,17 @@ def clean_text_for_major(major_data_dict):
     return cleaned_dict
 
 
-def get_baccalaureate_degree_links():
-    response = requests.get(BASE_URL)
-    soup = BeautifulSoup(response.content, "html.parser")
+def get_baccalaureate_degree_links(base_url=BASE_URL):
+    soup = PageDocument.fetch(base_url).soup
 
     degree_links = [
-        urljoin(BASE_URL, a["href"]) for a in soup.select(".sitemap_visual li a")
+        urljoin(base_url, a["href"]) for a in soup.select(".sitemap_visual li a")
     ]
     return degree_links
 
 
-def extract_prescribed_courses(major_url):
+def extract_prescribed_courses(soup, major_url):
     """the list of prescribed courses"""
-    response = requests.get(major_url)
-    soup = BeautifulSoup(response.content, "html.parser")
-
     course_list = []
     needs_c_or_better = False
 
@@ -111,9 +111,7 @@ def extract_prescribed_courses(major_url):
     return course_list
 
 
-def extract_additional_courses(major_url):
-    response = requests.get(major_url)
-    soup = BeautifulSoup(response.content, "html.parser")
+def extract_additional_courses(soup, major_url):
     course_list = []
 
     needs_c_or_better = False
@@ -176,10 +174,8 @@ def extract_additional_courses(major_url):
     return course_list
 
 
-def extract_selectable_courses(major_url):
+def extract_selectable_courses(soup, major_url):
     """Groups courses under their 'Select n from...' headers and extracts required credits."""
-    response = requests.get(major_url)
-    soup = BeautifulSoup(response.content, "html.parser")
 
     course_groups = []
     current_group = None
@@ -233,10 +229,8 @@ def extract_selectable_courses(major_url):
     return course_groups
 
 
-def extract_course_comments(major_url):
+def extract_course_comments(soup, major_url):
     comments = []
-    response = requests.get(major_url)
-    soup = BeautifulSoup(response.content, "html.parser")
 
     # comments are right below <tr class="even/odd lastrow>"
     lastrow_trs = soup.find_all("tr", class_=lambda c: c and "lastrow" in c)
@@ -266,10 +260,8 @@ def extract_course_comments(major_url):
     return comments
 
 
-def extract_credit_breakdown(major_url):
+def extract_credit_breakdown(soup, major_url):
     """Extracts the credit breakdown (Gen Ed, Electives, Major Req, etc.) from the degree requirements section."""
-    response = requests.get(major_url)
-    soup = BeautifulSoup(response.content, "html.parser")
 
     credit_breakdown = {}
 
@@ -297,13 +289,10 @@ def extract_credit_breakdown(major_url):
     return credit_breakdown
 
 
-def extract_major_options(major_url):
+def extract_major_options(soup, major_url):
     """gets course requirements for majors with options (in tg12 tag)."""
     options = []
 
-    response = requests.get(major_url)
-    soup = BeautifulSoup(response.content, "html.parser")
-
     # Locate the dropdown div that holds options (if it exists)
     option_div = soup.find("div", id="tg12")
     if not option_div:
@@ -369,11 +358,28 @@ def extract_major_options(major_url):
     return options
 
 
-def generate_major_requirements(major_url):
-    response = requests.get(major_url)
-    soup = BeautifulSoup(
-        response.content, "html.parser"
-    )  # TODO make soup a parameter to be passed to all 'extract_...' functions
+# extractors run over every major page -> output field name : extractor(soup, major_url)
+MAJOR_EXTRACTORS = {
+    # breaking down degree requirments into credit types (gen ed, elective, major requirements etc)
+    "credit_breakdown": extract_credit_breakdown,
+    "prescribed_courses": extract_prescribed_courses,
+    "additional_courses": extract_additional_courses,
+    "comments": extract_course_comments,
+    "selectable_courses": extract_selectable_courses,
+}
+
+
+def generate_major_requirements(major_url, timings=None):
+    """fetch and parse the major page once then run every registered extractor over it
+
+    if a timings list is given a PageTiming for this major is appended to it
+    """
+    return major_requirements_from_document(PageDocument.fetch(major_url), timings)
+
+
+def major_requirements_from_document(document, timings=None):
+    soup = document.soup
+    timing = PageTiming(document)
 
     major_title = soup.find(class_="page-title").get_text(
         strip=True
@@ -382,20 +388,22 @@ def generate_major_requirements(major_url):
     major_code = major_code.replace("Program Code: ", "").split("_")[0]  # ACCAB_BS -> ACCAB
     min_credit_info = soup.find(class_="areaheader courselistcomment")
 
-    # breaking down degree requirments into credit types (gen ed, elective, major requirements etc)
-    credit_breakdown = extract_credit_breakdown(major_url)
+    extracted = run_extractors(document, MAJOR_EXTRACTORS, timing)
 
-    prescribed_courses = extract_prescribed_courses(major_url)
-    additional_courses = extract_additional_courses(major_url)
+    credit_breakdown = extracted["credit_breakdown"]
+    prescribed_courses = extracted["prescribed_courses"]
+    additional_courses = extracted["additional_courses"]
+    comment = extracted["comments"]
+    selectable_courses = extracted["selectable_courses"]
 
     cleaned_prescribed_courses = list(map(clean_text_for_major, prescribed_courses))
     cleaned_additional_courses = list(map(clean_text_for_major, additional_courses))
 
-    comment = extract_course_comments(major_url)
-
     # get options for courses (additional specializations)
     course_options = None
-    selectable_courses = extract_selectable_courses(major_url)
+
+    if timings is not None:
+        timings.append(timing)
 
     print(f"\n\t[Getting Data] {major_title} | {major_code}\n")
 
@@ -422,17 +430,64 @@ def generate_major_requirements(major_url):
 
     return major_data
 
+def crawl_major_requirements(
+    scheduler=None,
+    base_url=BASE_URL,
+    incremental=False,
+    output_file=MAJOR_OUTPUT_FILE,
+    manifest_file=MANIFEST_FILE,
+    changes_file=CHANGES_FILE,
+    catalog_file=CATALOG_FILE,
+):
+    """crawl every major concurrently; with incremental=True unchanged major pages keep their previous rows
+
+    rows go to output_file (CSV) and, normalized, to the catalog store
+    """
+    import pandas as pd
+
+    scheduler = scheduler or CrawlScheduler()
+    manifest = CrawlManifest(manifest_file)
+
+    previous_majors = {}
+    if incremental and os.path.exists(output_file):
+        previous_df = pd.read_csv(output_file, dtype=str, keep_default_na=False)
+        previous_majors = {r["major_code"]: r for r in previous_df.to_dict("records")}
+
+    links = get_baccalaureate_degree_links(base_url)
+    timings = []
+
+    major_data, changes = crawl_incrementally(
+        links,
+        extract=lambda document: [major_requirements_from_document(document, timings)],
+        record_id=lambda major: major["major_code"],
+        manifest=manifest,
+        previous_records=previous_majors,
+        scheduler=scheduler,
+    )
+
+    print_timing_report(timings)
+    scheduler.stats.report()
+    changes.report()
+    print(f"[Timing] {PageDocument.request_count} requests for {len(links)} majors (including index page)")
+
+    save_dataframe_to_csv(major_data, output_file)
+    with CatalogStore(catalog_file) as store:
+        store.write_majors(major_data)
+        store.delete_majors(changes.removed)
+    manifest.save()
+    changes.save(changes_file)
+    return major_data
+
+
 def save_dataframe_to_csv(data, filename="major_requirements.csv"):
+    import pandas as pd
+
     df = pd.DataFrame(data)
     df.to_csv(filename, index=False, encoding="utf-8")
     print(f"CSV file '{filename}' created")
 
 
 if __name__ == "__main__":
-    links = get_baccalaureate_degree_links()
-    major_data = []
+    import sys
 
-    for link in links:
-        major_data.append(generate_major_requirements(link))
-    
-    #save_dataframe_to_csv(major_data)
+    crawl_major_requirements(incremental="--incremental" in sys.argv)
@@ -1,22 +1,44 @@
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
+from bs4 import SoupStrainer
 from urllib.parse import urljoin
+import os
 import re
 
+from catalog_store import CATALOG_FILE, CatalogStore
+from crawl_manifest import CrawlManifest, crawl_incrementally
+from crawl_scheduler import CrawlScheduler
+from page_document import PageDocument
+
 
 # Base URL for the main page
 BASE_URL = "https://bulletins.psu.edu/university-course-descriptions/undergraduate/"
+OUTPUT_FILE = "psu_courses.csv"
+MANIFEST_FILE = "psu_courses.manifest.json"
+CHANGES_FILE = "psu_courses.changes.json"
+
+# department pages: only the .courseblock subtrees are read, so only those are parsed
+# (class values are still unsplit strings while straining -> match the word)
+COURSE_BLOCKS = SoupStrainer(class_=re.compile(r"(?:^|\s)courseblock(?:\s|$)"))
+COURSE_BLOCK_CLASSES = ("courseblocktitle", "courseblockdesc", "courseblockextra")
+
+PREREQUISITE_MARKER = "Enforced Prerequisite at Enrollment: "
+OR_PATTERN = re.compile(r"\sor\s")
+COURSE_NUMBER_PATTERN = re.compile(r"[A-Z]+\s[0-9]+")
+LEARNING_OBJECTIVE_PATTERN = re.compile(r"\([A-Z]+\)")
+# a course number can't contain "(" -> the two never overlap and one scan finds both
+COURSE_DATA_TOKENS = re.compile(r"([A-Z]+\s[0-9]+)|(\([A-Z]+\))")
+
+RANGE_CREDIT_PATTERN = re.compile(r"(\d+)-(\d+)\s+credits?")  #  1-12 Credits
+MAX_CREDIT_PATTERN = re.compile(r"maximum of (\d+)\s+credits?")  #  Maximum of 12 Credits
+SINGLE_CREDIT_PATTERN = re.compile(r"(\d+)\s+credits?")  #  3 Credits
 
 
 # get extract department links
-def get_department_links():
-    response = requests.get(BASE_URL)
-    soup = BeautifulSoup(response.content, "html.parser")
+def get_department_links(base_url=BASE_URL):
+    soup = PageDocument.fetch(base_url).soup
 
     # extract all department links
     links = [
-        urljoin(BASE_URL, a["href"]) for a in soup.select(".az_sitemap li a")
+        urljoin(base_url, a["href"]) for a in soup.select(".az_sitemap li a")
     ]  # extra parenthese problem
     # links = [BASE_URL + a['href'] for a in soup.select('.az_sitemap li a')]
     return links
@@ -24,89 +46,132 @@ def get_department_links():
 
 # extract courses from a department page
 def extract_courses_from_department(department_url):
-    response = requests.get(department_url)
-    soup = BeautifulSoup(response.content, "html.parser")
-    courses = []
+    document = PageDocument.fetch(department_url, parse_only=COURSE_BLOCKS)  # raises on bad responses so the scheduler retries
+    return extract_courses_from_soup(document.soup, department_url)
 
-    # get all course blocks
-    course_blocks = soup.select(".courseblock")
 
-    for block in course_blocks:
-        # get course title
-        title_block = block.select_one(".courseblocktitle")
+def extract_courses_from_soup(soup, department_url):
+    courses = []
 
-        if not title_block:
+    for block in soup.select(".courseblock"):
+        course = parse_course_block(block, department_url)
+        if course is None:
             print("<<<not a course>>>")
             continue
-
-        title_text = title_block.text.strip()
-        course_number, course_name = title_text.split(":", 1)
-
-        # get description
-        description = (
-            block.select_one(".courseblockdesc").text.strip()
-            if block.select_one(".courseblockdesc")
-            else "No description"
-        )
-
-        # get prerequisites
-        course_data_block = block.select_one(".courseblockextra")
-        course_data = course_data_block.text.strip() if course_data_block else "None"
-
-        # print(course_data)
-
-        course_data = {
-            "course_number": course_number.strip(),
-            "course_name": course_name.strip(),
-            "credits": extract_credits(description),
-            "description": description,
-            "prerequisite_data": extract_prerequisite_data(course_data),
-            "prerequisite_course_numbers": extract_prerequisite_course_numbers(
-                course_data
-            ),
-            "equivalent_course_numbers": extract_equivalent_course_numbers(course_data),
-            "learning_objectives": extract_learning_objectives(
-                course_data
-            ),  # GH, GA, etc.
-            "department_url": department_url,
-        }
-
-        # added course data
-        courses.append(course_data)
-        print(f"Prerequisites: {str(course_data['prerequisite_data'])}")
-        print(f"Learning Objectives: {str(course_data['learning_objectives'])}")
-        # for key in course_data.keys():
-        #     print(key, end='\t')
-        #     if course_data[key]:
-        #         print("yup")
-        #     else:
-        #         print("nope")
-        print("\n")
+        courses.append(course)
 
     return courses
 
 
+def parse_course_block(block, department_url):
+    """single pass over a .courseblock -> course record (None when the block has no title)
+
+    the title / description / extra elements are picked up in one walk of the
+    block, and the extra text is split once and scanned once for both course
+    numbers and learning objectives
+    """
+    parts = {}
+    for tag in block.find_all(class_=COURSE_BLOCK_CLASSES):
+        for cls in tag["class"]:
+            if cls in COURSE_BLOCK_CLASSES and cls not in parts:
+                parts[cls] = tag
+
+    title_block = parts.get("courseblocktitle")
+    if title_block is None:
+        return None
+
+    course_number, course_name = title_block.text.strip().split(":", 1)
+
+    description_block = parts.get("courseblockdesc")
+    description = description_block.text.strip() if description_block else "No description"
+
+    course_data_block = parts.get("courseblockextra")
+    course_data = course_data_block.text.strip() if course_data_block else "None"
+
+    prerequisite_data = course_data.split(PREREQUISITE_MARKER)[1:]
+    equivalent_course_numbers = []
+    for prerequisite in prerequisite_data:
+        equivalent_course_numbers.extend(OR_PATTERN.split(prerequisite))
+
+    prerequisite_course_numbers, learning_objectives = [], []
+    for number, objective in COURSE_DATA_TOKENS.findall(course_data):
+        if number:
+            prerequisite_course_numbers.append(number.replace("\xa0", " "))
+        else:
+            learning_objectives.append(objective)
+
+    return {
+        "course_number": course_number.strip(),
+        "course_name": course_name.strip(),
+        "credits": extract_credits(description),
+        "description": description,
+        "prerequisite_data": prerequisite_data,
+        "prerequisite_course_numbers": prerequisite_course_numbers,
+        "equivalent_course_numbers": equivalent_course_numbers,
+        "learning_objectives": learning_objectives,  # GH, GA, etc.
+        "department_url": department_url,
+    }
+
+
 # main function to scrape all courses
-def scrape_psu_courses():
-    print("Fetching department links...")
-    department_links = get_department_links()
+def scrape_psu_courses(
+    scheduler=None,
+    base_url=BASE_URL,
+    incremental=False,
+    output_file=OUTPUT_FILE,
+    manifest_file=MANIFEST_FILE,
+    changes_file=CHANGES_FILE,
+    catalog_file=CATALOG_FILE,
+):
+    """crawl every department page concurrently through the shared crawl scheduler
+
+    base_url can point at a local stand-in server serving saved bulletin pages
+
+    with incremental=True departments whose page content is unchanged since the
+    last run keep their rows from output_file and are not re-extracted; the ids
+    of added / updated / removed courses are written to changes_file
+    """
+    import pandas as pd
+
+    scheduler = scheduler or CrawlScheduler()
+    manifest = CrawlManifest(manifest_file)
 
-    all_courses = []
-    for link in department_links:
-        print(f"Scraping department: {link}")
-        department_courses = extract_courses_from_department(link)
-        all_courses.extend(department_courses)
+    # previous rows by course number (all values kept as the strings we wrote)
+    previous_courses = {}
+    if incremental and os.path.exists(output_file):
+        previous_df = pd.read_csv(output_file, dtype=str, keep_default_na=False)
+        previous_courses = {r["course_number"]: r for r in previous_df.to_dict("records")}
+
+    print("Fetching department links...")
+    department_links = get_department_links(base_url)
+
+    print(f"Scraping {len(department_links)} departments...")
+    all_courses, changes = crawl_incrementally(
+        department_links,
+        extract=lambda document: extract_courses_from_soup(document.soup, document.url),
+        record_id=lambda course: course["course_number"],
+        manifest=manifest,
+        previous_records=previous_courses,
+        scheduler=scheduler,
+        parse_only=COURSE_BLOCKS,
+    )
+
+    scheduler.stats.report()
+    changes.report()
 
     # save
     df = pd.DataFrame(all_courses)
-    df.to_csv("psu_courses.csv", index=False)
-    print("Courses saved to psu_courses.csv")
+    df.to_csv(output_file, index=False)
+    with CatalogStore(catalog_file) as store:
+        store.write_courses(all_courses)
+        store.delete_courses(changes.removed)
+    manifest.save()
+    changes.save(changes_file)
+    print(f"Courses saved to {output_file}")
 
 
 def extract_prerequisite_data(txt):
-    pre_req_start_pattern = "Enforced Prerequisite at Enrollment: "
-
-    pre_reqs = re.split(pre_req_start_pattern, txt)
+    pre_reqs = txt.split(PREREQUISITE_MARKER)
     if len(pre_reqs) <= 1:
         return []
     return pre_reqs[1:]
@@ -114,39 +179,23 @@ def extract_prerequisite_data(txt):
 
 def extract_equivalent_course_numbers(txt):
     # looks for courses under enforced pre-requisite that are like (ABC 123 or DEC 142)
-    pattern = f"\sor\s"
-    matches = extract_prerequisite_data(txt)
     equivalent_matches = []
-    if matches:
-        for match in matches:
-            equivalent_matches.extend(re.split(pattern, match))
+    for match in extract_prerequisite_data(txt):
+        equivalent_matches.extend(OR_PATTERN.split(match))
     return equivalent_matches
 
 
 def extract_prerequisite_course_numbers(txt):
     # if pre-req portion does not in None | Enforced Prerequisite -> None
-    # first look for the or case (MATH 123 or Stat 123)
-
-    match_str = "[A-Z]+\s[0-9]+"
-    matches = []
-    processed_matches = []
+    # drop \xa0 from matches
     if txt is not None:
-        matches.extend(re.findall(match_str, txt))
-
-        for match in matches:
-            processed_matches.append(re.sub(f"\\xa0", f" ", match))
-
-        # drop \xa0 from matches
-        return processed_matches
+        return [match.replace("\xa0", " ") for match in COURSE_NUMBER_PATTERN.findall(txt)]
     return []
 
 
 def extract_learning_objectives(txt):
-    match_str = f"\([A-Z]+\)"
-    matches = []
     if txt is not None:
-        matches.extend(re.findall(match_str, txt))
-        return matches
+        return LEARNING_OBJECTIVE_PATTERN.findall(txt)
     return []
 
 
@@ -163,9 +212,9 @@ def extract_credits(txt):
     # normalize text
     txt = txt.lower().strip()
 
-    range_credit_pattern = r"(\d+)-(\d+)\s+credits?"  #  1-12 Credits
-    max_credit_pattern = r"maximum of (\d+)\s+credits?"  #  Maximum of 12 Credits
-    single_credit_pattern = r"(\d+)\s+credits?"  #  3 Credits
+    # every pattern below needs the word
+    if "credit" not in txt:
+        return None
 
     # cases with a slash ("/") separating values
     if "/" in txt:
@@ -174,12 +223,12 @@ def extract_credits(txt):
 
         for part in parts:
             # check for range case
-            match = re.search(range_credit_pattern, part)
+            match = RANGE_CREDIT_PATTERN.search(part)
             if match:
                 min_credits, max_credits = int(match.group(1)), int(match.group(2))
 
             # max case
-            match = re.search(max_credit_pattern, part)
+            match = MAX_CREDIT_PATTERN.search(part)
             if match:
                 max_credits = int(match.group(1))
 
@@ -189,17 +238,17 @@ def extract_credits(txt):
             return (0, max_credits)  # assume 0 min
 
     # range case
-    match = re.search(range_credit_pattern, txt)
+    match = RANGE_CREDIT_PATTERN.search(txt)
     if match:
         return int(match.group(1)), int(match.group(2))  # (min_credits, max_credits)
 
     # maximum of case
-    match = re.search(max_credit_pattern, txt)
+    match = MAX_CREDIT_PATTERN.search(txt)
     if match:
         return (0, int(match.group(1)))  # assume min is 0 if none given
 
     # case single credit values
-    match = re.search(single_credit_pattern, txt)
+    match = SINGLE_CREDIT_PATTERN.search(txt)
     if match:
         credits = int(match.group(1))
         return credits  # fixed credits are returned
@@ -208,4 +257,6 @@ def extract_credits(txt):
 
 
 if __name__ == "__main__":
-    scrape_psu_courses()
+    import sys
+
+    scrape_psu_courses(incremental="--incremental" in sys.argv)
@@ -0,0 +1,237 @@
+"""
+Major requirements compiled from the major crawler output.
+
+major_requirements.csv stores every list column as a python literal with
+bulletin formatting left in ("BA\\xa0241&BA\\xa0242", "ENGL\\xa015or30H*#",
+"General Education Course"). This module turns one row into:
+
+    Requirement      one slot that must be filled by ANY of its alternatives,
+                     each alternative being a bundle of courses taken together
+                     (prescribed courses, additional courses + their equivalents)
+    SelectionGroup   "select 9 credits from the following" -> candidate
+                     Requirements and a credit or course count target
+    MajorRequirements  all of the above plus the credit_breakdown and degree total
+
+so the planner and the audit work on course numbers that match
+PrerequisiteGraph ("CMPSC 121") instead of re-parsing bulletin strings.
+"""
+
+import os
+import re
+
+from csv_values import literal_dict, literal_list, parse_course_credits
+from prereq_graph import normalize_course_number
+
+MAJOR_FILE = "major_requirements.csv"
+COURSES_FILE = "psu_courses.csv"
+DEFAULT_CREDITS = 3
+
+# "BIOL/PPEM 425*" -> BIOL 425,  "ENGL 15or30H" -> ENGL 15 + "or30H" tail
+COURSE_CODE_PATTERN = re.compile(r"([A-Z]{2,6})(?:/[A-Z]{2,6})*[\s\xa0]+(\d{1,3}[A-Z]?)")
+OR_NUMBER_PATTERN = re.compile(r"or[\s\xa0]*(\d{1,3}[A-Z]?)")
+SELECT_CREDITS_PATTERN = re.compile(r"(\d+)(?:\s*-\s*\d+)?\s+credits?")
+SELECT_COUNT_PATTERN = re.compile(r"select\s+(one|two|three|four|five|\d+)\s+(?:of|from|course)")
+MIN_CREDITS_PATTERN = re.compile(r"minimum of (\d+) credits")
+CREDIT_RANGE_PATTERN = re.compile(r"(\d+)(?:\s*-\s*(\d+))?")
+
+COUNT_WORDS = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5}
+
+
+def parse_course_code(text):
+    """bulletin course code -> alternatives, each a tuple of course numbers taken together
+
+    "BA\\xa0241&BA\\xa0242"  -> [("BA 241", "BA 242")]
+    "ENGL\\xa015or30H*#"    -> [("ENGL 15",), ("ENGL 30H",)]
+    "General Education"    -> []
+    """
+    if "&" in text:
+        bundle = []
+        for part in text.split("&"):
+            match = COURSE_CODE_PATTERN.match(part.strip())
+            if not match:
+                return []
+            bundle.append(f"{match.group(1)} {match.group(2)}")
+        return [tuple(bundle)]
+
+    match = COURSE_CODE_PATTERN.match(text.strip())
+    if not match:
+        return []
+
+    prefix = match.group(1)
+    alternatives = [(f"{prefix} {match.group(2)}",)]
+    for number in OR_NUMBER_PATTERN.findall(text[match.end():]):
+        alternatives.append((f"{prefix} {number}",))
+    return alternatives
+
+
+def parse_credits(value):
+    """"3" -> 3, "1-4" -> 1, titles / blanks -> None"""
+    match = CREDIT_RANGE_PATTERN.fullmatch(str(value).strip())
+    return int(match.group(1)) if match else None
+
+
+def parse_credit_range(value):
+    """credit_breakdown value "89-99" -> (89, 99)"""
+    match = CREDIT_RANGE_PATTERN.search(str(value))
+    if not match:
+        return 0, 0
+    low = int(match.group(1))
+    return low, int(match.group(2) or low)
+
+
+def parse_selection(text, required_credits):
+    """selection_requirement -> (min_credits, min_courses), one of them 0"""
+    text = text.lower()
+
+    match = SELECT_CREDITS_PATTERN.search(text)
+    if match:
+        return int(match.group(1)), 0
+
+    match = SELECT_COUNT_PATTERN.search(text)
+    if match:
+        word = match.group(1)
+        return 0, COUNT_WORDS.get(word) or int(word)
+
+    return parse_credits(required_credits) or 0, 0
+
+
+class Requirement:
+    def __init__(self, label, alternatives, kind, needs_c_or_better=False):
+        self.label = label
+        self.alternatives = alternatives
+        self.kind = kind
+        self.needs_c_or_better = needs_c_or_better
+
+    def __repr__(self):
+        return f"Requirement({self.label!r}, {self.alternatives!r})"
+
+
+class SelectionGroup:
+    def __init__(self, label, candidates, min_credits=0, min_courses=0):
+        self.label = label
+        self.candidates = candidates
+        self.min_credits = min_credits
+        self.min_courses = min_courses
+
+
+class MajorRequirements:
+    def __init__(self, code, title, credit_breakdown, total_credits, required, selections, credits):
+        self.code = code
+        self.title = title
+        self.credit_breakdown = credit_breakdown
+        self.total_credits = total_credits
+        self.required = required
+        self.selections = selections
+        self.credits = credits  # course number -> credits listed on the major page
+
+    @classmethod
+    def from_record(cls, record):
+        credits = {}
+
+        def note_credits(bundle, value):
+            parsed = parse_credits(value)
+            if parsed is None:
+                return
+            for course in bundle:
+                credits.setdefault(course, max(1, parsed // len(bundle)))
+
+        required = []
+        for course in literal_list(record.get("prescribed_courses")):
+            alternatives = parse_course_code(course.get("course_code", ""))
+            if not alternatives:
+                continue
+            for bundle in alternatives:
+                note_credits(bundle, course.get("credits"))
+            required.append(Requirement(normalize_course_number(course["course_code"]), alternatives, "prescribed", course.get("needs_c_or_better", False)))
+
+        required.extend(cls.additional_requirements(literal_list(record.get("additional_courses")), note_credits))
+
+        selections = []
+        for group in literal_list(record.get("selectable_courses")):
+            candidates = []
+            for course in group.get("courses", []):
+                alternatives = parse_course_code(course.get("course_code", ""))
+                if alternatives:
+                    candidates.append(Requirement(normalize_course_number(course["course_code"]), alternatives, "selectable"))
+            min_credits, min_courses = parse_selection(group.get("selection_requirement", ""), group.get("required_credits", ""))
+            selections.append(SelectionGroup(group.get("selection_requirement", ""), candidates, min_credits, min_courses))
+
+        credit_breakdown = {category: parse_credit_range(value) for category, value in literal_dict(record.get("credit_breakdown")).items()}
+
+        match = MIN_CREDITS_PATTERN.search(str(record.get("min_credit_info") or ""))
+        total_credits = int(match.group(1)) if match else sum(low for low, _ in credit_breakdown.values())
+
+        return cls(record["major_code"], record.get("major_title", ""), credit_breakdown, total_credits, required, selections, credits)
+
+    @staticmethod
+    def additional_requirements(courses, note_credits):
+        """additional courses linked by equivalent_course collapse into one either-or Requirement"""
+        parent = {}
+
+        def find(code):
+            while parent.setdefault(code, code) != code:
+                code = parent[code]
+            return code
+
+        entries = []
+        for course in courses:
+            code = normalize_course_number(course.get("course_code", ""))
+            alternatives = parse_course_code(course.get("course_code", ""))
+            if not alternatives:
+                continue
+            for bundle in alternatives:
+                note_credits(bundle, course.get("credits"))
+
+            entries.append((code, alternatives, course.get("needs_c_or_better", False)))
+            equivalent = normalize_course_number(course.get("equivalent_course") or "")
+            if equivalent:
+                parent[find(code)] = find(equivalent)
+
+        grouped = {}
+        for code, alternatives, c_or_better in entries:
+            label, merged, needs = grouped.get(find(code), ([], [], False))
+            label.append(code)
+            merged.extend(a for a in alternatives if a not in merged)
+            grouped[find(code)] = (label, merged, needs or c_or_better)
+
+        return [Requirement(" or ".join(label), merged, "additional", needs) for label, merged, needs in grouped.values()]
+
+    def courses(self):
+        """every course number this major mentions"""
+        found = set()
+        for requirement in self.required + [c for group in self.selections for c in group.candidates]:
+            for bundle in requirement.alternatives:
+                found.update(bundle)
+        return found
+
+
+def credits_of(major, course, course_credits):
+    """credits listed on the major page, else the catalog, else DEFAULT_CREDITS"""
+    return major.credits.get(course) or course_credits.get(course) or DEFAULT_CREDITS
+
+
+def load_majors(file_name=MAJOR_FILE):
+    """major_code -> MajorRequirements for every row of the major crawler CSV"""
+    import pandas as pd
+
+    df = pd.read_csv(file_name, dtype=str, keep_default_na=False)
+    majors = {}
+    for record in df.to_dict("records"):
+        majors[record["major_code"]] = MajorRequirements.from_record(record)
+    return majors
+
+
+def load_course_credits(file_name=COURSES_FILE):
+    """course number -> (minimum) credits from the course crawler CSV, empty if it hasn't been run"""
+    if not os.path.exists(file_name):
+        return {}
+
+    import pandas as pd
+
+    df = pd.read_csv(file_name, dtype=str, keep_default_na=False, usecols=["course_number", "credits"])
+    credits = {}
+    for course_number, value in zip(df["course_number"], df["credits"]):
+        credits_min, _ = parse_course_credits(value)
+        if credits_min is not None:
+            credits[normalize_course_number(course_number)] = credits_min
+    return credits
@@ -0,0 +1,310 @@
+"""
+Semester-by-semester plan for a major.
+
+Given a major code, the courses a student has completed and a per-semester
+credit cap, the planner
+
+    1. picks one alternative for every prescribed / additional requirement
+       (an alternative already taken wins, otherwise the one with the fewest
+       unmet prerequisites),
+    2. fills every "select n credits / n of the following" group greedily the
+       same way, counting completed courses first,
+    3. pulls in missing prerequisites from PrerequisiteGraph (one alternative
+       per OR-group),
+    4. topologically schedules the result with Kahn's algorithm: every semester
+       takes the available courses with the longest chain of dependents first
+       until the credit cap is reached,
+    5. pads with elective placeholders up to the degree's total credits.
+
+Majors are loaded once by SemesterPlanner.load (from the catalog store when
+it exists, else from the crawler CSVs), so re-planning is pure
+python over a few dozen courses.
+
+usage: python semester_planner.py <major_code> [--completed "CMPSC 121" "MATH 140"] [--cap 18]
+"""
+
+import os
+import time
+
+from catalog_store import CATALOG_FILE, CatalogStore
+from prereq_graph import GRAPH_FILE, PrerequisiteGraph, normalize_course_number
+from requirement_groups import COURSES_FILE, MAJOR_FILE, credits_of, load_course_credits, load_majors
+
+DEFAULT_CREDIT_CAP = 18
+ELECTIVE_CREDITS = 3
+
+
+def load_graph(graph_file=GRAPH_FILE, courses_file=COURSES_FILE, store=None):
+    """compiled graph if saved, else built from the catalog store / course CSV, else empty (no prerequisite data)"""
+    if os.path.exists(graph_file):
+        return PrerequisiteGraph.load(graph_file)
+    if store is not None and store.counts()["courses"]:
+        return PrerequisiteGraph.from_groups(store.prerequisite_groups())
+    if os.path.exists(courses_file):
+        return PrerequisiteGraph.from_csv(courses_file)
+    return PrerequisiteGraph.from_groups({})
+
+
+def load_catalog(major_file=MAJOR_FILE, graph_file=GRAPH_FILE, courses_file=COURSES_FILE, catalog_file=CATALOG_FILE):
+    """(majors, prerequisite graph, course credits) from the catalog store, falling back to the crawler CSVs"""
+    if os.path.exists(catalog_file):
+        with CatalogStore(catalog_file) as store:
+            course_credits = store.course_credits() or load_course_credits(courses_file)
+            return store.load_majors(), load_graph(graph_file, courses_file, store), course_credits
+    return load_majors(major_file), load_graph(graph_file, courses_file), load_course_credits(courses_file)
+
+
+class SemesterPlan:
+    def __init__(self, major_code, credit_cap, semesters, credits, reasons, unscheduled, unmet, seconds):
+        self.major_code = major_code
+        self.credit_cap = credit_cap
+        self.semesters = semesters  # [[course number, ...], ...]
+        self.credits = credits
+        self.reasons = reasons  # course number -> why it is in the plan
+        self.unscheduled = unscheduled  # courses stuck behind a prerequisite cycle
+        self.unmet = unmet  # [(selection label, shortfall), ...]
+        self.seconds = seconds
+
+    def semester_credits(self):
+        return [sum(self.credits[c] for c in semester) for semester in self.semesters]
+
+    @property
+    def total_credits(self):
+        return sum(self.semester_credits())
+
+    def to_dict(self):
+        return {
+            "major_code": self.major_code,
+            "credit_cap": self.credit_cap,
+            "semesters": [
+                [{"course": c, "credits": self.credits[c], "reason": self.reasons[c]} for c in semester]
+                for semester in self.semesters
+            ],
+            "unscheduled": self.unscheduled,
+            "unmet": [{"requirement": label, "shortfall": shortfall} for label, shortfall in self.unmet],
+        }
+
+    def report(self):
+        print(f"[Plan] {self.major_code}: {len(self.semesters)} semesters, {self.total_credits} credits "
+              f"(cap {self.credit_cap}) in {self.seconds * 1000:.1f}ms")
+        for i, (semester, credits) in enumerate(zip(self.semesters, self.semester_credits()), start=1):
+            print(f"  Semester {i} ({credits} cr): {', '.join(semester)}")
+        for course in self.unscheduled:
+            print(f"  [Unscheduled] {course} (prerequisite cycle)")
+        for label, shortfall in self.unmet:
+            print(f"  [Unmet] {label} -> {shortfall} short")
+
+
+class SemesterPlanner:
+    def __init__(self, majors, graph, course_credits=None):
+        self.majors = majors
+        self.graph = graph
+        self.course_credits = course_credits or {}
+
+    @classmethod
+    def load(cls, major_file=MAJOR_FILE, graph_file=GRAPH_FILE, courses_file=COURSES_FILE, catalog_file=CATALOG_FILE):
+        return cls(*load_catalog(major_file, graph_file, courses_file, catalog_file))
+
+    def credits_of(self, major, course):
+        return credits_of(major, course, self.course_credits)
+
+    def prerequisite_groups(self, course):
+        """OR-groups of course numbers, empty for courses the graph doesn't know"""
+        course_id = self.graph.ids.get(course)
+        if course_id is None:
+            return []
+        return [[self.graph.names[a] for a in group] for group in self.graph.groups(course_id)]
+
+    def unmet_groups(self, course, taken):
+        return sum(1 for group in self.prerequisite_groups(course) if not any(c in taken for c in group))
+
+    def bundle_cost(self, bundle, taken):
+        """courses still to take + their unmet prerequisite groups"""
+        return sum(1 + self.unmet_groups(c, taken) for c in bundle if c not in taken)
+
+    def choose(self, alternatives, taken):
+        return min(alternatives, key=lambda bundle: self.bundle_cost(bundle, taken))
+
+    def plan(self, major_code, completed=(), credit_cap=DEFAULT_CREDIT_CAP, fill_electives=True):
+        if credit_cap <= 0:
+            raise ValueError(f"credit_cap must be positive, got {credit_cap}")
+
+        start = time.perf_counter()
+        major = self.majors[major_code]
+        done = {normalize_course_number(c) for c in completed}
+        taken = set(done)  # completed + planned
+        reasons = {}  # planned course -> reason, in insertion order
+
+        def add(bundle, reason):
+            for course in bundle:
+                if course not in taken:
+                    taken.add(course)
+                    reasons[course] = reason
+
+        for requirement in major.required:
+            if any(taken.issuperset(bundle) for bundle in requirement.alternatives):
+                continue
+            add(self.choose(requirement.alternatives, taken), requirement.label)
+
+        unmet = self.fill_selections(major, taken, done, add)
+
+        # missing prerequisites, one alternative per unmet OR-group
+        queue = list(reasons)
+        while queue:
+            course = queue.pop()
+            for group in self.prerequisite_groups(course):
+                if any(c in taken for c in group):
+                    continue
+                prerequisite = min(group, key=lambda c: self.unmet_groups(c, taken))
+                add((prerequisite,), f"prerequisite of {course}")
+                queue.append(prerequisite)
+
+        credits = {course: self.credits_of(major, course) for course in reasons}
+        semesters, unscheduled = self.schedule(list(reasons), done, credits, credit_cap)
+
+        if fill_electives:
+            completed_credits = sum(self.credits_of(major, c) for c in done)
+            remaining = major.total_credits - completed_credits - sum(credits.values())
+            self.fill_electives(semesters, credits, reasons, remaining, credit_cap)
+
+        return SemesterPlan(major_code, credit_cap, semesters, credits, reasons, unscheduled, unmet, time.perf_counter() - start)
+
+    def fill_selections(self, major, taken, done, add):
+        """greedily satisfy every selection group -> [(label, shortfall), ...] for those that can't be"""
+        unmet = []
+        counted = set()  # a course only counts toward one selection group
+
+        for group in major.selections:
+            credits = courses = 0
+
+            def rank(candidate):
+                bundle = self.choose(candidate.alternatives, taken)
+                return (not done.issuperset(bundle), self.bundle_cost(bundle, taken))
+
+            for candidate in sorted(group.candidates, key=rank):
+                if (group.min_credits and credits >= group.min_credits) or (group.min_courses and courses >= group.min_courses):
+                    break
+                if not group.min_credits and not group.min_courses:
+                    break
+
+                bundle = self.choose(candidate.alternatives, taken)
+                if counted.intersection(bundle):
+                    continue
+
+                counted.update(bundle)
+                add(bundle, group.label)
+                credits += sum(self.credits_of(major, c) for c in bundle)
+                courses += 1
+
+            if group.min_credits and credits < group.min_credits:
+                unmet.append((group.label, f"{group.min_credits - credits} credits"))
+            elif group.min_courses and courses < group.min_courses:
+                unmet.append((group.label, f"{group.min_courses - courses} courses"))
+        return unmet
+
+    def schedule(self, courses, done, credits, credit_cap):
+        """Kahn layering under the credit cap -> (semesters, courses that never became available)"""
+        index = {course: i for i, course in enumerate(courses)}
+        n = len(courses)
+
+        # OR-groups over local indices; groups already satisfied by completed courses drop out
+        groups = [[] for _ in range(n)]
+        dependents = [[] for _ in range(n)]
+        for i, course in enumerate(courses):
+            for group in self.prerequisite_groups(course):
+                if any(c in done for c in group):
+                    continue
+                local = [index[c] for c in group if c in index]
+                if local:
+                    groups[i].append(local)
+                    for j in local:
+                        dependents[j].append(i)
+
+        height = self.chain_heights(dependents)
+        order = sorted(range(n), key=lambda i: (-height[i], i))
+
+        term = [-1] * n  # semester each course lands in
+        remaining = set(range(n))
+        semesters = []
+
+        while remaining:
+            current = len(semesters)
+            available = [
+                i for i in order
+                if i in remaining and all(any(0 <= term[j] < current for j in group) for group in groups[i])
+            ]
+            if not available:
+                break
+
+            semester, load = [], 0
+            for i in available:
+                if load + credits[courses[i]] <= credit_cap or not semester:
+                    semester.append(i)
+                    load += credits[courses[i]]
+                    term[i] = current
+                    remaining.discard(i)
+
+            semesters.append([courses[i] for i in semester])
+
+        return semesters, [courses[i] for i in sorted(remaining)]
+
+    @staticmethod
+    def chain_heights(dependents):
+        """longest chain of dependents below every course (critical path first)"""
+        height = [-1] * len(dependents)
+        for root in range(len(dependents)):
+            if height[root] >= 0:
+                continue
+            stack = [(root, iter(dependents[root]))]
+            height[root] = 0
+            while stack:
+                node, children = stack[-1]
+                child = next(children, None)
+                if child is None:
+                    stack.pop()
+                    if stack:
+                        parent = stack[-1][0]
+                        height[parent] = max(height[parent], height[node] + 1)
+                elif height[child] < 0:
+                    height[child] = 0
+                    stack.append((child, iter(dependents[child])))
+                else:
+                    height[node] = max(height[node], height[child] + 1)
+        return height
+
+    @staticmethod
+    def fill_electives(semesters, credits, reasons, remaining, credit_cap):
+        """top semesters up to the cap with elective placeholders, then add semesters
+
+        electives shrink to fit caps below ELECTIVE_CREDITS, so an empty semester always takes one
+        """
+        count = 0
+        i = 0
+        while remaining > 0:
+            if i == len(semesters):
+                semesters.append([])
+            load = sum(credits[c] for c in semesters[i])
+            size = min(ELECTIVE_CREDITS, remaining, credit_cap)
+
+            if semesters[i] and load + size > credit_cap:
+                i += 1
+                continue
+
+            count += 1
+            elective = f"ELECTIVE {count}"
+            credits[elective] = size
+            reasons[elective] = "general education / elective credits"
+            semesters[i].append(elective)
+            remaining -= credits[elective]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("major_code")
+    parser.add_argument("--completed", nargs="*", default=[])
+    parser.add_argument("--cap", type=int, default=DEFAULT_CREDIT_CAP)
+    args = parser.parse_args()
+
+    SemesterPlanner.load().plan(args.major_code, args.completed, args.cap).report()
@@ -0,0 +1,43 @@
+"""
+Stopword list and tokenizer shared by the cleaner and the lexical index.
+
+The NLTK english stopword list is vendored next to this module
+(stopwords_english.txt) so nothing needs a download. A token is what
+data_cleaner.clean_txt leaves between spaces: lowercased, ascii punctuation
+dropped, unicode quotes and dashes split off as their own tokens, stopwords
+removed -> tokenize(text) == clean_txt(text).split().
+"""
+
+import os
+import re
+import string
+from functools import lru_cache
+
+STOPWORDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stopwords_english.txt")
+
+PUNC_PATTERN = re.compile(f"[{re.escape(string.punctuation)}]+")
+
+# unicode quotes and dashes survive ascii punctuation removal -> split them off as their own tokens
+SEPARATE_PATTERN = re.compile("[«“‘„»”’\u2012-\u2015]")
+
+
+def load_stopwords(path=STOPWORDS_FILE):
+    with open(path, mode="r", encoding="utf-8") as f:
+        return frozenset(line.strip() for line in f if line.strip())
+
+
+@lru_cache(maxsize=None)
+def stop_words():
+    """the vendored stopword list, read once per process"""
+    return load_stopwords()
+
+
+def normalize(text):
+    """lowercase, drop punctuation, space out unicode quotes/dashes (works on a joined batch too)"""
+    return SEPARATE_PATTERN.sub(r" \g<0> ", PUNC_PATTERN.sub("", text.lower()))
+
+
+def tokenize(text):
+    """text -> tokens with stopwords removed"""
+    stops = stop_words()
+    return [w for w in normalize(text).split() if w not in stops]
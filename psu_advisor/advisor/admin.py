@@ -1,3 +1,23 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Course, Major, RequirementGroup
+
+
+@admin.register(Course)
+class CourseAdmin(admin.ModelAdmin):
+    list_display = ["course_number", "course_name", "credits_min", "credits_max"]
+    list_filter = ["course_prefix"]
+    search_fields = ["course_number", "course_name"]
+
+
+@admin.register(Major)
+class MajorAdmin(admin.ModelAdmin):
+    list_display = ["major_code", "major_title", "min_credits"]
+    search_fields = ["major_code", "major_title"]
+
+
+@admin.register(RequirementGroup)
+class RequirementGroupAdmin(admin.ModelAdmin):
+    list_display = ["major", "position", "kind", "label"]
+    list_filter = ["kind"]
+    list_select_related = ["major"]
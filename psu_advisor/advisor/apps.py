@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class AdvisorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'advisor'
+
+    def ready(self):
+        # server processes load the model / index / graph up front; management commands stay light
+        if settings.ADVISOR_WARM_START:
+            from . import services
+
+            services.warm()
@@ -0,0 +1,126 @@
+"""
+Micro-batching of concurrent search requests.
+
+Every request awaits QueryBatcher.submit. The first request of a batch waits
+at most `max_wait_ms` for others to arrive (or until `max_batch_size` are
+queued), then the whole batch is embedded in ONE forward pass and searched
+per (n_results, filter) group on a single worker thread, so the model never
+runs concurrently with itself. While a batch runs, new requests pile up and
+form the next batch, so batches grow with load instead of requests queueing
+one forward pass each.
+"""
+
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class BatchStats:
+    def __init__(self):
+        self.batches = 0
+        self.queries = 0
+        self.largest = 0
+        self.busy_seconds = 0.0
+
+    def record(self, size, seconds):
+        self.batches += 1
+        self.queries += size
+        self.largest = max(self.largest, size)
+        self.busy_seconds += seconds
+
+    def to_dict(self):
+        return {
+            "batches": self.batches,
+            "queries": self.queries,
+            "mean_batch_size": self.queries / self.batches if self.batches else 0.0,
+            "largest_batch": self.largest,
+            "busy_seconds": round(self.busy_seconds, 3),
+        }
+
+
+class QueryBatcher:
+    def __init__(self, embed, search, max_batch_size=32, max_wait_ms=5.0):
+        """
+        embed(texts) -> (n, dim) embeddings in one forward pass
+        search(embeddings, n_results, where) -> one {"ids", "distances", "metadatas"} dict per row
+        """
+        self.embed = embed
+        self.search = search
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="query-batcher")
+        self.stats = BatchStats()
+
+        # bound to the running event loop on first submit
+        self.loop = None
+        self.queue = None
+        self.worker = None
+
+    async def submit(self, text, n_results=10, where=None):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.loop = loop
+            self.queue = asyncio.Queue()
+            self.worker = loop.create_task(self.run())
+
+        future = loop.create_future()
+        await self.queue.put((text, n_results, where, future))
+        return await future
+
+    async def run(self):
+        while True:
+            batch = [await self.queue.get()]
+            deadline = self.loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - self.loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # anything that arrived meanwhile rides along
+            while len(batch) < self.max_batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            requests = [(text, n_results, where) for text, n_results, where, _ in batch]
+            try:
+                results = await self.loop.run_in_executor(self.executor, self.run_batch, requests)
+            except Exception as e:
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (*_, future), result in zip(batch, results):
+                if not future.done():  # client may have disconnected
+                    future.set_result(result)
+
+    def run_batch(self, requests):
+        """[(text, n_results, where), ...] -> results in request order (runs on the worker thread)"""
+        start = time.perf_counter()
+        embeddings = np.atleast_2d(self.embed([text for text, _, _ in requests]))
+
+        groups = {}
+        for i, (_, n_results, where) in enumerate(requests):
+            key = (n_results, json.dumps(where, sort_keys=True))
+            groups.setdefault(key, []).append(i)
+
+        results = [None] * len(requests)
+        for rows in groups.values():
+            _, n_results, where = requests[rows[0]]
+            for row, result in zip(rows, self.search(embeddings[rows], n_results, where)):
+                results[row] = result
+
+        self.stats.record(len(requests), time.perf_counter() - start)
+        return results
+
+    def close(self):
+        if self.worker is not None:
+            self.worker.cancel()
+        self.executor.shutdown(wait=False)
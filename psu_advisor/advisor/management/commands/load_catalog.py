@@ -0,0 +1,218 @@
+"""
+Load crawl output into the advisor models.
+
+    python manage.py load_catalog [--catalog ../crawler/catalog.sqlite3]
+                                  [--majors ../crawler/major_requirements.csv --courses ../crawler/psu_courses.csv]
+
+Reads the crawler's catalog store (or, when it doesn't exist, builds one in
+memory from the crawler CSVs) and writes everything in one transaction with
+batched bulk_create calls. Courses, majors and requirement groups are
+upserted on their natural keys and the ones that left the catalog are
+deleted; prerequisite and requirement course rows of the loaded courses /
+majors are replaced.
+"""
+
+import os
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from advisor.models import Course, Major, Prerequisite, RequirementCourse, RequirementGroup
+
+CRAWLER_DIR = settings.BASE_DIR.parent / "crawler"
+DELETE_CHUNK = 500  # stay under sqlite's bound parameter limit
+
+
+def open_catalog(catalog, majors, courses):
+    """CatalogStore over the crawler output -> the store file, or an in-memory copy of the CSVs"""
+    if str(CRAWLER_DIR) not in sys.path:
+        sys.path.insert(0, str(CRAWLER_DIR))
+
+    import pandas as pd
+    from catalog_store import CatalogStore
+
+    if os.path.exists(catalog):
+        return CatalogStore(catalog)
+
+    if not os.path.exists(majors) and not os.path.exists(courses):
+        raise CommandError(f"no catalog store at {catalog} and no crawler CSVs ({majors}, {courses})")
+
+    store = CatalogStore(":memory:")
+    if os.path.exists(majors):
+        store.write_majors(pd.read_csv(majors, dtype=str, keep_default_na=False).to_dict("records"))
+    if os.path.exists(courses):
+        store.write_courses(pd.read_csv(courses, dtype=str, keep_default_na=False).to_dict("records"))
+    return store
+
+
+def delete_in_chunks(queryset, field, values):
+    values = list(values)
+    for start in range(0, len(values), DELETE_CHUNK):
+        queryset.filter(**{f"{field}__in": values[start:start + DELETE_CHUNK]}).delete()
+
+
+def requirement_groups(major):
+    """MajorRequirements -> [(RequirementGroup fields, options), ...] in position order"""
+    groups = []
+    for requirement in major.required:
+        fields = {"kind": requirement.kind, "label": requirement.label, "needs_c_or_better": requirement.needs_c_or_better}
+        groups.append((fields, requirement.alternatives))
+
+    for group in major.selections:
+        fields = {
+            "kind": RequirementGroup.SELECTION,
+            "label": group.label,
+            "min_credits": group.min_credits,
+            "min_courses": group.min_courses,
+        }
+        options = list(dict.fromkeys(bundle for candidate in group.candidates for bundle in candidate.alternatives))
+        groups.append((fields, options))
+    return groups
+
+
+class Command(BaseCommand):
+    help = "Upsert courses, majors, requirement groups and prerequisites from the crawler output"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--catalog", default=str(CRAWLER_DIR / "catalog.sqlite3"))
+        parser.add_argument("--majors", default=str(CRAWLER_DIR / "major_requirements.csv"))
+        parser.add_argument("--courses", default=str(CRAWLER_DIR / "psu_courses.csv"))
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        store = open_catalog(options["catalog"], options["majors"], options["courses"])
+        try:
+            courses = store.courses()
+            prerequisite_groups = store.prerequisite_groups()
+            majors = store.load_majors()
+            comments = store.major_comments()
+        finally:
+            store.close()
+        read_seconds = time.perf_counter() - start
+
+        with transaction.atomic():
+            course_ids = self.load_courses(courses, prerequisite_groups, options["batch_size"])
+            self.load_majors(majors, comments, course_ids, options["batch_size"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Loaded {len(courses)} courses, {len(majors)} majors in {time.perf_counter() - start:.2f}s "
+                f"(read {read_seconds:.2f}s)"
+            )
+        )
+
+    def load_courses(self, courses, prerequisite_groups, batch_size):
+        # courses that left the catalog (a catalog without any, e.g. majors-only CSVs, leaves them alone)
+        if courses:
+            Course.objects.exclude(course_number__in=[row["course_number"] for row in courses]).delete()
+
+        Course.objects.bulk_create(
+            [
+                Course(
+                    course_number=row["course_number"],
+                    course_prefix=row["course_prefix"],
+                    course_name=row["course_name"],
+                    credits_min=row["credits_min"],
+                    credits_max=row["credits_max"],
+                    description=row["description"],
+                    learning_objectives=row["learning_objectives"],
+                    department_url=row["department_url"],
+                )
+                for row in courses
+            ],
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["course_number"],
+            update_fields=[
+                "course_prefix", "course_name", "credits_min", "credits_max",
+                "description", "learning_objectives", "department_url",
+            ],
+        )
+        course_ids = dict(Course.objects.values_list("course_number", "id"))
+
+        loaded = [course_ids[row["course_number"]] for row in courses]
+        delete_in_chunks(Prerequisite.objects, "course_id", loaded)
+        Prerequisite.objects.bulk_create(
+            [
+                Prerequisite(
+                    course_id=course_ids[course_number],
+                    group_index=g,
+                    prerequisite_number=prerequisite,
+                    prerequisite_id=course_ids.get(prerequisite),
+                )
+                for course_number, groups in prerequisite_groups.items()
+                for g, group in enumerate(groups)
+                for prerequisite in dict.fromkeys(group)
+            ],
+            batch_size=batch_size,
+        )
+        return course_ids
+
+    def load_majors(self, majors, comments, course_ids, batch_size):
+        if not majors:
+            return
+        Major.objects.exclude(major_code__in=list(majors)).delete()  # cascades to their requirement groups
+
+        Major.objects.bulk_create(
+            [
+                Major(
+                    major_code=code,
+                    major_title=major.title,
+                    min_credits=major.total_credits,
+                    credit_breakdown={category: list(credits) for category, credits in major.credit_breakdown.items()},
+                    comments=comments.get(code, []),
+                )
+                for code, major in majors.items()
+            ],
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["major_code"],
+            update_fields=["major_title", "min_credits", "credit_breakdown", "comments"],
+        )
+        major_ids = dict(Major.objects.filter(major_code__in=list(majors)).values_list("major_code", "id"))
+
+        groups, options = [], []
+        for code, major in majors.items():
+            for position, (fields, group_options) in enumerate(requirement_groups(major)):
+                groups.append(RequirementGroup(major_id=major_ids[code], position=position, **fields))
+                options.append((major, group_options))
+
+        RequirementGroup.objects.bulk_create(
+            groups,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["major", "position"],
+            update_fields=["kind", "label", "needs_c_or_better", "min_credits", "min_courses"],
+        )
+
+        group_ids = {
+            (major_id, position): group_id
+            for group_id, major_id, position in RequirementGroup.objects.filter(
+                major_id__in=list(major_ids.values())
+            ).values_list("id", "major_id", "position")
+        }
+        group_ids = {(group.major_id, group.position): group_ids[(group.major_id, group.position)] for group in groups}
+
+        # groups past the new end of a major's list are from an older, longer crawl
+        RequirementGroup.objects.exclude(id__in=list(group_ids.values())).delete()
+
+        delete_in_chunks(RequirementCourse.objects, "group_id", group_ids.values())
+        RequirementCourse.objects.bulk_create(
+            [
+                RequirementCourse(
+                    group_id=group_ids[(group.major_id, group.position)],
+                    option=o,
+                    course_number=course_number,
+                    course_id=course_ids.get(course_number),
+                    credits=major.credits.get(course_number),
+                )
+                for group, (major, group_options) in zip(groups, options)
+                for o, bundle in enumerate(group_options)
+                for course_number in dict.fromkeys(bundle)
+            ],
+            batch_size=batch_size,
+        )
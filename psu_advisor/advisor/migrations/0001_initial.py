@@ -0,0 +1,104 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Major',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('major_code', models.CharField(max_length=16, unique=True)),
+                ('major_title', models.CharField(max_length=255)),
+                ('min_credits', models.PositiveSmallIntegerField()),
+                ('credit_breakdown', models.JSONField(default=dict)),
+                ('comments', models.JSONField(default=list)),
+            ],
+            options={
+                'ordering': ['major_code'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Course',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('course_number', models.CharField(max_length=32, unique=True)),
+                ('course_prefix', models.CharField(max_length=16)),
+                ('course_name', models.CharField(max_length=255)),
+                ('credits_min', models.PositiveSmallIntegerField(null=True)),
+                ('credits_max', models.PositiveSmallIntegerField(null=True)),
+                ('description', models.TextField(blank=True)),
+                ('learning_objectives', models.CharField(blank=True, max_length=64)),
+                ('department_url', models.URLField(blank=True, max_length=500)),
+            ],
+            options={
+                'ordering': ['course_number'],
+                'indexes': [models.Index(fields=['course_prefix', 'course_number'], name='course_prefix_number'), models.Index(fields=['credits_min', 'credits_max'], name='course_credits')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RequirementGroup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField()),
+                ('kind', models.CharField(choices=[('prescribed', 'Prescribed'), ('additional', 'Additional'), ('selection', 'Selection')], max_length=16)),
+                ('label', models.TextField()),
+                ('needs_c_or_better', models.BooleanField(default=False)),
+                ('min_credits', models.PositiveSmallIntegerField(default=0)),
+                ('min_courses', models.PositiveSmallIntegerField(default=0)),
+                ('major', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='requirement_groups', to='advisor.major')),
+            ],
+            options={
+                'ordering': ['major', 'position'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RequirementCourse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('option', models.PositiveSmallIntegerField()),
+                ('course_number', models.CharField(max_length=32)),
+                ('credits', models.PositiveSmallIntegerField(null=True)),
+                ('course', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='requirement_courses', to='advisor.course')),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='courses', to='advisor.requirementgroup')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Prerequisite',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('group_index', models.PositiveSmallIntegerField()),
+                ('prerequisite_number', models.CharField(max_length=32)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='prerequisites', to='advisor.course')),
+                ('prerequisite', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='unlocks', to='advisor.course')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['prerequisite_number'], name='prerequisite_number')],
+                'constraints': [models.UniqueConstraint(fields=('course', 'group_index', 'prerequisite_number'), name='unique_prerequisite')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='requirementgroup',
+            index=models.Index(fields=['major', 'kind'], name='requirement_major_kind'),
+        ),
+        migrations.AddConstraint(
+            model_name='requirementgroup',
+            constraint=models.UniqueConstraint(fields=('major', 'position'), name='unique_requirement_position'),
+        ),
+        migrations.AddIndex(
+            model_name='requirementcourse',
+            index=models.Index(fields=['course_number'], name='requirement_course_number'),
+        ),
+        migrations.AddConstraint(
+            model_name='requirementcourse',
+            constraint=models.UniqueConstraint(fields=('group', 'option', 'course_number'), name='unique_requirement_course'),
+        ),
+    ]
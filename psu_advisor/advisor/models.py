@@ -1,3 +1,103 @@
 from django.db import models
 
-# Create your models here.
+
+class Course(models.Model):
+    course_number = models.CharField(max_length=32, unique=True)  # "CMPSC 121"
+    course_prefix = models.CharField(max_length=16)  # "CMPSC"
+    course_name = models.CharField(max_length=255)
+    credits_min = models.PositiveSmallIntegerField(null=True)
+    credits_max = models.PositiveSmallIntegerField(null=True)
+    description = models.TextField(blank=True)
+    learning_objectives = models.CharField(max_length=64, blank=True)  # GenEd codes, "GH,GQ"
+    department_url = models.URLField(max_length=500, blank=True)
+
+    class Meta:
+        ordering = ["course_number"]
+        indexes = [
+            models.Index(fields=["course_prefix", "course_number"], name="course_prefix_number"),
+            models.Index(fields=["credits_min", "credits_max"], name="course_credits"),
+        ]
+
+    def __str__(self):
+        return f"{self.course_number}: {self.course_name}"
+
+
+class Prerequisite(models.Model):
+    """one alternative of one prerequisite group -> a course needs ALL groups, ANY alternative per group"""
+
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="prerequisites")
+    group_index = models.PositiveSmallIntegerField()
+    prerequisite_number = models.CharField(max_length=32)
+    # null when the prerequisite isn't in the catalog (retired courses)
+    prerequisite = models.ForeignKey(Course, null=True, on_delete=models.SET_NULL, related_name="unlocks")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["course", "group_index", "prerequisite_number"], name="unique_prerequisite"),
+        ]
+        indexes = [models.Index(fields=["prerequisite_number"], name="prerequisite_number")]
+
+    def __str__(self):
+        return f"{self.course.course_number} <- {self.prerequisite_number} (group {self.group_index})"
+
+
+class Major(models.Model):
+    major_code = models.CharField(max_length=16, unique=True)  # "CMPAB"
+    major_title = models.CharField(max_length=255)
+    min_credits = models.PositiveSmallIntegerField()
+    credit_breakdown = models.JSONField(default=dict)  # {category: [min, max]}
+    comments = models.JSONField(default=list)
+
+    class Meta:
+        ordering = ["major_code"]
+
+    def __str__(self):
+        return f"{self.major_code}: {self.major_title}"
+
+
+class RequirementGroup(models.Model):
+    """one requirement slot of a major
+
+    prescribed / additional -> satisfied by ANY option (an option may bundle several courses)
+    selection -> "select n credits / courses from", satisfied by min_credits or min_courses worth of options
+    """
+
+    PRESCRIBED = "prescribed"
+    ADDITIONAL = "additional"
+    SELECTION = "selection"
+    KIND_CHOICES = [(PRESCRIBED, "Prescribed"), (ADDITIONAL, "Additional"), (SELECTION, "Selection")]
+
+    major = models.ForeignKey(Major, on_delete=models.CASCADE, related_name="requirement_groups")
+    position = models.PositiveSmallIntegerField()
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    label = models.TextField()
+    needs_c_or_better = models.BooleanField(default=False)
+    min_credits = models.PositiveSmallIntegerField(default=0)
+    min_courses = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        ordering = ["major", "position"]
+        constraints = [models.UniqueConstraint(fields=["major", "position"], name="unique_requirement_position")]
+        indexes = [models.Index(fields=["major", "kind"], name="requirement_major_kind")]
+
+    def __str__(self):
+        return f"{self.major.major_code} #{self.position}: {self.label}"
+
+
+class RequirementCourse(models.Model):
+    """course rows sharing an option number are taken together, different options are alternatives"""
+
+    group = models.ForeignKey(RequirementGroup, on_delete=models.CASCADE, related_name="courses")
+    option = models.PositiveSmallIntegerField()
+    course_number = models.CharField(max_length=32)
+    course = models.ForeignKey(Course, null=True, on_delete=models.SET_NULL, related_name="requirement_courses")
+    credits = models.PositiveSmallIntegerField(null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["group", "option", "course_number"], name="unique_requirement_course"),
+        ]
+        indexes = [models.Index(fields=["course_number"], name="requirement_course_number")]
+
+    def __str__(self):
+        return f"{self.group} option {self.option}: {self.course_number}"
@@ -0,0 +1,114 @@
+"""
+Process-wide warm state for the advisor API.
+
+The embedding model, the vector store / search index and the prerequisite
+graph are loaded once per worker process (from AdvisorConfig.ready when
+ADVISOR_WARM_START is set, as it is under asgi.py, otherwise on the first
+request) and shared by every request through get_services().
+
+vector_store/manage.py shares its module name with Django's manage.py, so
+it is loaded from its file path under another name; its sibling modules are
+imported normally through sys.path.
+"""
+
+import importlib.util
+import sys
+import threading
+
+import numpy as np
+from django.conf import settings
+
+from .batching import QueryBatcher
+
+_services = None
+_lock = threading.Lock()
+
+
+def add_path(path):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+def load_vector_store_module():
+    if "vector_store_manage" in sys.modules:
+        return sys.modules["vector_store_manage"]
+
+    add_path(settings.ADVISOR_VECTOR_STORE_DIR)
+    spec = importlib.util.spec_from_file_location("vector_store_manage", settings.ADVISOR_VECTOR_STORE_DIR / "manage.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["vector_store_manage"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_prerequisite_graph():
+    add_path(settings.ADVISOR_CRAWLER_DIR)
+    from catalog_store import CATALOG_FILE, CatalogStore
+    from prereq_graph import GRAPH_FILE
+    from requirement_groups import COURSES_FILE
+    from semester_planner import load_graph
+
+    crawler_dir = settings.ADVISOR_CRAWLER_DIR
+    catalog_file = crawler_dir / CATALOG_FILE
+    if catalog_file.exists():
+        with CatalogStore(str(catalog_file)) as store:
+            return load_graph(str(crawler_dir / GRAPH_FILE), str(crawler_dir / COURSES_FILE), store)
+    return load_graph(str(crawler_dir / GRAPH_FILE), str(crawler_dir / COURSES_FILE))
+
+
+class AdvisorServices:
+    def __init__(self):
+        vector_store = load_vector_store_module()
+        vector_store_dir = settings.ADVISOR_VECTOR_STORE_DIR
+
+        self.embedding_generator = vector_store.EmbeddingGenerator(
+            settings.ADVISOR_EMBEDDING_MODEL, backend=settings.ADVISOR_EMBEDDING_BACKEND
+        )
+        self.store = vector_store.VectorStoreManager(
+            search_backend=settings.ADVISOR_SEARCH_BACKEND,
+            index_path=str(vector_store_dir / "search_index"),
+            lexical_path=str(vector_store_dir / "lexical_index"),
+            chroma_path=str(vector_store_dir / "chroma_db"),
+        )
+        self.graph = load_prerequisite_graph()
+        self.batcher = QueryBatcher(
+            self.embed,
+            self.search,
+            max_batch_size=settings.ADVISOR_MAX_BATCH_SIZE,
+            max_wait_ms=settings.ADVISOR_MAX_BATCH_WAIT_MS,
+        )
+
+    def embed(self, texts):
+        return self.embedding_generator.generate_embeddings(texts)
+
+    def search(self, embeddings, n_results, where):
+        return self.store.query_batch(np.asarray(embeddings), n_results=n_results, where=where)
+
+    def missing_prerequisites(self, course_number, completed):
+        """prerequisite groups of a course with no completed alternative (empty when eligible or unknown)"""
+        course_id = self.graph.ids.get(course_number)
+        if course_id is None:
+            return []
+        names = self.graph.names
+        return [
+            [names[c] for c in group]
+            for group in self.graph.groups(course_id)
+            if not any(names[c] in completed for c in group)
+        ]
+
+    def warm(self):
+        """one forward pass so the first real request doesn't pay for lazy initialisation"""
+        self.embed(["warm up"])
+
+
+def get_services():
+    global _services
+    if _services is None:
+        with _lock:
+            if _services is None:
+                _services = AdvisorServices()
+    return _services
+
+
+def warm():
+    get_services().warm()
@@ -1,3 +1,489 @@
-from django.test import TestCase
+import asyncio
+import csv
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import requests
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from advisor.batching import QueryBatcher
+from advisor.management.commands.load_catalog import CRAWLER_DIR
+from advisor.services import AdvisorServices
+from advisor.views import filters
+from advisor.models import Course, Major, Prerequisite, RequirementCourse, RequirementGroup
+
+if str(CRAWLER_DIR) not in sys.path:
+    sys.path.insert(0, str(CRAWLER_DIR))
+if str(settings.ADVISOR_VECTOR_STORE_DIR) not in sys.path:
+    sys.path.append(str(settings.ADVISOR_VECTOR_STORE_DIR))  # after the crawler, its manage.py is not Django's
+
+import fetcher  # noqa: E402
+from catalog_store import CatalogStore  # noqa: E402
+from crawl_scheduler import CrawlScheduler  # noqa: E402
+from data_cleaner import clean_csv, clean_texts  # noqa: E402
+from fixture_corpus import ORIGIN, FixtureCorpus, make_handler  # noqa: E402
+from page_document import PageDocument, PageTiming  # noqa: E402
+from prereq_graph import PrerequisiteGraph  # noqa: E402
+from requirement_groups import MajorRequirements  # noqa: E402
+from psu_undergrad_course_crawler import BASE_URL, scrape_psu_courses  # noqa: E402
+from semester_planner import SemesterPlanner  # noqa: E402
+from text_tokens import tokenize  # noqa: E402
+from facet_index import course_facets  # noqa: E402
+from search_index import ExactIndex  # noqa: E402
+
+
+def course_record(number, name, credits=3, prerequisites=()):
+    return {
+        "course_number": number,
+        "course_name": name,
+        "credits": credits,
+        "description": f"{name} description",
+        "prerequisite_data": [f"Enforced Prerequisite at Enrollment: {p}" for p in prerequisites],
+        "prerequisite_course_numbers": [],
+        "equivalent_course_numbers": [],
+        "learning_objectives": ["(GQ)"],
+        "department_url": "https://bulletins.psu.edu/university-course-descriptions/undergraduate/cmpsc/",
+    }
+
+
+def major_record(title="Computer Science, B.S. (Abington)", selectable=("CMPSC\xa0465", "CMPSC\xa0473")):
+    return {
+        "major_title": title,
+        "major_code": "CMPAB",
+        "min_credit_info": "For the Bachelor of Science degree in Computer Science, a minimum of 120 credits is required:",
+        "credit_breakdown": {"General Education": "45", "Requirements for the Major": "75"},
+        "prescribed_courses": [{"course_code": "CMPSC\xa0121", "credits": "3", "needs_c_or_better": True}],
+        "additional_courses": [
+            {"course_code": "MATH\xa0140", "credits": "4", "needs_c_or_better": False, "equivalent_course": "MATH\xa0140H"},
+            {"course_code": "MATH\xa0140H", "credits": "4", "needs_c_or_better": False, "equivalent_course": "MATH\xa0140"},
+        ],
+        "selectable_courses": [
+            {
+                "selection_requirement": "Select 3 credits from the following:",
+                "required_credits": "3",
+                "courses": [{"course_code": code} for code in selectable],
+            }
+        ],
+        "comments": [],
+    }
+
+
+class LoadCatalogTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.catalog = os.path.join(self.tmp.name, "catalog.sqlite3")
+        self.write_catalog(
+            [
+                course_record("CMPSC\xa0121", "Introduction to Programming Techniques"),
+                course_record("CMPSC\xa0122", "Intermediate Programming", prerequisites=["CMPSC 121 or CMPSC 131"]),
+                course_record("MATH\xa0140", "Calculus With Analytic Geometry I", credits=4),
+            ],
+            [major_record()],
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_catalog(self, courses, majors):
+        with CatalogStore(self.catalog) as store:
+            store.write_courses(courses)
+            store.write_majors(majors)
+
+    def load(self):
+        call_command("load_catalog", catalog=self.catalog, stdout=StringIO())
+
+    def test_loads_courses_majors_and_requirements(self):
+        self.load()
+
+        self.assertEqual(Course.objects.count(), 3)
+        self.assertEqual(Course.objects.get(course_number="MATH 140").credits_min, 4)
+
+        edges = Prerequisite.objects.filter(course__course_number="CMPSC 122").order_by("prerequisite_number")
+        self.assertEqual([(e.group_index, e.prerequisite_number) for e in edges], [(0, "CMPSC 121"), (0, "CMPSC 131")])
+        # CMPSC 131 isn't in the catalog -> edge kept, no course link
+        self.assertEqual([e.prerequisite_id is not None for e in edges], [True, False])
+
+        major = Major.objects.get(major_code="CMPAB")
+        self.assertEqual(major.min_credits, 120)
+        self.assertEqual(major.credit_breakdown["Requirements for the Major"], [75, 75])
+
+        kinds = list(major.requirement_groups.values_list("kind", flat=True))
+        self.assertEqual(kinds, ["prescribed", "additional", "selection"])
+
+        additional = major.requirement_groups.get(kind=RequirementGroup.ADDITIONAL)
+        self.assertEqual(
+            sorted(additional.courses.values_list("option", "course_number")), [(0, "MATH 140"), (1, "MATH 140H")]
+        )
+        selection = major.requirement_groups.get(kind=RequirementGroup.SELECTION)
+        self.assertEqual(selection.min_credits, 3)
+        self.assertTrue(major.requirement_groups.get(kind=RequirementGroup.PRESCRIBED).needs_c_or_better)
+
+    def test_reload_upserts_instead_of_duplicating(self):
+        self.load()
+        course_id = Course.objects.get(course_number="CMPSC 121").id
+        group_id = RequirementGroup.objects.get(kind=RequirementGroup.SELECTION).id
+
+        self.write_catalog(
+            [course_record("CMPSC\xa0121", "Programming Fundamentals")],
+            [major_record(title="Computer Science, B.S.", selectable=("CMPSC\xa0465",))],
+        )
+        self.load()
+
+        self.assertEqual(Course.objects.count(), 3)
+        self.assertEqual(Major.objects.count(), 1)
+        self.assertEqual(RequirementGroup.objects.count(), 3)
+
+        course = Course.objects.get(course_number="CMPSC 121")
+        self.assertEqual((course.id, course.course_name), (course_id, "Programming Fundamentals"))
+        self.assertEqual(Major.objects.get().major_title, "Computer Science, B.S.")
+
+        # ids are stable, child rows follow the new crawl
+        selection = RequirementGroup.objects.get(kind=RequirementGroup.SELECTION)
+        self.assertEqual(selection.id, group_id)
+        self.assertEqual(list(selection.courses.values_list("course_number", flat=True)), ["CMPSC 465"])
+        self.assertEqual(RequirementCourse.objects.filter(course_number="CMPSC 473").count(), 0)
+
+    def test_reload_deletes_what_left_the_catalog(self):
+        self.write_catalog([], [{**major_record(), "major_code": "CMPBS"}])
+        self.load()
+        self.assertEqual(Major.objects.count(), 2)
+
+        with CatalogStore(self.catalog) as store:
+            store.delete_majors(["CMPBS"])
+            store.delete_courses(["CMPSC\xa0122"])
+        self.write_catalog([], [{**major_record(), "selectable_courses": []}])
+        self.load()
+
+        self.assertEqual(sorted(Course.objects.values_list("course_number", flat=True)), ["CMPSC 121", "MATH 140"])
+        self.assertEqual(Prerequisite.objects.count(), 0)
+        self.assertEqual(list(Major.objects.values_list("major_code", flat=True)), ["CMPAB"])
+        # the selection group at the end of CMPAB's list is gone with its courses
+        self.assertEqual(list(RequirementGroup.objects.values_list("kind", flat=True)), ["prescribed", "additional"])
+        self.assertEqual(RequirementCourse.objects.filter(course_number="CMPSC 465").count(), 0)
+
+
+def fake_search(embeddings, n_results, where):
+    """one result per row: the row's first embedding value as its id"""
+    return [
+        {"ids": [f"CMPSC\xa0{int(row[0])}"], "distances": [0.25], "metadatas": [{"course_prefix": "CMPSC", "gened": "GQ,GN", "where": where}]}
+        for row in embeddings
+    ]
+
+
+def department_page(prefix, numbers):
+    blocks = "".join(
+        f'<div class="courseblock"><div class="courseblocktitle"><strong>{prefix}&#160;{n}: Course {n}</strong></div>'
+        f'<div class="courseblockdesc"><p>3 Credits</p><p>About {prefix} {n}.</p></div></div>'
+        for n in numbers
+    )
+    return f"<html><body>{blocks}</body></html>".encode("utf-8")
+
+
+class CrawlSchedulerTests(SimpleTestCase):
+    """course crawl against a local stand-in serving saved bulletin pages"""
+
+    def setUp(self):
+        scratch = tempfile.TemporaryDirectory()
+        self.addCleanup(scratch.cleanup)
+        self.scratch = scratch.name
+
+        corpus = FixtureCorpus(os.path.join(self.scratch, "corpus"))
+        departments = {"cmpsc": (121, 122, 131), "math": (140, 141), "stat": (200,)}
+        links = "".join(f'<li><a href="/university-course-descriptions/undergraduate/{d}/">{d}</a></li>' for d in departments)
+        corpus.add(BASE_URL, f'<html><body><div class="az_sitemap"><ul>{links}</ul></div></body></html>'.encode("utf-8"))
+        for department, numbers in departments.items():
+            corpus.add(f"{BASE_URL}{department}/", department_page(department.upper(), numbers))
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(corpus, ORIGIN))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.base_url = BASE_URL.replace(ORIGIN, f"http://127.0.0.1:{server.server_port}")
+
+        previous = fetcher._default_fetcher  # not get_fetcher(): that would create the real http cache
+        fetcher.set_fetcher(fetcher.Fetcher(cache_dir=None))
+        self.addCleanup(fetcher.set_fetcher, previous)
+
+    def test_crawl_keeps_department_order_and_reports_fetch_latency(self):
+        scheduler = CrawlScheduler(max_workers=3, requests_per_second=1000, burst=3)
+        outputs = {
+            name: os.path.join(self.scratch, file)
+            for name, file in (("output_file", "courses.csv"), ("manifest_file", "manifest.json"),
+                               ("changes_file", "changes.json"), ("catalog_file", "catalog.sqlite3"))
+        }
+        with mock.patch("sys.stdout", new_callable=StringIO):
+            scrape_psu_courses(scheduler=scheduler, base_url=self.base_url, **outputs)
+
+        with CatalogStore(outputs["catalog_file"]) as store:
+            self.assertEqual(store.counts()["courses"], 6)
+        with open(outputs["output_file"], encoding="utf-8") as f:
+            numbers = [line.split(",")[0] for line in f.read().splitlines()[1:]]
+        self.assertEqual(numbers, ["CMPSC\xa0121", "CMPSC\xa0122", "CMPSC\xa0131", "MATH\xa0140", "MATH\xa0141", "STAT\xa0200"])
+
+        stats = scheduler.stats
+        self.assertEqual((stats.pages, len(stats.fetch_latencies), stats.failures), (3, 3, 0))
+        self.assertLessEqual(stats.percentile(95, stats.fetch_latencies), stats.percentile(95))
+
+    def test_page_timing_counts_retried_requests(self):
+        scheduler = CrawlScheduler(requests_per_second=1000, backoff_seconds=0)
+        url = f"{self.base_url}cmpsc/"
+        with mock.patch("page_document.fetch", side_effect=[requests.ConnectionError("reset"), fetcher.get_fetcher().fetch(url)]):
+            timings = scheduler.map(lambda page: PageTiming(PageDocument.fetch(page)), [url])
+
+        self.assertEqual([t.requests for t in timings], [2])
+        self.assertEqual((scheduler.stats.retries, len(scheduler.stats.fetch_latencies)), (1, 2))
+
+
+class DataCleanerTests(SimpleTestCase):
+    def test_batch_keeps_one_output_per_row(self):
+        texts = ["Intro to\x00Programming: the basics", "", "The “best” course — (GQ)"]
+
+        self.assertEqual(clean_texts(texts), ["intro programming basics", "", "“ best ” course — gq"])
+
+    def test_lexical_tokens_match_cleaned_text(self):
+        text = "The “Quick” brown—fox: isn't it «great»?"
+
+        self.assertEqual(tokenize(text), clean_texts([text])[0].split())
+
+    def test_clean_csv_writes_space_joined_descriptions(self):
+        with tempfile.TemporaryDirectory() as scratch:
+            source, target = os.path.join(scratch, "courses.csv"), os.path.join(scratch, "processed.csv")
+            with open(source, mode="w", encoding="utf-8", newline="") as f:
+                csv.writer(f).writerows([
+                    ["course_number", "description", "learning_objectives"],
+                    ["CMPSC 121", "Introduction to the Programming of Computers.", "['Write loops', 'Debug']"],
+                    ["CMPSC 122", "", ""],
+                ])
+
+            with mock.patch("builtins.print"):
+                rows = clean_csv(source, target, chunk_size=1, workers=1)
+            with open(target, mode="r", encoding="utf-8", newline="") as f:
+                written = list(csv.DictReader(f))
+
+        self.assertEqual(rows, 2)
+        self.assertEqual(written[0]["description"], "introduction programming computers")
+        self.assertEqual(written[0]["learning_objectives"], "['Write loops', 'Debug']")
+        self.assertEqual((written[1]["description"], written[1]["learning_objectives"]), ("", "[]"))
+
+
+class PrerequisiteGraphTests(SimpleTestCase):
+    def round_trip(self, graph):
+        with tempfile.TemporaryDirectory() as scratch:
+            path = os.path.join(scratch, "graph.npz")
+            graph.save(path)
+            return PrerequisiteGraph.load(path)
+
+    def test_save_and_load_keep_groups(self):
+        graph = self.round_trip(PrerequisiteGraph.from_groups({"CMPSC 122": [["CMPSC 121", "CMPSC 131"]]}))
+        groups = graph.groups(graph.ids["CMPSC 122"])
+
+        self.assertEqual([[graph.names[c] for c in group] for group in groups], [["CMPSC 121", "CMPSC 131"]])
+
+    def test_empty_graph_round_trips_empty(self):
+        graph = self.round_trip(PrerequisiteGraph.from_groups({}))
+
+        self.assertEqual((graph.names, graph.ids), ([], {}))
+
+
+class FacetFilterTests(SimpleTestCase):
+    def test_max_credits_skips_courses_without_credits(self):
+        rows = [
+            {"course_number": "CMPSC 121", "credits": "3"},
+            {"course_number": "CMPSC 296", "credits": ""},  # credits not on the bulletin
+            {"course_number": "CMPSC 494", "credits": "(1, 12)"},
+        ]
+        with tempfile.TemporaryDirectory() as scratch:
+            ExactIndex.build(scratch, [r["course_number"] for r in rows], np.eye(3, dtype=np.float32), [course_facets(r) for r in rows])
+            index = ExactIndex(scratch)
+
+            capped = index.search(np.ones(3), n_results=3, where=filters({"max_credits": "3"}))
+            not_three = index.search(np.ones(3), n_results=3, where={"credits_max": {"$ne": 3}})
+
+        self.assertEqual(capped["ids"][0], ["CMPSC 121"])
+        # like ChromaDB, a missing field still passes negations
+        self.assertEqual(sorted(not_three["ids"][0]), ["CMPSC 296", "CMPSC 494"])
+
+
+class SemesterPlannerTests(SimpleTestCase):
+    def setUp(self):
+        major = MajorRequirements.from_record(major_record())
+        # CMPSC 465 needs CMPSC 121, CMPSC 473 needs CMPSC 465
+        graph = PrerequisiteGraph.from_groups({"CMPSC 465": [["CMPSC 121"]], "CMPSC 473": [["CMPSC 465"]]})
+        self.planner = SemesterPlanner({major.code: major}, graph)
+
+    def test_prerequisites_come_first_and_degree_credits_are_filled(self):
+        plan = self.planner.plan("CMPAB")
+        term = {course: i for i, semester in enumerate(plan.semesters) for course in semester}
+
+        self.assertLess(term["CMPSC 121"], term["CMPSC 465"])
+        self.assertEqual(plan.total_credits, 120)
+        self.assertTrue(all(credits <= 18 for credits in plan.semester_credits()))
+        self.assertEqual(plan.unmet, [])
+
+    def test_completed_courses_are_not_planned(self):
+        plan = self.planner.plan("CMPAB", completed=["CMPSC 121"])
+
+        self.assertNotIn("CMPSC 121", [c for semester in plan.semesters for c in semester])
+        self.assertEqual(plan.total_credits, 117)
+
+    def test_caps_below_elective_size_terminate(self):
+        for cap in (1, 2):
+            with self.subTest(cap=cap):
+                plan = self.planner.plan("CMPAB", credit_cap=cap)
+                electives = [c for semester in plan.semesters for c in semester if c.startswith("ELECTIVE")]
+
+                self.assertEqual(plan.total_credits, 120)
+                self.assertTrue(all(plan.credits[e] <= cap for e in electives))
+
+    def test_non_positive_cap_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.planner.plan("CMPAB", credit_cap=0)
+
+
+class QueryBatcherTests(SimpleTestCase):
+    def test_concurrent_queries_share_one_embedding_call(self):
+        calls = []
+
+        def embed(texts):
+            calls.append(list(texts))
+            return np.array([[float(text)] for text in texts])
+
+        batcher = QueryBatcher(embed, fake_search, max_batch_size=8, max_wait_ms=50)
+
+        async def submit_all():
+            return await asyncio.gather(
+                *(batcher.submit(str(i), where={"course_prefix": "CMPSC"} if i % 2 else None) for i in range(5))
+            )
+
+        results = asyncio.run(submit_all())
+        batcher.close()
+
+        self.assertEqual(calls, [["0", "1", "2", "3", "4"]])
+        self.assertEqual([r["ids"][0] for r in results], [f"CMPSC\xa0{i}" for i in range(5)])
+        self.assertEqual([r["metadatas"][0]["where"] for r in results][:2], [None, {"course_prefix": "CMPSC"}])
+        self.assertEqual(batcher.stats.to_dict()["largest_batch"], 5)
+
+    def test_failed_batch_fails_its_requests(self):
+        def embed(texts):
+            raise RuntimeError("model failed")
+
+        batcher = QueryBatcher(embed, fake_search, max_wait_ms=1)
+        with self.assertRaisesRegex(RuntimeError, "model failed"):
+            asyncio.run(batcher.submit("query"))
+        batcher.close()
+
+
+class FakeServices(AdvisorServices):
+    def __init__(self):
+        # CMPSC 122 needs CMPSC 121 or CMPSC 131
+        self.graph = PrerequisiteGraph.from_groups(
+            {"CMPSC 121": [], "CMPSC 122": [["CMPSC 121", "CMPSC 131"]], "CMPSC 131": []}
+        )
+        self.batcher = QueryBatcher(self.embed, self.search, max_wait_ms=1)
+        self.searches = []
+
+    def embed(self, texts):
+        return np.zeros((len(texts), 2))
+
+    def search(self, embeddings, n_results, where):
+        self.searches.append((n_results, where))
+        ids = ["CMPSC\xa0121", "CMPSC\xa0122", "CMPSC\xa0131"][:n_results]
+        metadatas = [{"course_name": i, "course_prefix": "CMPSC", "credits_min": 3, "credits_max": 3, "gened": ""} for i in ids]
+        return [{"ids": ids, "distances": [0.1, 0.2, 0.3][: len(ids)], "metadatas": metadatas} for _ in embeddings]
+
+
+class AdvisorApiTests(SimpleTestCase):
+    def setUp(self):
+        self.services = FakeServices()
+        patcher = mock.patch("advisor.views.get_services", return_value=self.services)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_search_applies_filters(self):
+        response = self.client.get("/api/search", {"q": "programming", "k": 2, "prefix": "cmpsc", "max_credits": 3})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c["course_number"] for c in response.json()["results"]], ["CMPSC 121", "CMPSC 122"])
+        self.assertEqual(self.services.searches, [(2, {"course_prefix": "CMPSC", "credits_max": {"$lte": 3}})])
+
+    def test_search_rejects_bad_input(self):
+        self.assertEqual(self.client.get("/api/search").status_code, 400)
+        self.assertEqual(self.client.get("/api/search", {"q": "x", "k": "ten"}).status_code, 400)
+
+    def test_recommend_skips_completed_and_ineligible_courses(self):
+        response = self.client.post(
+            "/api/recommend", {"query": "programming", "completed": ["CMPSC 121"]}, content_type="application/json"
+        )
+        self.assertEqual([c["course_number"] for c in response.json()["results"]], ["CMPSC 122", "CMPSC 131"])
+
+        response = self.client.post("/api/recommend", {"query": "programming"}, content_type="application/json")
+        body = response.json()
+        self.assertEqual([c["course_number"] for c in body["results"]], ["CMPSC 121", "CMPSC 131"])
+        self.assertEqual(body["blocked"][0]["missing_prerequisites"], [["CMPSC 121", "CMPSC 131"]])
+
+    def test_services_load_off_the_event_loop(self):
+        def get_services():
+            with self.assertRaises(RuntimeError):  # a cold load would block every request on the loop
+                asyncio.get_running_loop()
+            return self.services
+
+        with mock.patch("advisor.views.get_services", side_effect=get_services) as loaded:
+            self.assertEqual(self.client.get("/api/search", {"q": "programming"}).status_code, 200)
+            response = self.client.post("/api/recommend", {"query": "programming"}, content_type="application/json")
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(loaded.call_count, 2)
+
+
+# importing these at module level is what made `python manage.py ...` take seconds
+HEAVY_MODULES = ("torch", "transformers", "chromadb", "pandas", "nltk")
+
+
+def import_profile(code, cwd):
+    """run code under `python -X importtime` -> (total import seconds, top-level packages imported)"""
+    done = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd, capture_output=True, text=True, check=True,
+        env={**os.environ, "DJANGO_SETTINGS_MODULE": "psu_advisor.settings"},
+    )
+    total_us, packages = 0, set()
+    for line in done.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not name.startswith("  "):  # only top-level imports, nested ones are inside their cumulative time
+            total_us += int(cumulative)
+        packages.add(name.strip().split(".")[0])
+    return total_us / 1e6, packages
+
+
+class ImportTimeTests(SimpleTestCase):
+    """cold start budgets: heavy dependencies load on first use, never at import"""
+
+    CLI_BUDGET_SECONDS = 1.5
+    DJANGO_BUDGET_SECONDS = 3.0
+
+    def assert_cold_start(self, code, cwd, budget):
+        seconds, packages = import_profile(code, cwd)
+        self.assertEqual(sorted(packages.intersection(HEAVY_MODULES)), [], code)
+        self.assertLess(seconds, budget, code)
+
+    def test_vector_store_cli(self):
+        self.assert_cold_start("import manage", settings.ADVISOR_VECTOR_STORE_DIR, self.CLI_BUDGET_SECONDS)
+
+    def test_crawler_clis(self):
+        for module in ("data_cleaner", "semester_planner", "degree_audit"):
+            with self.subTest(module=module):
+                self.assert_cold_start(f"import {module}", settings.ADVISOR_CRAWLER_DIR, self.CLI_BUDGET_SECONDS)
+
+    def test_django_boot(self):
+        boot = "import django; django.setup(); from django.urls import resolve; resolve('/api/search')"
+        self.assert_cold_start(boot, settings.BASE_DIR, self.DJANGO_BUDGET_SECONDS)
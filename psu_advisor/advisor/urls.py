@@ -0,0 +1,9 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path('search', views.search, name='search'),
+    path('recommend', views.recommend, name='recommend'),
+    path('health', views.health, name='health'),
+]
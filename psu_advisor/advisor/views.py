@@ -1,3 +1,153 @@
-from django.shortcuts import render
+"""
+JSON API over the warm advisor services.
 
-# Create your views here.
+    GET  /api/search?q=intro+to+databases&k=10&prefix=CMPSC&gened=GQ&max_credits=3&no_prereqs=1
+    POST /api/recommend  {"query": "...", "completed": ["CMPSC 121", ...], "k": 10, <same filters>}
+    GET  /api/health
+
+Views are async so one ASGI worker serves many requests at once; searches go
+through the QueryBatcher, which embeds concurrent queries together. The
+services are fetched off the event loop, since the first call loads the
+model, the index and the graph (unless ADVISOR_WARM_START did at startup).
+"""
+
+import json
+import re
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+
+from .services import get_services
+
+RESULT_FIELDS = ("course_name", "course_prefix", "credits_min", "credits_max", "prereq_count")
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def normalize_course_number(course_number):
+    return re.sub(r"\s+", " ", course_number).strip()
+
+
+def int_param(params, name, default, low=None, high=None):
+    value = params.get(name, default)
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise BadRequest(f"{name} must be an integer")
+    if low is not None:
+        value = max(low, value)
+    if high is not None:
+        value = min(high, value)
+    return value
+
+
+def filters(params):
+    """request parameters -> facet filter for VectorStoreManager (None when unfiltered)"""
+    where = {}
+    if params.get("prefix"):
+        where["course_prefix"] = str(params["prefix"]).upper()
+    if params.get("gened"):
+        where["gened"] = str(params["gened"]).upper()
+    if params.get("max_credits") not in (None, ""):
+        where["credits_max"] = {"$lte": int_param(params, "max_credits", 0)}
+    if str(params.get("no_prereqs", "")).lower() in ("1", "true"):
+        where["prereq_count"] = 0
+    return where or None
+
+
+def to_results(result):
+    courses = []
+    for course_id, distance, metadata in zip(result["ids"], result["distances"], result["metadatas"]):
+        course = {"course_number": normalize_course_number(course_id), "score": round(1 - float(distance), 4)}
+        course.update({field: metadata.get(field) for field in RESULT_FIELDS if field in metadata})
+        course["gened"] = [code for code in (metadata.get("gened") or "").split(",") if code]
+        courses.append(course)
+    return courses
+
+
+def error(message, status=400):
+    return JsonResponse({"error": message}, status=status)
+
+
+@require_GET
+async def search(request):
+    start = time.perf_counter()
+    query = request.GET.get("q", "").strip()
+    if not query:
+        return error("q is required")
+
+    try:
+        k = int_param(request.GET, "k", 10, low=1, high=settings.ADVISOR_MAX_RESULTS)
+        where = filters(request.GET)
+    except BadRequest as e:
+        return error(str(e))
+
+    services = await sync_to_async(get_services)()
+    result = await services.batcher.submit(query, n_results=k, where=where)
+    return JsonResponse({
+        "query": query,
+        "results": to_results(result),
+        "took_ms": round((time.perf_counter() - start) * 1000, 2),
+    })
+
+
+@csrf_exempt
+@require_POST
+async def recommend(request):
+    """courses matching the query that the student hasn't taken and is eligible for"""
+    start = time.perf_counter()
+    try:
+        body = json.loads(request.body or b"{}")
+    except json.JSONDecodeError:
+        return error("body must be JSON")
+    if not isinstance(body, dict):
+        return error("body must be a JSON object")
+
+    query = str(body.get("query", "")).strip()
+    if not query:
+        return error("query is required")
+
+    try:
+        k = int_param(body, "k", 10, low=1, high=settings.ADVISOR_MAX_RESULTS)
+        where = filters(body)
+    except BadRequest as e:
+        return error(str(e))
+
+    completed = {normalize_course_number(str(c)) for c in body.get("completed", [])}
+    services = await sync_to_async(get_services)()
+
+    # over fetch: completed and ineligible courses are filtered out afterwards
+    result = await services.batcher.submit(query, n_results=min(k * 4 + len(completed), settings.ADVISOR_MAX_RESULTS * 4), where=where)
+
+    recommendations, blocked = [], []
+    for course in to_results(result):
+        if course["course_number"] in completed:
+            continue
+        missing = services.missing_prerequisites(course["course_number"], completed)
+        if missing:
+            blocked.append({**course, "missing_prerequisites": missing})
+        elif len(recommendations) < k:
+            recommendations.append(course)
+
+    return JsonResponse({
+        "query": query,
+        "results": recommendations,
+        "blocked": blocked[:k],
+        "took_ms": round((time.perf_counter() - start) * 1000, 2),
+    })
+
+
+@require_GET
+async def health(request):
+    services = await sync_to_async(get_services)()
+    return JsonResponse({
+        "search_backend": services.store.search_backend,
+        "graph_courses": len(services.graph),
+        "batcher": services.batcher.stats.to_dict(),
+    })
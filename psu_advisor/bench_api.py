@@ -0,0 +1,86 @@
+"""
+Load test: concurrent /api/search requests against a running advisor server.
+
+Start the server first (the model, index and graph load once per worker):
+
+    uvicorn psu_advisor.asgi:application --workers 1
+
+then
+
+usage: python bench_api.py [--url http://127.0.0.1:8000] [--requests 500] [--concurrency 32]
+
+Reports latency percentiles, throughput and the server's batching stats
+(mean batch size shows how many queries shared one forward pass).
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+import numpy as np
+
+QUERIES = [
+    "introduction to programming",
+    "data structures and algorithms",
+    "machine learning",
+    "calculus with analytic geometry",
+    "organic chemistry laboratory",
+    "american history since 1877",
+    "financial accounting",
+    "public speaking",
+    "creative writing poetry",
+    "database management systems",
+    "microeconomics",
+    "computer networks and security",
+]
+
+
+async def run_client(client, url, queue, latencies, errors):
+    while True:
+        try:
+            query = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        start = time.perf_counter()
+        response = await client.get(f"{url}/api/search", params={"q": query, "k": 10})
+        if response.status_code == 200:
+            latencies.append(time.perf_counter() - start)
+        else:
+            errors.append(response.status_code)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    queue = asyncio.Queue()
+    for _ in range(args.requests):
+        queue.put_nowait(random.choice(QUERIES))
+
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        await client.get(f"{args.url}/api/search", params={"q": "warm up"})
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(run_client(client, args.url, queue, latencies, errors) for _ in range(args.concurrency))
+        )
+        elapsed = time.perf_counter() - start
+        health = (await client.get(f"{args.url}/api/health")).json()
+
+    ms = np.array(latencies) * 1000
+    print(f"{len(latencies)} ok / {len(errors)} failed in {elapsed:.2f}s "
+          f"({len(latencies) / elapsed:.1f} req/s, concurrency {args.concurrency})")
+    if len(ms):
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        print(f"latency ms: p50 {p50:.1f}  p95 {p95:.1f}  p99 {p99:.1f}  max {ms.max():.1f}")
+    print(f"batcher: {health['batcher']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
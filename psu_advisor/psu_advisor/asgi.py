@@ -3,6 +3,9 @@ ASGI config for psu_advisor project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve the advisor API with e.g.
+    uvicorn psu_advisor.asgi:application --workers 2
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
@@ -12,5 +15,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'psu_advisor.settings')
+# every ASGI worker loads the embedding model, vector index and prerequisite graph once at startup
+os.environ.setdefault('ADVISOR_WARM_START', '1')
 
 application = get_asgi_application()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -124,3 +125,16 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Advisor API
+# Warm state (embedding model, vector index, prerequisite graph) is loaded once per worker process.
+
+ADVISOR_WARM_START = os.environ.get('ADVISOR_WARM_START') == '1'
+ADVISOR_VECTOR_STORE_DIR = BASE_DIR.parent / 'vector_store'
+ADVISOR_CRAWLER_DIR = BASE_DIR.parent / 'crawler'
+ADVISOR_EMBEDDING_MODEL = os.environ.get('ADVISOR_EMBEDDING_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
+ADVISOR_EMBEDDING_BACKEND = os.environ.get('ADVISOR_EMBEDDING_BACKEND', 'torch')
+ADVISOR_SEARCH_BACKEND = os.environ.get('ADVISOR_SEARCH_BACKEND', 'exact')
+ADVISOR_MAX_BATCH_SIZE = int(os.environ.get('ADVISOR_MAX_BATCH_SIZE', '32'))
+ADVISOR_MAX_BATCH_WAIT_MS = float(os.environ.get('ADVISOR_MAX_BATCH_WAIT_MS', '5'))
+ADVISOR_MAX_RESULTS = 50
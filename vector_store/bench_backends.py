@@ -0,0 +1,65 @@
+"""
+Accuracy + speed check of the EmbeddingGenerator inference backends.
+
+For every backend: cosine agreement of its vectors with the fp32 torch
+vectors on our course descriptions, single query latency and bulk
+throughput.
+
+usage: python bench_backends.py <courses.csv> [--limit 1024] [--backends torch int8 onnx]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from bench_embedding import load_descriptions
+from inference_backends import BACKENDS
+from manage import EmbeddingGenerator
+
+
+def row_cosines(a, b):
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return np.sum(a * b, axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("csv_file")
+    parser.add_argument("--limit", type=int, default=1024)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS))
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--model", default='sentence-transformers/all-MiniLM-L6-v2')
+    args = parser.parse_args()
+
+    descriptions = load_descriptions(args.csv_file, args.limit)
+    reference = EmbeddingGenerator(args.model, backend="torch").generate_embeddings(descriptions, args.batch_size)
+
+    print(f"{len(descriptions)} courses | batch {args.batch_size}")
+    print(f"{'backend':>8} {'mean cos':>9} {'min cos':>9} {'query p50':>10} {'query p99':>10} {'courses/sec':>12}")
+
+    for backend in args.backends:
+        eg = EmbeddingGenerator(args.model, backend=backend)
+
+        start = time.perf_counter()
+        embeddings = eg.generate_embeddings(descriptions, args.batch_size)
+        throughput = len(descriptions) / (time.perf_counter() - start)
+
+        latencies = []
+        for text in descriptions[:args.queries]:
+            start = time.perf_counter()
+            eg.generate_embedding(text)
+            latencies.append(time.perf_counter() - start)
+
+        cosines = row_cosines(embeddings, reference)
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        print(
+            f"{backend:>8} {cosines.mean():>9.4f} {cosines.min():>9.4f} "
+            f"{p50:>8.2f}ms {p99:>8.2f}ms {throughput:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
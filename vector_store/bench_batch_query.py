@@ -0,0 +1,57 @@
+"""
+Benchmark: one batched multi-query search vs a loop of single queries.
+
+Both sides include embedding the query texts. Run after fromcsv (and
+build_search_index for the in-process backends).
+
+usage: python bench_batch_query.py <courses.csv> [--queries 50] [--backends chroma exact hnsw]
+"""
+
+import argparse
+import time
+
+from bench_search import load_query_texts
+from manage import EmbeddingGenerator, VectorStoreManager
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("csv_file")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--backends", nargs="+", default=["chroma", "exact"])
+    parser.add_argument("--model", default='sentence-transformers/all-MiniLM-L6-v2')
+    args = parser.parse_args()
+
+    eg = EmbeddingGenerator(args.model)
+    texts = load_query_texts(args.csv_file, args.queries)
+
+    print(f"{len(texts)} queries per planning session | k={args.k}")
+    print(f"{'backend':>8} {'loop ms':>9} {'batch ms':>9} {'speedup':>8} {'queries/sec':>12}")
+
+    for backend in args.backends:
+        store = VectorStoreManager(search_backend=backend)
+
+        def loop():
+            return [store.query_vectors(eg.generate_embedding(t), n_results=args.k) for t in texts]
+
+        def batch():
+            return store.query_batch(texts, n_results=args.k, eg=eg)
+
+        timings = {}
+        for name, fn in (("loop", loop), ("batch", batch)):
+            fn()  # warm up
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                fn()
+            timings[name] = (time.perf_counter() - start) / args.repeat
+
+        print(
+            f"{backend:>8} {timings['loop'] * 1000:>9.1f} {timings['batch'] * 1000:>9.1f} "
+            f"{timings['loop'] / timings['batch']:>7.1f}x {len(texts) / timings['batch']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
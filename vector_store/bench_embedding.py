@@ -0,0 +1,50 @@
+"""
+Benchmark: courses embedded per second on CPU for different batch sizes.
+
+usage: python bench_embedding.py <courses.csv> [--limit 1024] [--batch-sizes 1 8 16 32 64 128]
+"""
+
+import argparse
+import csv
+import time
+
+import torch
+
+from manage import EmbeddingGenerator
+
+
+def load_descriptions(file_name, limit):
+    descriptions = []
+    with open(file_name, mode='r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if row.get('description', '').strip():
+                descriptions.append(row['description'])
+            if len(descriptions) == limit:
+                break
+    return descriptions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("csv_file")
+    parser.add_argument("--limit", type=int, default=1024)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 16, 32, 64, 128])
+    parser.add_argument("--model", default='sentence-transformers/all-MiniLM-L6-v2')
+    args = parser.parse_args()
+
+    descriptions = load_descriptions(args.csv_file, args.limit)
+    eg = EmbeddingGenerator(args.model)
+    eg.generate_embeddings(descriptions[:8])  # warm up
+
+    print(f"{len(descriptions)} courses | torch threads {torch.get_num_threads()}")
+    print(f"{'batch':>6} {'seconds':>9} {'courses/sec':>12}")
+
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        eg.generate_embeddings(descriptions, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        print(f"{batch_size:>6} {elapsed:>9.2f} {len(descriptions) / elapsed:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Relevance + latency of lexical-only, vector-only and hybrid (RRF) retrieval.
+
+Queries come from the catalog itself, each with one known relevant course:
+    code queries     "CMPSC 465"                -> that course
+    keyword queries  the course name            -> that course
+
+usage: python bench_hybrid.py <courses.csv> [--queries 200] [--k 10]
+"""
+
+import argparse
+import csv
+import random
+import time
+
+import numpy as np
+
+from manage import EmbeddingGenerator, VectorStoreManager
+
+
+def load_labeled_queries(file_name, n, seed=0):
+    with open(file_name, mode="r", encoding="utf-8") as f:
+        rows = [r for r in csv.DictReader(f) if r.get("course_number") and r.get("course_name")]
+    random.Random(seed).shuffle(rows)
+    rows = rows[:n]
+    return {
+        "code": [(r["course_number"].replace("\xa0", " "), r["course_number"]) for r in rows],
+        "keyword": [(r["course_name"], r["course_number"]) for r in rows],
+    }
+
+
+def evaluate(store, eg, queries, mode, k):
+    reciprocal_ranks, hits, latencies = [], [], []
+    for text, relevant in queries:
+        start = time.perf_counter()
+        ids = store.query_hybrid(text, eg=eg, n_results=k, mode=mode)["ids"]
+        latencies.append(time.perf_counter() - start)
+
+        rank = ids.index(relevant) + 1 if relevant in ids else None
+        reciprocal_ranks.append(1 / rank if rank else 0.0)
+        hits.append(rank is not None)
+    return np.mean(reciprocal_ranks), np.mean(hits), np.percentile(latencies, 50) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("csv_file")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--backend", default="chroma")
+    parser.add_argument("--model", default='sentence-transformers/all-MiniLM-L6-v2')
+    args = parser.parse_args()
+
+    store = VectorStoreManager(search_backend=args.backend)
+    store.build_lexical_index(args.csv_file)
+    eg = EmbeddingGenerator(args.model)
+
+    print(f"{'queries':>8} {'mode':>8} {'MRR@k':>7} {'hit@k':>7} {'p50':>9}")
+    for kind, queries in load_labeled_queries(args.csv_file, args.queries).items():
+        for mode in ("lexical", "vector", "hybrid"):
+            mrr, hit, p50 = evaluate(store, eg, queries, mode, args.k)
+            print(f"{kind:>8} {mode:>8} {mrr:>7.3f} {hit:>7.3f} {p50:>7.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark: recall@k and single query latency of the search backends against ChromaDB.
+
+Ground truth is the exact float32 top-k. Run after fromcsv has filled the
+collection; the in-process indexes are (re)built from it first.
+
+usage: python bench_search.py <courses.csv> [--queries 200] [--k 10]
+"""
+
+import argparse
+import csv
+import random
+import time
+
+import numpy as np
+
+from manage import EmbeddingGenerator, VectorStoreManager
+from search_index import INDEX_DIR, ExactIndex, FaissHNSWIndex, faiss
+
+
+def load_query_texts(file_name, n, seed=0):
+    """course names make realistic short queries"""
+    with open(file_name, mode='r', encoding='utf-8') as f:
+        names = [row["course_name"] for row in csv.DictReader(f) if row.get("course_name")]
+    random.Random(seed).shuffle(names)
+    return names[:n]
+
+
+def run(search, queries, k):
+    latencies, results = [], []
+    for q in queries:
+        start = time.perf_counter()
+        results.append(search(q, k)["ids"][0])
+        latencies.append(time.perf_counter() - start)
+    return results, latencies
+
+
+def recall_at_k(results, truth, k):
+    return np.mean([len(set(r[:k]) & set(t[:k])) / k for r, t in zip(results, truth)])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("csv_file")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--model", default='sentence-transformers/all-MiniLM-L6-v2')
+    args = parser.parse_args()
+
+    store = VectorStoreManager()
+    store.build_search_index(INDEX_DIR)
+    store.build_search_index(INDEX_DIR + "_f16", dtype=np.float16)
+
+    eg = EmbeddingGenerator(args.model)
+    queries = eg.generate_embeddings(load_query_texts(args.csv_file, args.queries))
+
+    backends = {
+        "chroma": store.query_vectors,
+        "exact f32": ExactIndex(INDEX_DIR).search,
+        "exact f16": ExactIndex(INDEX_DIR + "_f16").search,
+    }
+    if faiss is not None:
+        backends["hnsw"] = FaissHNSWIndex(INDEX_DIR).search
+
+    truth, _ = run(backends["exact f32"], queries, args.k)
+
+    print(f"{store.collection.count()} courses | {len(queries)} queries | k={args.k}")
+    print(f"{'backend':>10} {'recall@k':>9} {'p50':>9} {'p99':>9}")
+    for name, search in backends.items():
+        run(search, queries[:10], args.k)  # warm up
+        results, latencies = run(search, queries, args.k)
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        print(f"{name:>10} {recall_at_k(results, truth, args.k):>9.3f} {p50:>7.3f}ms {p99:>7.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Benchmark: single process vs multi-process embedding on CPU.
+
+usage: python bench_workers.py <courses.csv> [--limit 2048] [--workers 1 2 4 8] [--batch-size 64]
+"""
+
+import argparse
+import os
+import time
+
+from bench_embedding import load_descriptions
+from manage import EmbeddingGenerator
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("csv_file")
+    parser.add_argument("--limit", type=int, default=2048)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--model", default='sentence-transformers/all-MiniLM-L6-v2')
+    args = parser.parse_args()
+
+    descriptions = load_descriptions(args.csv_file, args.limit)
+    print(f"{len(descriptions)} courses | {os.cpu_count()} cores | batch {args.batch_size}")
+    print(f"{'workers':>8} {'seconds':>9} {'courses/sec':>12}")
+
+    for num_workers in dict.fromkeys(args.workers):
+        eg = EmbeddingGenerator(args.model, num_workers=num_workers)
+        try:
+            eg.generate_embeddings(descriptions[:args.batch_size * 2 * num_workers], batch_size=args.batch_size)  # warm up every worker
+
+            start = time.perf_counter()
+            eg.generate_embeddings(descriptions, batch_size=args.batch_size)
+            elapsed = time.perf_counter() - start
+        finally:
+            eg.close()
+
+        print(f"{num_workers:>8} {elapsed:>9.2f} {len(descriptions) / elapsed:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""
+Crawler modules the vector store shares rather than copies.
+
+The CSV value parsers (csv_values) and the tokenizer the cleaner applies
+(text_tokens) live in crawler/; importing this module puts that directory
+on sys.path (after everything else, so vector_store modules win any name
+clash) and re-exports what the vector store uses.
+"""
+
+import os
+import sys
+
+CRAWLER_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "crawler")
+
+if CRAWLER_DIR not in sys.path:
+    sys.path.append(CRAWLER_DIR)
+
+from csv_values import literal_list, parse_course_credits  # noqa: E402
+from text_tokens import tokenize  # noqa: E402
+
+__all__ = ["CRAWLER_DIR", "literal_list", "parse_course_credits", "tokenize"]
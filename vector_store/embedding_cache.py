@@ -0,0 +1,129 @@
+"""
+Persistent embedding cache.
+
+Vectors are stored in SQLite keyed by (model name, pooling, hash of the
+normalized text) so re-ingesting a bulletin release only runs the
+transformer on descriptions that actually changed. The cache is size bounded:
+once it holds more than `max_entries` vectors the least recently used ones
+are evicted.
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+DEFAULT_CACHE_PATH = "./embedding_cache.sqlite3"
+DEFAULT_MAX_ENTRIES = 500_000
+
+
+def normalize_text(text):
+    """collapse whitespace so formatting only changes still hit the cache"""
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def text_key(model_name, pooling, text):
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"{model_name}|{pooling}|{digest}"
+
+
+class EmbeddingCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # the embedding stage of the ingest pipeline runs on its own thread
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                dim INTEGER NOT NULL,
+                dtype TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self.conn.commit()
+
+    def get_many(self, keys):
+        """cached vectors for keys -> {key: vector}, missing keys are left out"""
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+
+        with self.lock:
+            # stay under sqlite's bound parameter limit
+            for start in range(0, len(unique_keys), 500):
+                chunk = unique_keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT key, dim, dtype, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, dim, dtype, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=dtype).reshape(dim)
+
+            if found:
+                now = time.time()
+                self.conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?", [(now, key) for key in found]
+                )
+                self.conn.commit()
+
+            hits = sum(1 for key in keys if key in found)
+            self.hits += hits
+            self.misses += len(keys) - hits
+
+        return found
+
+    def put_many(self, keys, vectors):
+        now = time.time()
+        rows = [
+            (key, vector.shape[0], vector.dtype.str, vector.tobytes(), now)
+            for key, vector in zip(keys, vectors)
+        ]
+
+        with self.lock:
+            self.conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?)", rows)
+            self.evict()
+            self.conn.commit()
+
+    def evict(self):
+        """drop least recently used vectors beyond max_entries (caller holds the lock)"""
+        (count,) = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self.conn.execute(
+                "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                (overflow,),
+            )
+            self.evictions += overflow
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "evictions": self.evictions,
+            "entries": len(self),
+        }
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,107 @@
+"""
+Multi-process CPU embedding.
+
+Each worker process loads the tokenizer and model once (pool initializer) and
+pins torch to `threads_per_worker` intra-op threads so workers don't fight
+over cores. The parent splits the texts into shards, and workers write their
+vectors straight into one shared memory output array at their shard's row
+offset, so no tensors are pickled back to the parent.
+"""
+
+import multiprocessing as mp
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from pooling import pool
+
+# per worker process state, set by init_worker
+_worker = {}
+
+
+def init_worker(model_name, pooling, threads_per_worker, backend):
+    import torch
+    from transformers import AutoTokenizer
+
+    from inference_backends import load_backend
+
+    torch.set_num_threads(threads_per_worker)
+    _worker["tokenizer"] = AutoTokenizer.from_pretrained(model_name)
+    _worker["backend"] = load_backend(backend, model_name, _worker["tokenizer"])
+    _worker["pooling"] = pooling
+
+
+def embed_shard(shm_name, n_rows, dim, offset, texts, batch_size):
+    """embed one shard and write it into rows [offset, offset + len(texts)) of the shared output"""
+    tokenizer = _worker["tokenizer"]
+    backend = _worker["backend"]
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        out = np.ndarray((n_rows, dim), dtype=np.float32, buffer=shm.buf)
+
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            inputs = tokenizer(batch, return_tensors=backend.tensor_type, truncation=True, padding=True)
+            hidden_states = backend.last_hidden_state(inputs)
+            out[offset + start:offset + start + len(batch)] = pool(hidden_states, inputs["attention_mask"], _worker["pooling"])
+
+        del out  # release the buffer view before closing
+    finally:
+        shm.close()
+
+    return len(texts)
+
+
+class EmbeddingWorkerPool:
+    def __init__(self, model_name, num_workers, dim, pooling="mean", threads_per_worker=None, backend="torch"):
+        """
+        dim - embedding width of the model (hidden size)
+        threads_per_worker - torch intra-op threads per process, defaults to cores / workers
+        """
+        self.num_workers = num_workers
+        self.dim = dim
+        threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // num_workers)
+
+        # spawn -> workers don't inherit the parent's torch thread pool state
+        self.pool = mp.get_context("spawn").Pool(
+            processes=num_workers,
+            initializer=init_worker,
+            initargs=(model_name, pooling, threads_per_worker, backend),
+        )
+
+    def embed(self, texts, batch_size):
+        """(len(texts), dim) float32 array in input order"""
+        if not texts:
+            return np.empty((0, self.dim), dtype=np.float32)
+
+        # length sorted so every batch pads to a similar length, then dealt out in contiguous shards
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        shard_size = max(batch_size, -(-len(order) // (self.num_workers * 4)))
+
+        shm = shared_memory.SharedMemory(create=True, size=len(texts) * self.dim * 4)
+        try:
+            jobs = [
+                self.pool.apply_async(
+                    embed_shard,
+                    (shm.name, len(texts), self.dim, start, [texts[i] for i in order[start:start + shard_size]], batch_size),
+                )
+                for start in range(0, len(order), shard_size)
+            ]
+            for job in jobs:
+                job.get()
+
+            sorted_embeddings = np.ndarray((len(texts), self.dim), dtype=np.float32, buffer=shm.buf)
+            embeddings = np.empty_like(sorted_embeddings)
+            embeddings[order] = sorted_embeddings  # undo the length sort
+            del sorted_embeddings
+        finally:
+            shm.close()
+            shm.unlink()
+
+        return embeddings
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
@@ -0,0 +1,241 @@
+"""
+Structured course facets and the inverted indexes built over them.
+
+Ingest stores these facets as metadata next to every course vector:
+
+    course_prefix   "CMPSC"              (from course_number)
+    credits_min     3                    (from the crawler's extract_credits output,
+    credits_max     3                     both left out when unknown)
+    gened           ",GH,GQ,"            (learning_objectives GenEd codes)
+    gened_<CODE>    True                 (one flag per code so ChromaDB can filter on it)
+    prereq_count    0                    (number of prerequisite course numbers)
+
+FacetIndex precomputes sorted row arrays per facet value (categorical) and
+value-sorted row arrays (numeric) so a filter like "3 credit GH courses in
+CMPSC with no prerequisites" becomes a few array intersections that prune the
+candidate rows before any vector is scored.
+
+filters use the chroma operators:
+    {"course_prefix": "CMPSC", "gened": "GH", "credits_max": {"$lte": 3}, "prereq_count": 0}
+$eq / $ne / $gt / $gte / $lt / $lte / $in / $nin are supported (gened: $eq / $in
+only, ChromaDB can't express the negations over per code flags); anything
+else raises ValueError rather than silently matching every row
+"""
+
+import operator
+import os
+
+import numpy as np
+
+from crawler_modules import literal_list, parse_course_credits
+
+CATEGORICAL_FACETS = ("course_prefix", "gened")
+NUMERIC_FACETS = ("credits_min", "credits_max", "prereq_count")
+FACETS = CATEGORICAL_FACETS + NUMERIC_FACETS
+FACETS_FILE = "facets.npz"
+
+COMPARISONS = {
+    "$eq": operator.eq,
+    "$ne": operator.ne,
+    "$gt": operator.gt,
+    "$gte": operator.ge,
+    "$lt": operator.lt,
+    "$lte": operator.le,
+    "$in": lambda value, bound: value in bound,
+    "$nin": lambda value, bound: value not in bound,
+}
+GENED_OPERATORS = ("$eq", "$in")
+
+
+def operators(field, condition, allowed=tuple(COMPARISONS)):
+    """filter condition -> {operator: operand}, a bare value meaning $eq"""
+    if not isinstance(condition, dict):
+        return {"$eq": condition}
+    unsupported = [op for op in condition if op not in allowed]
+    if unsupported:
+        raise ValueError(f"unsupported filter operator(s) {unsupported} for {field}, use one of {list(allowed)}")
+    return condition
+
+
+def matches(value, op, bound):
+    """one metadata value against one condition
+
+    like ChromaDB a missing value fails every condition (ranges included) except $ne / $nin
+    """
+    if value is None:
+        return op in ("$ne", "$nin")
+    try:
+        return bool(COMPARISONS[op](value, bound))
+    except TypeError:
+        return False
+
+
+def condition_mask(field, column, condition):
+    """boolean mask of the column values passing every operator of condition"""
+    mask = np.ones(len(column), dtype=bool)
+    for op, bound in operators(field, condition).items():
+        mask &= np.fromiter((matches(value, op, bound) for value in column), dtype=bool, count=len(column))
+    return mask
+
+
+def course_facets(row):
+    """facet metadata for one CSV row"""
+    course_number = (row.get("course_number") or "").replace("\xa0", " ").strip()
+    credits_min, credits_max = parse_course_credits(row.get("credits", ""))
+    gened_codes = sorted({code.strip("()") for code in literal_list(row.get("learning_objectives", ""))})
+
+    facets = {
+        "course_prefix": course_number.split(" ")[0] if course_number else "N/A",
+        "gened": "," + ",".join(gened_codes) + "," if gened_codes else "",
+        "prereq_count": len(literal_list(row.get("prerequisite_course_numbers", ""))),
+    }
+    # unknown credits stay unset so no credit range condition can match them
+    if credits_min is not None:
+        facets["credits_min"] = credits_min
+        facets["credits_max"] = credits_max
+    for code in gened_codes:
+        facets[f"gened_{code}"] = True
+    return facets
+
+
+def to_chroma_where(where):
+    """facet filter -> ChromaDB where clause"""
+    clauses = []
+    for field, condition in where.items():
+        if field == "gened":
+            codes = [code for op, bound in operators(field, condition, GENED_OPERATORS).items()
+                     for code in (bound if op == "$in" else [bound])]
+            gened = [{f"gened_{code}": True} for code in codes]
+            clauses.append(gened[0] if len(gened) == 1 else {"$or": gened})
+        elif isinstance(condition, dict):
+            clauses.extend({field: {op: value}} for op, value in operators(field, condition).items())
+        else:
+            clauses.append({field: condition})
+
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+class FacetIndex:
+    """Inverted indexes over the facet metadata of an index's rows"""
+
+    def __init__(self, n_rows, postings, numeric):
+        """
+        postings - {(field, value): sorted int32 row array}
+        numeric - {field: (sorted values, rows in that order)}
+        """
+        self.n_rows = n_rows
+        self.postings = postings
+        self.numeric = numeric
+
+    @classmethod
+    def from_metadatas(cls, metadatas):
+        rows_by_value = {}
+        for row, metadata in enumerate(metadatas):
+            rows_by_value.setdefault(("course_prefix", metadata.get("course_prefix")), []).append(row)
+            for code in (metadata.get("gened") or "").strip(",").split(","):
+                if code:
+                    rows_by_value.setdefault(("gened", code), []).append(row)
+
+        postings = {key: np.array(rows, dtype=np.int32) for key, rows in rows_by_value.items()}
+
+        numeric = {}
+        for field in NUMERIC_FACETS:
+            # rows without the field are left out; they can only match $ne / $nin (see numeric_rows)
+            present = np.array([row for row, metadata in enumerate(metadatas) if metadata.get(field) is not None], dtype=np.int32)
+            values = np.array([metadatas[row][field] for row in present], dtype=np.int32)
+            order = np.argsort(values, kind="stable")
+            numeric[field] = (values[order], present[order])
+
+        return cls(len(metadatas), postings, numeric)
+
+    def save(self, path):
+        arrays = {"n_rows": np.array([self.n_rows])}
+        for (field, value), rows in self.postings.items():
+            arrays[f"cat::{field}::{value}"] = rows
+        for field, (values, rows) in self.numeric.items():
+            arrays[f"num::{field}::values"] = values
+            arrays[f"num::{field}::rows"] = rows
+        np.savez(os.path.join(path, FACETS_FILE), **arrays)
+
+    @classmethod
+    def load(cls, path):
+        postings, numeric = {}, {}
+        with np.load(os.path.join(path, FACETS_FILE)) as arrays:
+            n_rows = int(arrays["n_rows"][0])
+            for key in arrays.files:
+                if key.startswith("cat::"):
+                    _, field, value = key.split("::", 2)
+                    postings[(field, value)] = arrays[key]
+                elif key.endswith("::values"):
+                    field = key.split("::")[1]
+                    numeric[field] = (arrays[key], arrays[f"num::{field}::rows"])
+        return cls(n_rows, postings, numeric)
+
+    def posting_rows(self, field, values):
+        lists = [self.postings.get((field, str(v)), np.empty(0, dtype=np.int32)) for v in values]
+        if not lists:
+            return np.empty(0, dtype=np.int32)
+        return lists[0] if len(lists) == 1 else np.unique(np.concatenate(lists))
+
+    def categorical_rows(self, field, condition):
+        allowed = GENED_OPERATORS if field == "gened" else ("$eq", "$ne", "$in", "$nin")
+        rows = np.arange(self.n_rows, dtype=np.int32)
+        for op, bound in operators(field, condition, allowed).items():
+            values = bound if op in ("$in", "$nin") else [bound]
+            if op in ("$eq", "$in"):
+                rows = np.intersect1d(rows, self.posting_rows(field, values), assume_unique=True)
+            else:
+                rows = np.setdiff1d(rows, self.posting_rows(field, values), assume_unique=True)
+        return rows.astype(np.int32, copy=False)
+
+    def numeric_rows(self, field, condition):
+        values, rows = self.numeric[field]
+        condition = operators(field, condition)
+
+        lo, hi = 0, len(values)
+        for op, bound in condition.items():
+            if op in ("$eq", "$gte"):
+                lo = max(lo, np.searchsorted(values, bound, side="left"))
+            if op in ("$eq", "$lte"):
+                hi = min(hi, np.searchsorted(values, bound, side="right"))
+            if op == "$gt":
+                lo = max(lo, np.searchsorted(values, bound, side="right"))
+            if op == "$lt":
+                hi = min(hi, np.searchsorted(values, bound, side="left"))
+        matched = np.empty(0, dtype=np.int32)
+        if lo < hi:
+            # set operators filter what is left of the sorted range
+            keep = np.ones(hi - lo, dtype=bool)
+            for op in ("$ne", "$in", "$nin"):
+                if op in condition:
+                    keep &= condition_mask(field, values[lo:hi].tolist(), {op: condition[op]})
+            matched = rows[lo:hi][keep]
+
+        if all(op in ("$ne", "$nin") for op in condition):
+            # rows missing the field pass negations only
+            missing = np.setdiff1d(np.arange(self.n_rows, dtype=np.int32), rows)
+            matched = np.concatenate([matched, missing])
+        return np.sort(matched).astype(np.int32, copy=False)
+
+    def rows(self, where):
+        """sorted candidate rows matching every facet condition in where (non facet fields are ignored)"""
+        row_lists = []
+        for field, condition in where.items():
+            if field in CATEGORICAL_FACETS:
+                row_lists.append(self.categorical_rows(field, condition))
+            elif field in NUMERIC_FACETS:
+                row_lists.append(self.numeric_rows(field, condition))
+
+        if not row_lists:
+            return np.arange(self.n_rows, dtype=np.int32)
+
+        # intersect smallest first so the work shrinks as fast as possible
+        row_lists.sort(key=len)
+        rows = row_lists[0]
+        for other in row_lists[1:]:
+            if len(rows) == 0:
+                break
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
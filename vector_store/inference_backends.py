@@ -0,0 +1,121 @@
+"""
+Inference backends for EmbeddingGenerator.
+
+    "torch" - full precision PyTorch AutoModel (default)
+    "int8"  - PyTorch model with dynamic int8 quantization of the Linear layers
+    "onnx"  - ONNX Runtime session over a graph exported once to ONNX_DIR
+
+Every backend takes tokenizer output and returns last_hidden_state as a
+float32 numpy array, so pooling is the same whichever backend ran.
+"""
+
+import os
+
+import numpy as np
+
+ONNX_DIR = "./onnx_models"
+BACKENDS = ("torch", "int8", "onnx")
+ONNX_MISSING = "the onnx backend needs onnx and onnxruntime -> poetry install -E onnx (pip install onnx onnxruntime)"
+
+
+def model_hidden_size(model_name):
+    """embedding width read from the model config alone, no weights loaded"""
+    from transformers import AutoConfig
+
+    return AutoConfig.from_pretrained(model_name).hidden_size
+
+
+class TorchBackend:
+    tensor_type = "pt"
+
+    def __init__(self, model_name, quantize=False):
+        import torch
+        from transformers import AutoModel
+
+        self.torch = torch
+        self.model = AutoModel.from_pretrained(model_name).eval()
+        self.hidden_size = self.model.config.hidden_size
+
+        if quantize:
+            self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    def last_hidden_state(self, inputs):
+        with self.torch.no_grad():
+            outputs = self.model(**inputs)
+        return outputs.last_hidden_state.numpy()
+
+
+def onnx_path(model_name, onnx_dir=ONNX_DIR):
+    return os.path.join(onnx_dir, model_name.strip("/").replace("/", "__") + ".onnx")
+
+
+def export_onnx(model_name, tokenizer, path):
+    """export the transformer to an ONNX graph with dynamic batch and sequence axes"""
+    try:
+        import onnx  # noqa: F401  torch.onnx.export needs it to write the graph
+    except ImportError as e:
+        raise ImportError(ONNX_MISSING) from e
+    import torch
+    from transformers import AutoModel
+
+    model = AutoModel.from_pretrained(model_name).eval()
+    input_names = list(tokenizer.model_input_names)
+
+    class LastHiddenState(torch.nn.Module):
+        """pins the positional input order and the single output for the exporter"""
+
+        def __init__(self):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs))).last_hidden_state
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    torch.onnx.export(
+        LastHiddenState(),
+        tuple(sample[name] for name in input_names),
+        path,
+        input_names=input_names,
+        output_names=["last_hidden_state"],
+        dynamic_axes=dynamic_axes,
+        opset_version=17,
+        dynamo=False,
+    )
+    print(f"[ONNX] exported {model_name} -> {path}")
+
+
+class OnnxBackend:
+    tensor_type = "np"
+
+    def __init__(self, model_name, tokenizer, onnx_dir=ONNX_DIR):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError(ONNX_MISSING) from e
+
+        path = onnx_path(model_name, onnx_dir)
+        if not os.path.exists(path):
+            export_onnx(model_name, tokenizer, path)
+
+        self.session = ort.InferenceSession(path, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.hidden_size = model_hidden_size(model_name)
+
+    def last_hidden_state(self, inputs):
+        feed = {name: np.asarray(inputs[name], dtype=np.int64) for name in self.input_names}
+        return self.session.run(["last_hidden_state"], feed)[0]
+
+
+def load_backend(name, model_name, tokenizer):
+    if name == "torch":
+        return TorchBackend(model_name)
+    if name == "int8":
+        return TorchBackend(model_name, quantize=True)
+    if name == "onnx":
+        return OnnxBackend(model_name, tokenizer)
+    raise ValueError(f"unknown backend {name!r}, expected one of {BACKENDS}")
@@ -0,0 +1,194 @@
+"""
+Streaming ingest: CSV reader -> embedding worker -> ChromaDB writer.
+
+The three stages run concurrently and hand batches to each other through
+bounded queues. A full queue blocks the stage feeding it (backpressure), so
+at most `max_buffered_rows` rows are in memory at once no matter how big the
+catalog is, while reading, embedding and writing overlap.
+"""
+
+import csv
+import queue
+import threading
+import time
+
+DONE = None  # end of stream marker passed down the queues
+
+
+def read_course_batches(file_name: str, batch_size: int, keep=None):
+    """Yield lists of CSV rows that have a description, batch_size rows at a time"""
+    with open(file_name, mode='r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        batch = []
+
+        for row in reader:
+            if 'description' not in row or not row['description'].strip():
+                continue  # Skip rows with missing descriptions
+            if keep is not None and not keep(row):
+                continue
+
+            batch.append(row)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
+
+class StageStats:
+    """Rows processed and time spent working (not waiting on queues) by one stage"""
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = 0
+        self.batches = 0
+        self.busy_seconds = 0.0
+
+    def add(self, rows, seconds):
+        self.rows += rows
+        self.batches += 1
+        self.busy_seconds += seconds
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.busy_seconds if self.busy_seconds else 0.0
+
+    def __str__(self):
+        return f"{self.name}: {self.rows} rows, {self.busy_seconds:.2f}s busy, {self.rows_per_second:.1f} rows/sec"
+
+
+class IngestPipeline:
+    def __init__(self, store, eg, batch_size=64, max_buffered_rows=1024, progress_every=10, embed_batch_size=None):
+        """
+        store - VectorStoreManager the writer stage calls add_vectors on
+        eg - EmbeddingGenerator used by the embedding stage
+        max_buffered_rows - cap on rows read but not yet written
+        embed_batch_size - texts per forward pass, defaults to an even split of a batch over eg's workers
+        """
+        self.store = store
+        self.eg = eg
+        self.batch_size = batch_size
+        num_workers = eg.workers.num_workers if eg.workers is not None else 1
+        self.embed_batch_size = embed_batch_size or max(1, batch_size // num_workers)
+        self.progress_every = progress_every
+
+        # every stage holds one batch while working, the rest of the budget is split across the two queues
+        queue_batches = max(2, max_buffered_rows // batch_size - 3)
+        self.embed_queue = queue.Queue(maxsize=queue_batches // 2)
+        self.write_queue = queue.Queue(maxsize=queue_batches - queue_batches // 2)
+
+        self.stats = {name: StageStats(name) for name in ("read", "embed", "write")}
+        self.errors = []
+        self.failed = threading.Event()
+        self.started = None
+
+    def progress(self):
+        """snapshot of rows done per stage + queue depths"""
+        return {
+            "read": self.stats["read"].rows,
+            "embedded": self.stats["embed"].rows,
+            "written": self.stats["write"].rows,
+            "embed_queue": self.embed_queue.qsize(),
+            "write_queue": self.write_queue.qsize(),
+            "elapsed_seconds": time.perf_counter() - self.started if self.started else 0.0,
+        }
+
+    def put(self, q, item):
+        """blocking put that gives up once another stage has failed"""
+        while not self.failed.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(self, q):
+        while not self.failed.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return DONE
+
+    def embed_stage(self):
+        try:
+            while True:
+                rows = self.get(self.embed_queue)
+                if rows is DONE:
+                    break
+
+                start = time.perf_counter()
+                embeddings = self.eg.generate_embeddings([row['description'] for row in rows], batch_size=self.embed_batch_size)
+                self.stats["embed"].add(len(rows), time.perf_counter() - start)
+
+                if not self.put(self.write_queue, (rows, embeddings)):
+                    break
+        except Exception as e:
+            self.errors.append(e)
+            self.failed.set()
+        finally:
+            self.put(self.write_queue, DONE)
+
+    def write_stage(self, document, metadata, doc_id):
+        try:
+            while True:
+                item = self.get(self.write_queue)
+                if item is DONE:
+                    break
+
+                rows, embeddings = item
+                start = time.perf_counter()
+                self.store.add_vectors(
+                    embeddings=embeddings,
+                    documents=[document(row) for row in rows],
+                    metadatas=[metadata(row) for row in rows],
+                    ids=[doc_id(row) for row in rows]
+                )
+                self.stats["write"].add(len(rows), time.perf_counter() - start)
+
+                if self.stats["write"].batches % self.progress_every == 0:
+                    print(f"[Vectorizing] {self.progress()}")
+        except Exception as e:
+            self.errors.append(e)
+            self.failed.set()
+
+    def run(self, batches, document, metadata, doc_id):
+        """stream batches of rows through embed + write; returns rows written
+
+        document / metadata / doc_id map a row to what is stored for it
+        """
+        self.started = time.perf_counter()
+
+        embedder = threading.Thread(target=self.embed_stage, name="embed", daemon=True)
+        writer = threading.Thread(target=self.write_stage, args=(document, metadata, doc_id), name="write", daemon=True)
+        embedder.start()
+        writer.start()
+
+        # reader stage runs on the calling thread, blocking when the embedder falls behind
+        try:
+            batches = iter(batches)
+            while not self.failed.is_set():
+                start = time.perf_counter()
+                rows = next(batches, DONE)
+                if rows is DONE:
+                    break
+                self.stats["read"].add(len(rows), time.perf_counter() - start)
+
+                if not self.put(self.embed_queue, rows):
+                    break
+        finally:
+            self.put(self.embed_queue, DONE)
+            embedder.join()
+            writer.join()
+
+        if self.errors:
+            raise self.errors[0]
+
+        elapsed = time.perf_counter() - self.started
+        print(f"[Pipeline] {self.stats['write'].rows} rows in {elapsed:.2f}s")
+        for stats in self.stats.values():
+            print(f"\t{stats}")
+
+        return self.stats["write"].rows
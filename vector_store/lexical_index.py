@@ -0,0 +1,163 @@
+"""
+BM25 inverted index over the cleaned course descriptions, plus exact course
+code lookup and reciprocal rank fusion with the vector search.
+
+On disk (one npz + one json, loaded in a few ms):
+
+    <path>/lexical.npz   term_offsets, doc_ids, term_freqs, doc_lengths   (CSR postings)
+    <path>/lexical.json  vocabulary, course ids, course code -> rows
+"""
+
+import csv
+import json
+import os
+import re
+
+import numpy as np
+
+from crawler_modules import tokenize
+
+LEXICAL_DIR = "./lexical_index"
+RRF_K = 60
+
+COURSE_CODE_PATTERN = re.compile(r"\b([A-Za-z]{2,6})[\s\xa0]*(\d{1,3}[A-Za-z]?)\b")
+
+
+def normalize_code(code):
+    """"CMPSC 465" / "cmpsc465" / "CMPSC\\xa0465" -> "CMPSC465" """
+    return re.sub(r"[\s\xa0]+", "", code).upper()
+
+
+def find_course_codes(text):
+    return [normalize_code(dept + num) for dept, num in COURSE_CODE_PATTERN.findall(text)]
+
+
+class LexicalIndex:
+    def __init__(self, vocabulary, ids, codes, term_offsets, doc_ids, term_freqs, doc_lengths, k1=1.2, b=0.75):
+        self.vocabulary = vocabulary
+        self.ids = ids
+        self.codes = codes
+        self.term_offsets = term_offsets
+        self.doc_ids = doc_ids
+        self.term_freqs = term_freqs
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+
+        n_docs = len(ids)
+        doc_freqs = np.diff(term_offsets)
+        self.idf = np.log(1 + (n_docs - doc_freqs + 0.5) / (doc_freqs + 0.5))
+        self.avg_length = doc_lengths.mean() if n_docs else 0.0
+
+    @classmethod
+    def build(cls, file_name, path=LEXICAL_DIR):
+        """index course number + name + cleaned description of every row in the CSV"""
+        ids, codes, documents = [], {}, []
+
+        with open(file_name, mode="r", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                course_number = row.get("course_number", "")
+                if not course_number:
+                    continue
+                codes.setdefault(normalize_code(course_number), []).append(len(ids))
+                ids.append(course_number)
+                documents.append(
+                    tokenize(" ".join([course_number, row.get("course_name", ""), row.get("description", "")]))
+                )
+
+        vocabulary = {}
+        postings = {}  # term id -> {doc: tf}
+        for doc, tokens in enumerate(documents):
+            for token in tokens:
+                term = vocabulary.setdefault(token, len(vocabulary))
+                counts = postings.setdefault(term, {})
+                counts[doc] = counts.get(doc, 0) + 1
+
+        term_offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        doc_ids, term_freqs = [], []
+        for term in range(len(vocabulary)):
+            for doc, tf in sorted(postings[term].items()):
+                doc_ids.append(doc)
+                term_freqs.append(tf)
+            term_offsets[term + 1] = len(doc_ids)
+
+        index = cls(
+            vocabulary,
+            ids,
+            codes,
+            term_offsets,
+            np.array(doc_ids, dtype=np.int32),
+            np.array(term_freqs, dtype=np.uint16),
+            np.array([len(tokens) for tokens in documents], dtype=np.int32),
+        )
+        index.save(path)
+        return index
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        np.savez(
+            os.path.join(path, "lexical.npz"),
+            term_offsets=self.term_offsets,
+            doc_ids=self.doc_ids,
+            term_freqs=self.term_freqs,
+            doc_lengths=self.doc_lengths,
+        )
+        with open(os.path.join(path, "lexical.json"), mode="w", encoding="utf-8") as f:
+            json.dump({"vocabulary": self.vocabulary, "ids": self.ids, "codes": self.codes}, f)
+
+    @classmethod
+    def load(cls, path=LEXICAL_DIR):
+        with open(os.path.join(path, "lexical.json"), mode="r", encoding="utf-8") as f:
+            meta = json.load(f)
+        with np.load(os.path.join(path, "lexical.npz")) as arrays:
+            return cls(
+                meta["vocabulary"],
+                meta["ids"],
+                meta["codes"],
+                arrays["term_offsets"],
+                arrays["doc_ids"],
+                arrays["term_freqs"],
+                arrays["doc_lengths"],
+            )
+
+    def lookup_codes(self, text):
+        """course ids whose code appears in the query, e.g. "CMPSC 465" """
+        rows = []
+        for code in find_course_codes(text):
+            rows.extend(self.codes.get(code, []))
+        return [self.ids[r] for r in dict.fromkeys(rows)]
+
+    def search(self, text, n_results=10):
+        """BM25 top n -> (course ids, scores)"""
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        length_norm = self.k1 * (1 - self.b + self.b * self.doc_lengths / max(self.avg_length, 1e-9))
+
+        for token in tokenize(text):
+            term = self.vocabulary.get(token)
+            if term is None:
+                continue
+            start, end = self.term_offsets[term], self.term_offsets[term + 1]
+            docs = self.doc_ids[start:end]
+            tf = self.term_freqs[start:end].astype(np.float32)
+            # each doc appears once per term posting list, so plain fancy index add is safe
+            scores[docs] += self.idf[term] * tf * (self.k1 + 1) / (tf + length_norm[docs])
+
+        matched = np.flatnonzero(scores)
+        if len(matched) == 0:
+            return [], []
+
+        k = min(n_results, len(matched))
+        top = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        top = top[np.argsort(-scores[top])]
+        return [self.ids[r] for r in top], scores[top].tolist()
+
+
+def reciprocal_rank_fusion(rankings, n_results=10, k=RRF_K):
+    """fuse ranked id lists -> (ids, fused scores) best first"""
+    fused = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+
+    ranked = sorted(fused.items(), key=lambda kv: -kv[1])[:n_results]
+    return [doc_id for doc_id, _ in ranked], [score for _, score in ranked]
@@ -1,21 +1,93 @@
 
-from transformers import AutoTokenizer, AutoModel
+import json
+import sys
+import threading
 
 import numpy as np
-import pandas as pd
-import csv
 
-package__import__('pysqlite3')
-import sys
-sys.modules['sqlite3'] = sys.modules.pop('pysqlite3')
+from embedding_cache import DEFAULT_CACHE_PATH, EmbeddingCache, text_key
+from embedding_workers import EmbeddingWorkerPool
+from facet_index import FACETS, course_facets, to_chroma_where
+from inference_backends import load_backend, model_hidden_size
+from lexical_index import LEXICAL_DIR, LexicalIndex, reciprocal_rank_fusion
+from pooling import l2_normalize, pool
+from search_index import INDEX_DIR, ExactIndex, FaissHNSWIndex, faiss, load_index
+from ingest_pipeline import IngestPipeline, read_course_batches
+
+CHROMA_DIR = "./chroma_db"
+COLLECTION_NAME = "psu_majors"
+COLLECTION_SPACE = "ip"
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_MAX_BUFFERED_ROWS = 1024
+
+
+def load_chromadb():
+    """import chromadb on first use -> the exact / hnsw backends and the CLIs never pay for it
+
+    chromadb needs a newer sqlite than some systems ship, so pysqlite3 stands in
+    for sqlite3 first
+    """
+    if "chromadb" not in sys.modules:
+        __import__('pysqlite3')
+        sys.modules['sqlite3'] = sys.modules.pop('pysqlite3')
+    import chromadb
+    return chromadb
+
+
+def course_metadata(row):
+    """metadata stored next to each course vector -> names plus the structured facets filters run on"""
+    metadata = {
+        "course_name": row.get("course_name", "N/A"),
+        "department_url": row.get("department_url", "N/A")
+    }
+    metadata.update(course_facets(row))
+    return metadata
+
+
+def course_id(row):
+    """course number is ID"""
+    return row.get("course_number") or f"course_{hash(str(row))}"
 
-import chromadb
 
 class VectorStoreManager:
-    def __init__(self):
-        """Initialize ChromaDB with persistent storage"""
-        self.client = chromadb.PersistentClient(path="./chroma_db")  # store vectors persistently
-        self.collection = self.client.get_or_create_collection(name="psu_majors")
+    def __init__(self, search_backend="chroma", index_path=INDEX_DIR, lexical_path=LEXICAL_DIR, chroma_path=CHROMA_DIR):
+        """Initialize ChromaDB with persistent storage
+
+        search_backend - "chroma" queries the collection, "exact" / "hnsw" query an
+        in-process index at index_path written by build_search_index
+        the ChromaDB client is only opened the first time the collection is used
+        """
+        self.chroma_path = chroma_path
+        self._client = None
+        self._collection = None
+
+        self.search_backend = search_backend
+        self.index = None if search_backend == "chroma" else load_index(search_backend, index_path)
+
+        # BM25 index, loaded on first hybrid query
+        self.lexical = None
+        self.lexical_path = lexical_path
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = load_chromadb().PersistentClient(path=self.chroma_path)  # store vectors persistently
+        return self._client
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            # embeddings are L2 normalized -> inner product ranks the same as cosine
+            collection = self.client.get_or_create_collection(name=COLLECTION_NAME, metadata={"hnsw:space": COLLECTION_SPACE})
+            # get_or_create keeps an existing collection's space (l2 when it predates the inner product index)
+            space = (collection.metadata or {}).get("hnsw:space", "l2")
+            if space != COLLECTION_SPACE:
+                raise ValueError(
+                    f"collection {COLLECTION_NAME!r} in {self.chroma_path} uses the {space!r} space, expected "
+                    f"{COLLECTION_SPACE!r} -> delete {self.chroma_path} and re-run ingestion"
+                )
+            self._collection = collection
+        return self._collection
 
     def add_vector(self, embedding, document, metadata, doc_id):
         """Add a new vector and metadata to ChromaDB"""
@@ -26,66 +98,343 @@ class VectorStoreManager:
             ids=[doc_id]
         )
 
-    def fromcsv(self, file_name: str):
-        """Read courses from CSV generate embeddings then store in ChromaDB"""
-        eg = EmbeddingGenerator()
+    def add_vectors(self, embeddings, documents, metadatas, ids):
+        """Bulk upsert vectors and metadata into ChromaDB, chunked to the client's max batch size"""
+        # chroma rejects duplicate ids inside one call -> last row for an id wins
+        latest = {doc_id: i for i, doc_id in enumerate(ids)}
+        keep = sorted(latest.values())
+
+        max_batch = self.client.get_max_batch_size()
+        for start in range(0, len(keep), max_batch):
+            chunk = keep[start:start + max_batch]
+            self.collection.upsert(
+                embeddings=embeddings[chunk].astype(np.float32).tolist(),
+                documents=[documents[i] for i in chunk],
+                metadatas=[metadatas[i] for i in chunk],
+                ids=[ids[i] for i in chunk]
+            )
+
+    def ingest(self, batches, eg, batch_size, max_buffered_rows):
+        """Stream batches of CSV rows through the read -> embed -> write pipeline (sharded over eg's workers if any)"""
+        pipeline = IngestPipeline(self, eg, batch_size=batch_size, max_buffered_rows=max_buffered_rows)
+        return pipeline.run(
+            batches,
+            document=str,  # row -> string for document storage
+            metadata=course_metadata,
+            doc_id=course_id
+        )
+
+    def fromcsv(self, file_name: str, batch_size: int = DEFAULT_BATCH_SIZE, max_buffered_rows: int = DEFAULT_MAX_BUFFERED_ROWS, cache_path=DEFAULT_CACHE_PATH,
+                num_workers: int = 1):
+        """Read courses from CSV generate embeddings then store in ChromaDB
+
+        reading, embedding and writing overlap; at most max_buffered_rows rows are held in memory
+        descriptions already embedded in a previous run come from the cache at cache_path (None disables it)
+        num_workers - > 1 embeds every batch on a pool of worker processes
+        """
+        eg = EmbeddingGenerator(cache=EmbeddingCache(cache_path) if cache_path else None, num_workers=num_workers)
+        try:
+            total = self.ingest(read_course_batches(file_name, batch_size), eg, batch_size, max_buffered_rows)
+        finally:
+            eg.close()
+
+        print(f"Successfully added {total} courses from {file_name} into ChromaDB!")
+        if eg.cache is not None:
+            print(f"[Embedding Cache] {eg.cache.stats()}")
+
+    def apply_changes(self, file_name: str, changes_file: str, batch_size: int = DEFAULT_BATCH_SIZE, cache_path=DEFAULT_CACHE_PATH,
+                      num_workers: int = 1):
+        """Patch the collection after an incremental crawl -> only re-embed upserted courses and drop removed ones"""
+        with open(changes_file, mode='r', encoding='utf-8') as f:
+            changes = json.load(f)
+
+        upserted = set(changes["upserted"])
+        removed = changes["removed"]
+
+        if removed:
+            self.collection.delete(ids=removed)
+            print(f"[Removed] {len(removed)} courses")
+
+        eg = EmbeddingGenerator(cache=EmbeddingCache(cache_path) if cache_path else None, num_workers=num_workers)
+
+        # courses unchanged since the last crawl are skipped
+        batches = read_course_batches(file_name, batch_size, keep=lambda row: row.get("course_number") in upserted)
+        try:
+            self.ingest(batches, eg, batch_size, DEFAULT_MAX_BUFFERED_ROWS)
+        finally:
+            eg.close()
 
-        with open(file_name, mode='r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
+        print(f"Applied {len(upserted)} upserts and {len(removed)} removals from {changes_file}")
 
-            for row in reader:
-                if 'description' not in row or not row['description'].strip():
-                    continue  # Skip rows with missing descriptions
+    def build_search_index(self, path=INDEX_DIR, dtype=np.float32, page_size=5000):
+        """Export every vector in the collection into the in-process search index files"""
+        ids, embeddings, metadatas = [], [], []
 
-                # make embedding from description
-                embedding = eg.generate_embedding(row['description'])
+        for offset in range(0, self.collection.count(), page_size):
+            page = self.collection.get(include=["embeddings", "metadatas"], limit=page_size, offset=offset)
+            ids.extend(page["ids"])
+            embeddings.append(np.asarray(page["embeddings"], dtype=np.float32))
+            metadatas.extend(page["metadatas"])
 
-                # row -> string for document storage
-                documents = str(row)
+        embeddings = np.vstack(embeddings)
+        ExactIndex.build(path, ids, embeddings, metadatas, dtype=dtype)
+        if faiss is not None:
+            FaissHNSWIndex.build(path, ids, embeddings, metadatas)
 
-                # store metadata
-                metadata = {
-                    "course_name": row.get("course_name", "N/A"),
-                    "department_url": row.get("department_url", "N/A")
-                }
+        print(f"Built search index for {len(ids)} courses in {path}")
 
-                # course number is ID
-                doc_id = row.get("course_number", f"course_{hash(documents)}")
-                print(f"[Vectorizing] {str(doc_id)}")
-                self.add_vector(embedding=embedding, document=documents, metadata=metadata, doc_id=doc_id)
+    def chroma_where(self, where):
+        """facet filters -> ChromaDB's where syntax (gened codes become per code flags)"""
+        if not where:
+            return None
+        if any(field in FACETS for field in where):
+            return to_chroma_where(where)
+        return where
 
-        print(f"Successfully added courses from {file_name} into ChromaDB!")
+    def query_vectors(self, query_embedding, n_results=3, where=None):
+        """Find similar courses based on query embedding
+
+        where - optional filter on metadata / facets, e.g.
+            {"course_prefix": "CMPSC", "gened": "GH", "credits_max": {"$lte": 3}, "prereq_count": 0}
+        """
+        if self.index is not None:
+            return self.index.search(query_embedding, n_results=n_results, where=where)
 
-    def query_vectors(self, query_embedding, n_results=3):
-        """Find similar courses based on query embedding"""
         results = self.collection.query(
             query_embeddings=[query_embedding.tolist()],  # numpy to list
-            n_results=n_results
+            n_results=n_results,
+            where=self.chroma_where(where)
         )
         return results
 
+    def query_batch(self, queries, n_results=3, where=None, eg=None, dedup=False):
+        """Find similar courses for many queries in one search
+
+        queries - list of query texts (embedded together in one forward pass by eg) or an (n, dim) array
+        dedup - a course is only returned for the query it matched best, so lists may come back shorter
+        returns one {"ids", "distances", "metadatas"} dict per query, in query order
+        """
+        if len(queries) and isinstance(queries[0], str):
+            if eg is None:
+                raise ValueError("an EmbeddingGenerator is needed to search query texts")
+            query_embeddings = eg.generate_embeddings(list(queries))
+        else:
+            query_embeddings = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+
+        if len(query_embeddings) == 0:
+            return []
+
+        # over fetch when deduping so queries that lose courses still have candidates
+        fetch_k = n_results * 2 if dedup and len(query_embeddings) > 1 else n_results
+
+        if self.index is not None:
+            results = self.index.search(query_embeddings, n_results=fetch_k, where=where)
+        else:
+            results = self.collection.query(
+                query_embeddings=query_embeddings.astype(np.float32).tolist(),
+                n_results=fetch_k,
+                where=self.chroma_where(where)
+            )
+
+        per_query = [
+            {"ids": results["ids"][q], "distances": results["distances"][q], "metadatas": results["metadatas"][q]}
+            for q in range(len(query_embeddings))
+        ]
+
+        if dedup:
+            # course id -> (distance, query) of its best match
+            best = {}
+            for q, result in enumerate(per_query):
+                for doc_id, distance in zip(result["ids"], result["distances"]):
+                    if doc_id not in best or distance < best[doc_id][0]:
+                        best[doc_id] = (distance, q)
+
+            for q, result in enumerate(per_query):
+                keep = [i for i, doc_id in enumerate(result["ids"]) if best[doc_id][1] == q]
+                per_query[q] = {key: [values[i] for i in keep] for key, values in result.items()}
+
+        return [{key: values[:n_results] for key, values in result.items()} for result in per_query]
+
+    def build_lexical_index(self, file_name: str, path=LEXICAL_DIR):
+        """BM25 + course code index over the same CSV the vectors were built from"""
+        self.lexical = LexicalIndex.build(file_name, path)
+        print(f"Built lexical index for {len(self.lexical.ids)} courses in {path}")
+
+    def filter_ids(self, ids, where):
+        """ids (in order) whose stored metadata passes the where filter"""
+        if not ids:
+            return []
+        if self.index is not None:
+            allowed = {self.index.ids[r] for r in self.index.filter.rows(where)}
+        else:
+            allowed = set(self.collection.get(ids=list(ids), where=self.chroma_where(where), include=[])["ids"])
+        return [doc_id for doc_id in ids if doc_id in allowed]
+
+    def query_hybrid(self, query_text, eg=None, n_results=10, mode="hybrid", where=None):
+        """Search by text with exact course code lookup, BM25, vectors or all fused
+
+        mode - "lexical", "vector" or "hybrid" (reciprocal rank fusion of both)
+        exact course code matches ("CMPSC 465") always rank first
+        where filters the lexical and exact code hits as well as the vector ones
+        returns {"ids", "scores"} best first
+        """
+        if self.lexical is None:
+            self.lexical = LexicalIndex.load(self.lexical_path)
+
+        exact = self.lexical.lookup_codes(query_text)
+        if where:
+            exact = self.filter_ids(exact, where)
+
+        rankings = []
+
+        if mode in ("lexical", "hybrid"):
+            if where:
+                # filter every BM25 match before cutting to the candidate count
+                lexical = self.filter_ids(self.lexical.search(query_text, n_results=len(self.lexical.ids))[0], where)
+            else:
+                lexical = self.lexical.search(query_text, n_results=n_results * 2)[0]
+            rankings.append(lexical[:n_results * 2])
+
+        if mode in ("vector", "hybrid"):
+            if eg is None:
+                raise ValueError("an EmbeddingGenerator is needed for vector search")
+            results = self.query_vectors(eg.generate_embedding(query_text), n_results=n_results * 2, where=where)
+            rankings.append(results["ids"][0])
+
+        ids, scores = reciprocal_rank_fusion(rankings, n_results=n_results)
+
+        # exact code hits go on top with a score above anything fusion can produce
+        fused = [(doc_id, score) for doc_id, score in zip(ids, scores) if doc_id not in exact]
+        ids = exact + [doc_id for doc_id, _ in fused]
+        scores = [1.0] * len(exact) + [score for _, score in fused]
+        return {"ids": ids[:n_results], "scores": scores[:n_results]}
+
 class EmbeddingGenerator:
-    def __init__(self, model_name='sentence-transformers/all-MiniLM-L6-v2'):
-        """Load Transformer model for embeddings"""
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.model = AutoModel.from_pretrained(model_name)
+    def __init__(self, model_name='sentence-transformers/all-MiniLM-L6-v2', cache=None, num_workers=1, threads_per_worker=None, backend="torch",
+                 pooling="mean", normalize=True, dtype=np.float32):
+        """Load Transformer model for embeddings
+
+        cache - optional EmbeddingCache consulted before running the model
+        num_workers - > 1 shards large inputs across a pool of worker processes (each loads its own model)
+        backend - "torch" (fp32), "int8" (dynamic quantization) or "onnx" (ONNX Runtime, exported on first use)
+        pooling - "mean" (attention masked, what all-MiniLM-L6-v2 is trained for) or "cls"
+        normalize - L2 normalize so similarity is a plain inner product
+        dtype - np.float16 halves vector store / cache size
+        """
+        self.model_name = model_name
+        self.backend_name = backend
+        self.pooling = pooling
+        self.normalize = normalize
+        self.dtype = np.dtype(dtype)
+        self.cache = cache
+
+        # tokenizer + model load on the first embedding; with workers only the worker processes load them
+        self._tokenizer = None
+        self._backend = None
+        self._load_lock = threading.Lock()
+
+        # vectors from a lossy backend or stored below fp32 must not be served to fp32 callers
+        self.cache_model_name = model_name if backend == "torch" else f"{model_name}@{backend}"
+        if self.dtype != np.float32:
+            self.cache_model_name = f"{self.cache_model_name}@{self.dtype.name}"
+        self.cache_pooling = f"{pooling}+l2" if normalize else pooling
+
+        self.workers = None
+        if num_workers > 1:
+            self.workers = EmbeddingWorkerPool(
+                model_name, num_workers, model_hidden_size(model_name), self.pooling, threads_per_worker, backend
+            )
+
+    def load_model(self):
+        """load tokenizer and inference backend once, even with concurrent first callers"""
+        with self._load_lock:
+            if self._backend is None:
+                from transformers import AutoTokenizer
+
+                self._tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                self._backend = load_backend(self.backend_name, self.model_name, self._tokenizer)
+
+    @property
+    def tokenizer(self):
+        if self._backend is None:
+            self.load_model()
+        return self._tokenizer
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self.load_model()
+        return self._backend
+
+    def close(self):
+        """Shut down worker processes if any"""
+        if self.workers is not None:
+            self.workers.close()
+            self.workers = None
+
+    def run_model(self, texts, batch_size):
+        """Embed texts with the transformer -> (len(texts), dim) pooled float32 array in input order"""
+        # only inputs that give every worker at least one full forward pass are worth shipping to the pool
+        if self.workers is not None and len(texts) >= batch_size * self.workers.num_workers:
+            return self.workers.embed(texts, batch_size)
+
+        # sort by length so each batch is padded only to its own longest text
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        embeddings = np.empty((len(texts), self.backend.hidden_size), dtype=np.float32)
+
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            inputs = self.tokenizer([texts[i] for i in batch], return_tensors=self.backend.tensor_type, truncation=True, padding=True)
+            hidden_states = self.backend.last_hidden_state(inputs)
+            embeddings[batch] = pool(hidden_states, inputs["attention_mask"], self.pooling)
+
+        return embeddings
+
+    def postprocess(self, embeddings):
+        """normalize + cast a whole batch at once"""
+        if self.normalize:
+            embeddings = l2_normalize(embeddings)
+        return embeddings.astype(self.dtype, copy=False)
+
+    def generate_embeddings(self, texts, batch_size=DEFAULT_BATCH_SIZE):
+        """Generate sentence embeddings for many texts -> (len(texts), dim) array in input order
+
+        texts already in the cache skip the transformer entirely
+        """
+        if self.cache is None or not texts:
+            return self.postprocess(self.run_model(texts, batch_size))
+
+        keys = [text_key(self.cache_model_name, self.cache_pooling, text) for text in texts]
+        cached = self.cache.get_many(keys)
+
+        # embed each distinct uncached text once
+        missing = list(dict.fromkeys(k for k in keys if k not in cached))
+        if missing:
+            text_for_key = dict(zip(keys, texts))
+            computed = self.postprocess(self.run_model([text_for_key[k] for k in missing], batch_size))
+            self.cache.put_many(missing, computed)
+            cached.update(zip(missing, computed))
+
+        return np.stack([cached[k] for k in keys]).astype(self.dtype, copy=False)
 
     def generate_embedding(self, text):
         """Generate a sentence embedding"""
-        inputs = self.tokenizer(text, return_tensors='pt', truncation=True, padding=True)
+        return self.generate_embeddings([text])[0]
 
+if __name__ == "__main__":
+    import argparse
 
-        # Use cls token 
-        cls_embedding = outputs.last_hidden_state[:, 0, :]  # First token ([CLS])
-        return cls_embedding.squeeze().numpy()  # to numpy
+    parser = argparse.ArgumentParser()
+    parser.add_argument("csv_file", nargs="?", default="/workspaces/pennStateAdvisor/crawler/processed_psu_courses.csv")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--num-workers", type=int, default=1, help="embedding worker processes")
+    args = parser.parse_args()
 
-if __name__ == "__main__":
     vector_store = VectorStoreManager()
-    embed_gen = EmbeddingGenerator()
+    embed_gen = EmbeddingGenerator(cache=EmbeddingCache())
 
     # load data from CSV and process
-    csv_file = "/workspaces/pennStateAdvisor/crawler/processed_psu_courses.csv"
-    vector_store.fromcsv(csv_file) # make into vector store
+    vector_store.fromcsv(args.csv_file, batch_size=args.batch_size, num_workers=args.num_workers) # make into vector store
 
     # test 
     query_text = "Machine learning basics"
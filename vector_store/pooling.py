@@ -0,0 +1,37 @@
+"""
+Batch pooling of transformer hidden states into sentence embeddings.
+
+all-MiniLM-L6-v2 is trained with attention masked mean pooling, and its
+vectors are meant to be L2 normalized so cosine similarity is a plain inner
+product. Everything here works on whole (batch, seq, hidden) numpy arrays.
+"""
+
+import numpy as np
+
+POOLINGS = ("mean", "cls")
+
+
+def mean_pool(last_hidden_state, attention_mask):
+    """average of the token vectors that aren't padding -> (batch, hidden)"""
+    mask = np.asarray(attention_mask, dtype=last_hidden_state.dtype)[:, :, None]
+    summed = np.einsum("bsh,bsx->bh", last_hidden_state, mask)
+    counts = np.maximum(mask.sum(axis=1), 1e-9)
+    return summed / counts
+
+
+def cls_pool(last_hidden_state, attention_mask=None):
+    return last_hidden_state[:, 0, :]  # First token ([CLS])
+
+
+def pool(last_hidden_state, attention_mask, pooling="mean"):
+    if pooling == "mean":
+        return mean_pool(last_hidden_state, attention_mask)
+    if pooling == "cls":
+        return cls_pool(last_hidden_state)
+    raise ValueError(f"unknown pooling {pooling!r}, expected one of {POOLINGS}")
+
+
+def l2_normalize(embeddings):
+    """unit length rows, zero rows are left as zeros"""
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.maximum(norms, 1e-12)
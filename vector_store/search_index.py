@@ -0,0 +1,198 @@
+"""
+In-process search backends for VectorStoreManager.query_vectors.
+
+For a few tens of thousands of courses a brute force scan of one contiguous
+matrix beats a round trip through ChromaDB. Both backends are loaded from
+memory mapped files written by `build`:
+
+    <path>/ids.json        -> course ids in row order
+    <path>/metadatas.json  -> metadata dict per row
+    <path>/facets.npz      -> inverted facet indexes used to prune filtered searches
+    <path>/vectors.npy     -> (n, dim) float32 / float16 matrix      (ExactIndex)
+    <path>/faiss.index     -> HNSW graph over the same rows          (FaissHNSWIndex)
+
+Results come back in ChromaDB's query format (ids / distances / metadatas,
+one inner list per query) with distance = 1 - inner product, matching the
+"ip" space of the collection.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from facet_index import FACETS, FACETS_FILE, FacetIndex, condition_mask
+
+try:
+    import faiss
+except ImportError:  # optional, only needed for the hnsw backend
+    faiss = None
+
+INDEX_DIR = "./search_index"
+SEARCH_BACKENDS = ("chroma", "exact", "hnsw")
+SCORE_CHUNK_ROWS = 8192  # rows upcast to float32 at a time when scoring a float16 matrix
+
+
+def write_rows(path, ids, metadatas):
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "ids.json"), mode="w", encoding="utf-8") as f:
+        json.dump(ids, f)
+    with open(os.path.join(path, "metadatas.json"), mode="w", encoding="utf-8") as f:
+        json.dump(metadatas, f)
+    FacetIndex.from_metadatas(metadatas).save(path)
+
+
+def read_rows(path):
+    with open(os.path.join(path, "ids.json"), mode="r", encoding="utf-8") as f:
+        ids = json.load(f)
+    with open(os.path.join(path, "metadatas.json"), mode="r", encoding="utf-8") as f:
+        metadatas = json.load(f)
+    return ids, metadatas
+
+
+class MetadataFilter:
+    """Candidate rows for chroma style filters
+
+    facet fields (course_prefix, gened, credits, prereq_count) are answered from the
+    precomputed FacetIndex, any other field by a scan of its column with the same operators
+    """
+
+    def __init__(self, path, metadatas):
+        self.metadatas = metadatas
+        self.columns = {}
+
+        if os.path.exists(os.path.join(path, FACETS_FILE)):
+            self.facets = FacetIndex.load(path)
+        else:
+            self.facets = FacetIndex.from_metadatas(metadatas)
+
+    def column(self, field):
+        if field not in self.columns:
+            self.columns[field] = np.array([m.get(field) for m in self.metadatas], dtype=object)
+        return self.columns[field]
+
+    def rows(self, where):
+        """sorted row numbers passing every condition in where"""
+        rows = self.facets.rows({f: c for f, c in where.items() if f in FACETS})
+
+        for field, condition in where.items():
+            if field.startswith("$"):
+                raise ValueError(f"logical operator {field} is not supported by the in-process filter, pass field conditions")
+            if field in FACETS:
+                continue
+            rows = rows[condition_mask(field, self.column(field)[rows], condition)]
+        return rows
+
+
+def to_results(ids, metadatas, rows, scores):
+    """chroma shaped results for one query"""
+    return (
+        [ids[r] for r in rows],
+        [float(1 - s) for s in scores],
+        [metadatas[r] for r in rows],
+    )
+
+
+def merge_results(per_query):
+    return {
+        "ids": [q[0] for q in per_query],
+        "distances": [q[1] for q in per_query],
+        "metadatas": [q[2] for q in per_query],
+    }
+
+
+class ExactIndex:
+    """Exact top-k by one matrix product + argpartition over a memory mapped matrix"""
+
+    def __init__(self, path):
+        self.ids, self.metadatas = read_rows(path)
+        self.vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        self.filter = MetadataFilter(path, self.metadatas)
+
+    @staticmethod
+    def build(path, ids, embeddings, metadatas, dtype=np.float32):
+        write_rows(path, ids, metadatas)
+        np.save(os.path.join(path, "vectors.npy"), np.ascontiguousarray(embeddings, dtype=dtype))
+
+    def search(self, query_embeddings, n_results=3, where=None):
+        queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+        rows = np.arange(len(self.ids))
+        vectors = self.vectors
+
+        # prune to the filtered rows before scoring
+        if where:
+            rows = self.filter.rows(where)
+            vectors = self.vectors[rows]
+
+        k = min(n_results, len(rows))
+        if k == 0:
+            return merge_results([([], [], [])] * len(queries))
+
+        scores = self.score(queries, vectors)  # (n_queries, n_rows)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+        per_query = []
+        for q in range(len(queries)):
+            order = top[q][np.argsort(-scores[q, top[q]])]
+            per_query.append(to_results(self.ids, self.metadatas, rows[order], scores[q, order]))
+        return merge_results(per_query)
+
+    @staticmethod
+    def score(queries, vectors):
+        """inner products chunk by chunk, so a float16 matrix stays float16 and only one chunk is upcast"""
+        scores = np.empty((len(queries), len(vectors)), dtype=np.float32)
+        for start in range(0, len(vectors), SCORE_CHUNK_ROWS):
+            chunk = vectors[start:start + SCORE_CHUNK_ROWS]
+            scores[:, start:start + len(chunk)] = queries @ chunk.astype(np.float32, copy=False).T
+        return scores
+
+
+class FaissHNSWIndex:
+    """Approximate top-k with a faiss HNSW graph (inner product), read with mmap"""
+
+    def __init__(self, path, ef_search=64):
+        if faiss is None:
+            raise ImportError("the hnsw search backend needs faiss-cpu installed")
+
+        self.ids, self.metadatas = read_rows(path)
+        self.index = faiss.read_index(os.path.join(path, "faiss.index"), faiss.IO_FLAG_MMAP)
+        self.index.hnsw.efSearch = ef_search
+        self.filter = MetadataFilter(path, self.metadatas)
+
+    @staticmethod
+    def build(path, ids, embeddings, metadatas, m=32, ef_construction=200):
+        if faiss is None:
+            raise ImportError("the hnsw search backend needs faiss-cpu installed")
+
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        index = faiss.IndexHNSWFlat(embeddings.shape[1], m, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = ef_construction
+        index.add(embeddings)
+
+        write_rows(path, ids, metadatas)
+        faiss.write_index(index, os.path.join(path, "faiss.index"))
+
+    def search(self, query_embeddings, n_results=3, where=None):
+        queries = np.ascontiguousarray(np.atleast_2d(query_embeddings), dtype=np.float32)
+
+        params = None
+        if where:
+            # graph search only visits rows that pass the filter
+            allowed = self.filter.rows(where).astype(np.int64)
+            params = faiss.SearchParametersHNSW(sel=faiss.IDSelectorBatch(allowed), efSearch=self.index.hnsw.efSearch)
+
+        scores, rows = self.index.search(queries, min(n_results, len(self.ids)), params=params)
+
+        per_query = []
+        for q in range(len(queries)):
+            found = rows[q] >= 0  # -1 pads when fewer than k rows pass the filter
+            per_query.append(to_results(self.ids, self.metadatas, rows[q][found], scores[q][found]))
+        return merge_results(per_query)
+
+
+def load_index(backend, path=INDEX_DIR):
+    if backend == "exact":
+        return ExactIndex(path)
+    if backend == "hnsw":
+        return FaissHNSWIndex(path)
+    raise ValueError(f"unknown search backend {backend!r}, expected one of {SEARCH_BACKENDS}")